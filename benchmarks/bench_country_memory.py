@@ -0,0 +1,47 @@
+"""Compares the memory retained by Country and CompactCountry objects.
+
+Run with: python -m benchmarks.bench_country_memory [count]
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+
+from benchmarks.fixtures import make_all_payload
+from restcountries.base import Country
+from restcountries.compact import CompactCountry, clear_shared_values
+
+
+def retained_bytes(country_class, payload, access_nested=False):
+    """Returns the bytes still allocated after decoding payload into countries and dropping the decoded json."""
+    clear_shared_values()
+    gc.collect()
+    tracemalloc.start()
+    countries = [country_class(data) for data in json.loads(payload)]
+    if access_nested:
+        for country in countries:
+            country.currencies
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del countries
+    return size
+
+
+def run(count=250):
+    payload = make_all_payload(count)
+    results = {
+        "Country": retained_bytes(Country, payload),
+        "CompactCountry": retained_bytes(CompactCountry, payload),
+        "CompactCountry (decoded)": retained_bytes(
+            CompactCountry, payload, access_nested=True
+        ),
+    }
+    return {name: size / count for name, size in results.items()}
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 250
+    for name, per_country in run(count).items():
+        print("{:<26} {:>8.0f} bytes per country".format(name, per_country))
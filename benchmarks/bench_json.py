@@ -0,0 +1,37 @@
+"""Compares the json backends decoding a large /all response into Country objects.
+
+Run with: python -m benchmarks.bench_json [count]
+"""
+
+import sys
+import timeit
+
+from benchmarks.fixtures import make_all_payload
+from restcountries.base import Country
+from restcountries.json_backend import BACKENDS, get_json_backend
+
+
+def run(count=2500, repeat=5):
+    """Returns the best time in seconds per backend to decode a /all response with count countries."""
+    payload = make_all_payload(count)
+    results = {}
+    for name in BACKENDS:
+        try:
+            backend = get_json_backend(name)
+        except ImportError:
+            continue
+        timer = timeit.Timer(lambda: backend.decode_countries(payload, Country))
+        results[name] = min(timer.repeat(repeat=repeat, number=1))
+    return results
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2500
+    results = run(count)
+    baseline = results["json"]
+    for name, seconds in results.items():
+        print(
+            "{:<8} {:>8.2f} ms  {:>5.2f}x".format(
+                name, seconds * 1000, baseline / seconds
+            )
+        )
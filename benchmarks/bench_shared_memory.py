@@ -0,0 +1,124 @@
+"""Compares the memory of forked worker processes answering lookups from a dataset.
+
+- per worker: every worker decodes /all into its own LocalDataset, like a worker started without preloading.
+- preloaded: the parent builds one LocalDataset before forking. Pages start out shared, but reference counting and
+  the garbage collector write to the objects, so the workers copy them.
+- shared: the parent creates a SharedDataset and the workers attach to it.
+
+Memory is read from /proc/self/smaps_rollup, so this runs on Linux only.
+Run with: python -m benchmarks.bench_shared_memory [count] [workers]
+"""
+
+import gc
+import json
+import multiprocessing
+import os
+import sys
+
+from benchmarks.fixtures import make_all_payload
+from restcountries.local import LocalDataset
+from restcountries.shared import SharedDataset, shared_memory
+
+MODES = ("per_worker", "preloaded", "shared")
+
+
+def memory_kb():
+    """Returns (rss, private) memory of this process in kB."""
+    values = {}
+    with open("/proc/self/smaps_rollup") as smaps:
+        for line in smaps:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values["Rss"], values["Private_Clean"] + values["Private_Dirty"]
+
+
+def _lookups(dataset, codes, currencies):
+    for code in codes:
+        dataset.query("/alpha", code)
+    for currency in currencies:
+        dataset.query("/currency", currency)
+    gc.collect()
+
+
+def _worker(mode, payload, dataset, shared_name, codes, currencies, connection):
+    _, private_before = memory_kb()
+    if mode == "per_worker":
+        dataset = LocalDataset(json.loads(payload))
+    elif mode == "shared":
+        dataset = SharedDataset.attach(shared_name)
+    for _ in range(3):
+        _lookups(dataset, codes, currencies)
+    rss, private = memory_kb()
+    connection.send((rss * 1024, (private - private_before) * 1024))
+    connection.close()
+    if mode == "shared":
+        dataset.close()
+
+
+def measure(mode, payload, workers):
+    """Returns the mean rss and the mean private memory added per worker in bytes."""
+    data = json.loads(payload)
+    codes = [record["alpha3Code"] for record in data]
+    currencies = sorted(
+        {currency["code"] for record in data for currency in record["currencies"]}
+    )
+    dataset = shared = None
+    if mode == "preloaded":
+        dataset = LocalDataset(data)
+    elif mode == "shared":
+        shared = SharedDataset.create(data)
+    del data
+    gc.collect()
+    # like a preforking server should, so the collector of the workers does not write to the objects of the parent
+    gc.freeze()
+
+    context = multiprocessing.get_context("fork")
+    results = []
+    try:
+        for _ in range(workers):
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_worker,
+                args=(
+                    mode,
+                    payload,
+                    dataset,
+                    shared and shared.name,
+                    codes,
+                    currencies,
+                    sender,
+                ),
+            )
+            process.start()
+            results.append(receiver.recv())
+            process.join()
+    finally:
+        gc.unfreeze()
+        if shared is not None:
+            shared.unlink()
+    return (
+        sum(rss for rss, _ in results) / workers,
+        sum(private for _, private in results) / workers,
+    )
+
+
+def run(count=250, workers=4):
+    """Returns {mode: (rss bytes, private bytes)} per worker, empty where fork, /proc or shared memory are missing."""
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        return {}
+    if "fork" not in multiprocessing.get_all_start_methods() or shared_memory is None:
+        return {}
+    payload = make_all_payload(count)
+    return {mode: measure(mode, payload, workers) for mode in MODES}
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 250
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    for mode, (rss, private) in run(count, workers).items():
+        print(
+            "{:<12} {:>10.0f} kB rss {:>10.0f} kB private per worker".format(
+                mode, rss / 1024, private / 1024
+            )
+        )
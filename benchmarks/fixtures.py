@@ -0,0 +1,31 @@
+"""Synthetic payloads of the size of the real /all endpoint, built from the test fixtures."""
+
+import copy
+import json
+
+from restcountries.tests.countries_data import RSA, NGR, EGY, KEN
+
+
+def make_all_data(count=250):
+    """Returns a list of count distinct country dicts, shaped like the /all response."""
+    templates = [RSA, NGR, EGY, KEN]
+    data = []
+    for i in range(count):
+        country = copy.deepcopy(templates[i % len(templates)])
+        suffix = "{:03d}".format(i)
+        country["name"] = "{} {}".format(country["name"], suffix)
+        country["alpha2Code"] = "{}{}".format(chr(65 + i // 26 % 26), chr(65 + i % 26))
+        country["alpha3Code"] = "X{}".format(country["alpha2Code"])
+        country["numericCode"] = suffix
+        country["population"] += i
+        country["translations"] = {
+            language: "{} {}".format(name, suffix)
+            for language, name in country["translations"].items()
+        }
+        data.append(country)
+    return data
+
+
+def make_all_payload(count=250):
+    """Returns the json body of a /all response with count countries."""
+    return json.dumps(make_all_data(count)).encode("utf-8")
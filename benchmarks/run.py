@@ -0,0 +1,320 @@
+"""Runs the benchmark suite offline, against synthetic payloads and a local stub of the API.
+
+Results are written as json, so the results of two commits can be compared:
+
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --output after.json
+    python -m benchmarks.run --compare before.json after.json
+
+Metric names end with their unit. Metrics in seconds and bytes are better when lower, metrics per second are
+better when higher.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+from benchmarks import bench_country_memory, bench_json, bench_shared_memory
+from benchmarks.fixtures import make_all_data, make_all_payload
+from restcountries.aio import AsyncRestCountryApiV2
+from restcountries.base import Country, RestCountryApiV2
+from restcountries.batch import map_queries
+from restcountries.cache import LRUCache
+from restcountries.compact import CompactCountry
+from restcountries.local import LocalDataset
+from restcountries.snapshot import Snapshot, build_snapshot
+from restcountries.tests.server import StubServer
+
+BENCHMARKS = {}
+
+
+def benchmark(function):
+    """Registers a benchmark, a function taking the options and returning a dict of metric name to value."""
+    BENCHMARKS[function.__name__] = function
+    return function
+
+
+def _api_class(base_uri, base=RestCountryApiV2, **attributes):
+    # a subclass, so the benchmarks do not change the configuration of RestCountryApiV2
+    attributes.setdefault("cache", None)
+    attributes.setdefault("_session", None)
+    attributes["BASE_URI"] = base_uri
+    return type("Benchmark" + base.__name__, (base,), attributes)
+
+
+def _timings(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+@benchmark
+def json_decoding(options):
+    """Decoding a /all response with every installed json backend."""
+    return {
+        "{}_seconds".format(name): seconds
+        for name, seconds in bench_json.run(options.count, options.repeat).items()
+    }
+
+
+@benchmark
+def country_construction(options):
+    """Creating countries from decoded json."""
+    data = make_all_data(options.count)
+    results = {}
+    for country_class in (Country, CompactCountry):
+        seconds = min(
+            timeit.Timer(
+                lambda: [country_class(country_data) for country_data in data]
+            ).repeat(repeat=options.repeat, number=1)
+        )
+        results["{}_per_second".format(country_class.__name__)] = (
+            options.count / seconds
+        )
+    return results
+
+
+@benchmark
+def get_all(options):
+    """End to end latency of get_all and iter_all against the local stub server."""
+    routes = {"/v2/all": (200, make_all_payload(options.count))}
+    with StubServer(routes) as server:
+        api = _api_class(server.base_uri)
+        api.get_all()  # opens the connection
+        get_all_timings = _timings(api.get_all, options.repeat * 4)
+        iter_all_timings = _timings(lambda: list(api.iter_all()), options.repeat * 4)
+        api.close_session()
+    return {
+        "get_all_median_seconds": statistics.median(get_all_timings),
+        "get_all_p95_seconds": _percentile(get_all_timings, 0.95),
+        "iter_all_median_seconds": statistics.median(iter_all_timings),
+    }
+
+
+@benchmark
+def cache_hits(options):
+    """Lookups answered from the in-memory cache."""
+    routes = {"/v2/name/kenya": (200, json.dumps(make_all_data(4)[3:]).encode("utf-8"))}
+    with StubServer(routes) as server:
+        api = _api_class(server.base_uri, cache=LRUCache())
+        api.get_countries_by_name("kenya")
+        number = 10000
+        seconds = min(
+            timeit.Timer(lambda: api.get_countries_by_name("kenya")).repeat(
+                repeat=options.repeat, number=number
+            )
+        )
+        api.close_session()
+    return {"cache_hit_seconds": seconds / number}
+
+
+@benchmark
+def concurrent_lookups(options):
+    """Many different lookups against a stub server with network latency, one after another and concurrently."""
+    names = ["country{:02d}".format(i) for i in range(options.lookups)]
+    body = json.dumps(make_all_data(1)).encode("utf-8")
+    routes = {"/v2/name/{}".format(name): (200, body) for name in names}
+    results = {}
+    with StubServer(routes, delay=options.latency) as server:
+        api = _api_class(server.base_uri, POOL_MAXSIZE=options.lookups)
+
+        started = time.perf_counter()
+        for name in names:
+            api.get_countries_by_name(name)
+        results["sequential_seconds"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for result in map_queries(
+            [("get_countries_by_name", name, None) for name in names], api=api
+        ):
+            result.get()
+        results["map_queries_seconds"] = time.perf_counter() - started
+        api.close_session()
+
+        async_api = _api_class(
+            server.base_uri, base=AsyncRestCountryApiV2, transport=None
+        )
+
+        async def lookups():
+            try:
+                return await asyncio.gather(
+                    *(async_api.get_countries_by_name(name) for name in names)
+                )
+            finally:
+                await async_api.close()
+
+        started = time.perf_counter()
+        asyncio.run(lookups())
+        results["async_gather_seconds"] = time.perf_counter() - started
+    return results
+
+
+@benchmark
+def snapshot_startup(options):
+    """Time until the first lookup of a backend is answered, from a saved /all response and from a snapshot."""
+    payload = make_all_payload(options.count)
+    code = json.loads(payload)[-1]["alpha3Code"]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "countries.snapshot")
+        build_snapshot(json.loads(payload), path)
+
+        def from_snapshot():
+            with Snapshot(path) as snapshot:
+                return snapshot.to_dataset().query("/alpha", code)
+
+        json_seconds = min(
+            timeit.Timer(
+                lambda: LocalDataset(json.loads(payload)).query("/alpha", code)
+            ).repeat(repeat=options.repeat, number=1)
+        )
+        snapshot_seconds = min(_timings(from_snapshot, options.repeat))
+        return {
+            "json_startup_seconds": json_seconds,
+            "snapshot_startup_seconds": snapshot_seconds,
+            "snapshot_bytes": os.path.getsize(path),
+        }
+
+
+@benchmark
+def memory(options):
+    """Memory retained per country."""
+    return {
+        "{}_bytes".format(
+            name.replace(" ", "_").replace("(", "").replace(")", "")
+        ): size
+        for name, size in bench_country_memory.run(options.count).items()
+    }
+
+
+@benchmark
+def worker_memory(options):
+    """Memory per forked worker with its own dataset, a preloaded dataset and a SharedDataset."""
+    results = {}
+    for mode, (rss, private) in bench_shared_memory.run(
+        options.count, options.workers
+    ).items():
+        results["{}_rss_bytes".format(mode)] = rss
+        results["{}_private_bytes".format(mode)] = private
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+            universal_newlines=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(options):
+    """Runs the selected benchmarks and returns the report as a dict."""
+    names = options.only or list(BENCHMARKS)
+    results = {}
+    for name in names:
+        print("running {}".format(name), file=sys.stderr)
+        results[name] = BENCHMARKS[name](options)
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "count": options.count,
+            "repeat": options.repeat,
+        },
+        "results": results,
+    }
+
+
+def higher_is_better(metric):
+    return metric.endswith("_per_second")
+
+
+def compare(baseline, current, threshold=0.1):
+    """Compares two reports.
+
+    :param threshold - relative change of a metric that counts as a regression or an improvement.
+    :returns: a list of (benchmark, metric, baseline value, current value, change, verdict)
+    """
+    rows = []
+    for name, metrics in current["results"].items():
+        for metric, value in metrics.items():
+            old = baseline["results"].get(name, {}).get(metric)
+            if not old:
+                continue
+            change = value / old - 1
+            worse = -change if higher_is_better(metric) else change
+            verdict = ""
+            if worse > threshold:
+                verdict = "regression"
+            elif worse < -threshold:
+                verdict = "improvement"
+            rows.append((name, metric, old, value, change, verdict))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="file the json report is written to")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS))
+    parser.add_argument("--count", type=int, default=250, help="countries per /all")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--lookups", type=int, default=32)
+    parser.add_argument(
+        "--workers", type=int, default=4, help="processes of worker_memory"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="seconds the stub server waits"
+    )
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"))
+    parser.add_argument("--threshold", type=float, default=0.1)
+    options = parser.parse_args(argv)
+
+    if options.compare:
+        reports = []
+        for path in options.compare:
+            with open(path) as report_file:
+                reports.append(json.load(report_file))
+        rows = compare(reports[0], reports[1], options.threshold)
+        for name, metric, old, new, change, verdict in rows:
+            print(
+                "{:<22} {:<32} {:>14.6g} {:>14.6g} {:>+8.1%} {}".format(
+                    name, metric, old, new, change, verdict
+                )
+            )
+        return 1 if any(row[5] == "regression" for row in rows) else 0
+
+    report = run(options)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, "w") as report_file:
+            report_file.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 # simpler import as described in the readme
 from restcountries.base import RestCountryApiV2
+from restcountries.aio import AsyncRestCountryApiV2
 
 __version__ = "2.0.0"
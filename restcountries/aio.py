@@ -0,0 +1,324 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from restcountries.base import RestCountryApiV2
+from restcountries.cache import MISSING
+from restcountries.hooks import CallEvent
+from restcountries.resilience import CircuitOpenError
+from restcountries.singleflight import AsyncSingleFlight
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+class AiohttpTransport:
+    """Fetches URIs through a pooled `aiohttp.ClientSession`.
+
+    The session is bound to the event loop it was created in. If the transport is used from another loop, a new
+    session is created for it.
+    """
+
+    def __init__(self, limit=100, limit_per_host=0, keepalive_timeout=15, timeout=None):
+        """
+        :param limit - maximum number of simultaneous connections.
+        :param limit_per_host - maximum number of simultaneous connections to one host, 0 means no limit.
+        :param keepalive_timeout - seconds an idle connection is kept open.
+        :param timeout - seconds to wait for a connection and for data of a response as (connect, read), by default
+        `RestCountryApiV2.TIMEOUT`.
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "aiohttp is required for the AiohttpTransport: pip install python-restcountries[async]"
+            )
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = RestCountryApiV2.TIMEOUT if timeout is None else timeout
+        self._loop = None
+        self._session = None
+
+    def _get_session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            connect_timeout, read_timeout = self.timeout
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                trace_configs=[_timing_trace_config()],
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=connect_timeout, sock_read=read_timeout
+                ),
+            )
+            self._loop = loop
+        return self._session
+
+    async def fetch(self, uri, headers=None, event=None):
+        """Returns the status code, the body and the headers of a GET request to the uri.
+
+        Errors are raised as the exceptions of requests, like the synchronous client raises them.
+        :param headers - optional headers of the request.
+        :param event - optional CallEvent the DNS, connect and time to first byte of the request are recorded in. DNS
+        and connect times are only measured for new connections.
+        """
+        session = self._get_session()
+        try:
+            async with session.get(
+                uri, headers=headers, trace_request_ctx=event
+            ) as response:
+                return response.status, await response.read(), response.headers
+        except asyncio.TimeoutError as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except aiohttp.ClientError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+
+    async def close(self):
+        if self._session is not None and self._loop is asyncio.get_running_loop():
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+def _timing_trace_config():
+    # records the timings of a request in the CallEvent passed as its trace_request_ctx
+    trace_config = aiohttp.TraceConfig()
+
+    def start(name):
+        async def started(session, context, params):
+            setattr(context, name, time.perf_counter())
+
+        return started
+
+    def finish(name, attribute):
+        async def finished(session, context, params):
+            event = context.trace_request_ctx
+            started = getattr(context, name, None)
+            if event is not None and started is not None:
+                setattr(event, attribute, time.perf_counter() - started)
+
+        return finished
+
+    trace_config.on_request_start.append(start("request_started"))
+    trace_config.on_dns_resolvehost_start.append(start("dns_started"))
+    trace_config.on_dns_resolvehost_end.append(finish("dns_started", "dns_seconds"))
+    trace_config.on_connection_create_start.append(start("connect_started"))
+    trace_config.on_connection_create_end.append(
+        finish("connect_started", "connect_seconds")
+    )
+    # called once the headers of the response were received, like the elapsed time of requests
+    trace_config.on_request_end.append(finish("request_started", "ttfb_seconds"))
+    return trace_config
+
+
+class ThreadedTransport:
+    """Runs the synchronous requests of an API class on a bounded thread pool.
+
+    Used when aiohttp is not installed. Requests go through `_fetch` of the async class in a worker thread, so they
+    use its pooled session and honor its disk cache, rate limiter, retry policy and circuit breaker. The event loop
+    is never blocked, but every request in flight occupies a worker thread.
+    """
+
+    def __init__(self, max_workers=10):
+        self.max_workers = max_workers
+        self._executor = None
+
+    async def run(self, function, *args):
+        """Calls function(*args) in a worker thread and returns its result."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    async def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class AsyncRestCountryApiV2(RestCountryApiV2):
+    """Asyncio version of `RestCountryApiV2`.
+
+    Every get_* method returns a coroutine, so many lookups can run concurrently:
+    >>> await asyncio.gather(*(AsyncRestCountryApiV2.get_countries_by_currency(c) for c in ["EUR", "USD"]))
+
+    Requests go through `transport`, an object with a coroutine method `fetch(uri, headers=None, event=None)`
+    returning the status code, the body and the headers of the response. It may record timings in the event. By
+    default an `AiohttpTransport` is used if aiohttp is installed, otherwise a `ThreadedTransport`.
+    """
+
+    transport = None
+    single_flight = AsyncSingleFlight()
+
+    @classmethod
+    def get_transport(cls):
+        if cls.transport is None:
+            cls.transport = AiohttpTransport() if aiohttp else ThreadedTransport()
+        return cls.transport
+
+    @classmethod
+    async def close(cls):
+        """Closes the transport and its pooled connections."""
+        if cls.transport is not None:
+            await cls.transport.close()
+
+    @classmethod
+    async def _fetch_async(cls, uri, event=None):
+        """Coroutine version of `RestCountryApiV2._fetch`, returns the status code and the body of the response.
+
+        If a disk cache is configured, stored responses are used or revalidated with the server. Its files are read
+        and written in a worker thread, so the event loop is not blocked.
+        :param event - optional CallEvent the status code, size and timings of the response are recorded in
+        """
+        transport = cls.get_transport()
+        if isinstance(transport, ThreadedTransport):
+            return await transport.run(cls._fetch, uri, event)
+
+        disk_cache = cls.disk_cache
+        if disk_cache is None:
+            status_code, body, _ = await cls._send_async(transport, uri, event=event)
+            return status_code, body
+
+        loop = asyncio.get_running_loop()
+        entry, headers = await loop.run_in_executor(None, disk_cache.lookup, uri)
+        if headers is None:
+            if event is not None:
+                event.status_code = 200
+                event.bytes_received = 0
+            return 200, entry.body
+        status_code, body, response_headers = await cls._send_async(
+            transport, uri, headers, event
+        )
+        return await loop.run_in_executor(
+            None, disk_cache.update, uri, entry, status_code, body, response_headers
+        )
+
+    @classmethod
+    async def _send_async(cls, transport, uri, headers=None, event=None):
+        """Coroutine version of `RestCountryApiV2._send`, fetches uri with the transport honoring the rate limiter,
+        the retry policy and the circuit breaker without blocking the event loop.
+
+        :returns: the status code, the body and the headers of the response
+        """
+        breaker = cls.circuit_breaker
+        if breaker is not None:
+            breaker.before_request()
+
+        async def send():
+            if cls.rate_limiter is not None:
+                delay = cls.rate_limiter.reserve()
+                if delay:
+                    await asyncio.sleep(delay)
+            return await transport.fetch(uri, headers=headers, event=event)
+
+        try:
+            if cls.retry_policy is None:
+                response = await send()
+            else:
+                response = await cls.retry_policy.call_async(send)
+        except Exception:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        if breaker is not None:
+            if breaker.is_failure(response[0]):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        if event is not None:
+            event.status_code = response[0]
+            event.bytes_received = len(response[1])
+        return response
+
+    @classmethod
+    async def _get_country_list(cls, resource, term="", filters=None):
+        """Takes a resource and a search term and return a list of countries or a country.
+
+        :param resource - resource to create the URL
+        :param term - search term provided by the user of this package
+        :param filters - a list of fields to filter the output of the request to include only the specified fields.
+        :returns - either a Country object or a list of Countries
+        """
+        hooks = cls.hooks
+        if not hooks:
+            return await cls._lookup(resource, term, filters)
+        event = CallEvent(resource, term, filters)
+        try:
+            return await cls._lookup(resource, term, filters, event)
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            event.finish(hooks)
+
+    @classmethod
+    async def _lookup(cls, resource, term="", filters=None, event=None):
+        """Answers a lookup from the backend, the cache or the API, see `RestCountryApiV2._lookup`."""
+        if cls.backend is not None:
+            return cls.backend.query(resource, term, filters)
+
+        key = cls._cache_key(resource, term, filters)
+        result = cls._get_cached(key)
+        if event is not None and cls.cache is not None:
+            event.cache = "miss" if result is MISSING else "hit"
+        if result is not MISSING:
+            return result
+
+        async def load(record=None):
+            uri = cls._build_uri(resource, term, filters)
+            if record is not None:
+                record.uri = uri
+                record.coalesced = False
+            status_code, body = await cls._fetch_async(uri, record)
+            result = cls._parse_response(status_code, body, record, filters)
+            return cls._set_cached(key, result)
+
+        if cls.refresher is not None:
+            result = cls._get_stale_cached(key)
+            if result is not MISSING:
+                if event is not None:
+                    event.cache = "stale"
+                cls.refresher.schedule_async(key, load)
+                return result
+
+        if event is not None:
+            # stays set if an identical lookup in flight answers this one
+            event.coalesced = True
+        try:
+            if cls.single_flight is None:
+                return await load(event)
+            return await cls.single_flight.do(key, lambda: load(event))
+        except CircuitOpenError:
+            return cls._get_stale(key)
+
+    @classmethod
+    async def bulk_get_by_codes(cls, codes, filters=None):
+        """Returns the countries of many alpha codes with as few requests as possible.
+
+        See `RestCountryApiV2.bulk_get_by_codes`, the chunks are requested concurrently.
+        """
+        codes, found, chunks, chunk_filters = cls._plan_bulk(codes, filters)
+
+        async def fetch(chunk):
+            resource = "/alpha?codes="
+            term = cls.QUERY_SEPARATOR.join(chunk)
+            try:
+                if cls.backend is not None:
+                    return cls.backend.query(resource, term, chunk_filters)
+                uri = cls._build_uri(resource, term, chunk_filters)
+                status_code, body = await cls._fetch_async(uri)
+                return cls._parse_response(status_code, body, filters=chunk_filters)
+            except requests.exceptions.InvalidURL:
+                return []
+
+        results = await asyncio.gather(*(fetch(chunk) for chunk in chunks))
+        for chunk, countries in zip(chunks, results):
+            cls._apply_bulk_chunk(chunk, countries, found, filters)
+        return {code: found.get(code.strip().upper()) for code in codes}
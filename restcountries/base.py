@@ -1,10 +1,115 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-import json
+from requests.adapters import HTTPAdapter
+
+from restcountries.cache import MISSING
+from restcountries.hooks import CallEvent
+from restcountries.json_backend import get_json_backend
+from restcountries.resilience import CircuitOpenError
+from restcountries.singleflight import SingleFlight
+from restcountries.streaming import iter_json_array
 
 
 class RestCountryApiV2:
     BASE_URI = "https://restcountries.com/v2"
     QUERY_SEPARATOR = ";"
+    # size of the connection pool of the shared session, see `configure_session`
+    POOL_CONNECTIONS = 10
+    POOL_MAXSIZE = 10
+    # bytes read at once from streamed responses
+    STREAM_CHUNK_SIZE = 64 * 1024
+    # longest URI sent by `bulk_get_by_codes`, and how many of its requests run at once
+    MAX_URI_LENGTH = 2000
+    BULK_MAX_WORKERS = 4
+    # seconds to wait for a connection and for data of a response, as (connect, read)
+    TIMEOUT = (3.05, 30)
+
+    # optional backend answering lookups instead of the API, e.g. a restcountries.local.LocalDataset
+    backend = None
+    # class the countries are created with, see restcountries.compact.CompactCountry for a more compact one
+    country_class = None  # set to Country below
+    # optional function returning the class of countries for the filters of a lookup, countries of lookups with
+    # filters then only hold the requested fields, see restcountries.projection.projected_class
+    projected_country_class = None
+    # decodes responses, see restcountries.json_backend.get_json_backend
+    json_backend = None  # set below
+    # optional cache for the results of all lookups, e.g. a restcountries.cache.LRUCache
+    cache = None
+    # optional restcountries.refresh.BackgroundRefresher, serves expired cache entries while refreshing them
+    refresher = None
+    # optional persistent cache for raw responses, e.g. a restcountries.disk_cache.DiskCache
+    disk_cache = None
+    # coalesces concurrent identical lookups into one request, set to None to disable
+    single_flight = SingleFlight()
+    # optional restcountries.resilience.RetryPolicy for connection errors, timeouts and 429/5xx responses
+    retry_policy = None
+    # optional restcountries.resilience.CircuitBreaker, lookups fail fast or are answered from the cache while open
+    circuit_breaker = None
+    # optional restcountries.ratelimit.TokenBucket every request waits for, including retries
+    rate_limiter = None
+    # functions called with a restcountries.hooks.CallEvent after every lookup, e.g. a hooks.MetricsHook
+    hooks = []
+
+    _session = None
+    _session_lock = threading.Lock()
+
+    @classmethod
+    def get_session(cls):
+        """Returns the `requests.Session` shared by all lookups.
+
+        The session is created lazily on first use. It keeps connections to the API alive between calls, so only
+        the first lookup pays for the TCP/TLS handshake. The session is shared between threads.
+        :returns: a requests.Session
+        """
+        session = cls._session
+        if session is None:
+            with cls._session_lock:
+                session = cls._session
+                if session is None:
+                    session = cls._create_session()
+                    cls._session = session
+        return session
+
+    @classmethod
+    def _create_session(cls):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=cls.POOL_CONNECTIONS, pool_maxsize=cls.POOL_MAXSIZE
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @classmethod
+    def configure_session(cls, session=None, pool_connections=None, pool_maxsize=None):
+        """Replaces the shared session.
+
+        :param session - a requests.Session to use for all lookups. If omitted a new pooled session is created.
+        :param pool_connections - number of hosts to keep connection pools for.
+        :param pool_maxsize - maximum number of connections kept alive per host, should be at least the number of
+        threads doing lookups concurrently.
+        """
+        with cls._session_lock:
+            if pool_connections is not None:
+                cls.POOL_CONNECTIONS = pool_connections
+            if pool_maxsize is not None:
+                cls.POOL_MAXSIZE = pool_maxsize
+            old_session = cls._session
+            cls._session = session if session is not None else cls._create_session()
+        if old_session is not None and old_session is not session:
+            old_session.close()
+
+    @classmethod
+    def close_session(cls):
+        """Closes the shared session and its pooled connections. A new one is created on the next lookup."""
+        with cls._session_lock:
+            session = cls._session
+            cls._session = None
+        if session is not None:
+            session.close()
 
     @classmethod
     def _get_country_list(cls, resource, term="", filters=None):
@@ -15,6 +120,185 @@ class RestCountryApiV2:
         :param filters - a list of fields to filter the output of the request to include only the specified fields.
         :returns - either a Country object or a list of Countries
         """
+        hooks = cls.hooks
+        if not hooks:
+            return cls._lookup(resource, term, filters)
+        event = CallEvent(resource, term, filters)
+        try:
+            return cls._lookup(resource, term, filters, event)
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            event.finish(hooks)
+
+    @classmethod
+    def _lookup(cls, resource, term="", filters=None, event=None):
+        """Answers a lookup of `_get_country_list` from the backend, the cache or the API.
+
+        :param event - optional CallEvent the measurements of the lookup are recorded in
+        """
+        if cls.backend is not None:
+            return cls.backend.query(resource, term, filters)
+
+        key = cls._cache_key(resource, term, filters)
+        result = cls._get_cached(key)
+        if event is not None and cls.cache is not None:
+            event.cache = "miss" if result is MISSING else "hit"
+        if result is not MISSING:
+            return result
+
+        def load(record=None):
+            uri = cls._build_uri(resource, term, filters)
+            if record is not None:
+                record.uri = uri
+                record.coalesced = False
+            status_code, body = cls._fetch(uri, record)
+            result = cls._parse_response(status_code, body, record, filters)
+            return cls._set_cached(key, result)
+
+        if cls.refresher is not None:
+            result = cls._get_stale_cached(key)
+            if result is not MISSING:
+                if event is not None:
+                    event.cache = "stale"
+                cls.refresher.schedule(key, load)
+                return result
+
+        if event is not None:
+            # stays set if an identical lookup in flight answers this one
+            event.coalesced = True
+        try:
+            if cls.single_flight is None:
+                return load(event)
+            return cls.single_flight.do(key, lambda: load(event))
+        except CircuitOpenError:
+            return cls._get_stale(key)
+
+    @classmethod
+    def _send(cls, uri, headers=None, stream=False):
+        """Sends a GET request with the shared session, honoring TIMEOUT, the rate limiter, the retry policy and the
+        circuit breaker.
+
+        :returns: a requests.Response
+        """
+        breaker = cls.circuit_breaker
+        if breaker is not None:
+            breaker.before_request()
+
+        def send():
+            if cls.rate_limiter is not None:
+                cls.rate_limiter.acquire()
+            return cls.get_session().get(
+                uri, headers=headers, stream=stream, timeout=cls.TIMEOUT
+            )
+
+        try:
+            if cls.retry_policy is None:
+                response = send()
+            else:
+                response = cls.retry_policy.call(send)
+        except Exception:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        if breaker is not None:
+            if breaker.is_failure(response.status_code):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return response
+
+    @classmethod
+    def _fetch(cls, uri, event=None):
+        """Sends a GET request and returns the status code and the body of the response.
+
+        If a disk cache is configured, stored responses are used or revalidated with the server.
+        :param event - optional CallEvent the status code, size and timing of the response are recorded in
+        """
+        disk_cache = cls.disk_cache
+        if disk_cache is None:
+            response = cls._send(uri)
+            body = response.content
+            if event is not None:
+                cls._record_response(event, response, body)
+            return response.status_code, body
+
+        entry, headers = disk_cache.lookup(uri)
+        if headers is None:
+            if event is not None:
+                event.status_code = 200
+                event.bytes_received = 0
+            return 200, entry.body
+        response = cls._send(uri, headers=headers)
+        if event is not None:
+            cls._record_response(event, response, response.content)
+        return disk_cache.update(
+            uri, entry, response.status_code, response.content, response.headers
+        )
+
+    @staticmethod
+    def _record_response(event, response, body):
+        event.status_code = response.status_code
+        event.bytes_received = len(body)
+        # requests measures the time from sending the request until the headers were parsed
+        event.ttfb_seconds = response.elapsed.total_seconds()
+
+    @classmethod
+    def _cache_key(cls, resource, term="", filters=None):
+        """Returns the normalized (resource, term, filters) triple identifying a lookup."""
+        return (
+            resource,
+            str(term).strip().lower(),
+            tuple(sorted(filters)) if filters else (),
+        )
+
+    @classmethod
+    def _get_cached(cls, key):
+        if cls.cache is None:
+            return MISSING
+        result = cls.cache.get(key, MISSING)
+        if type(result) == list:
+            # hand out copies, so callers cannot change the cached list
+            result = list(result)
+        return result
+
+    @classmethod
+    def _get_stale_cached(cls, key):
+        """Returns the cached result for key even if it expired less than the cache's max_stale seconds ago."""
+        get_stale = getattr(cls.cache, "get_stale", None)
+        result = MISSING if get_stale is None else get_stale(key, MISSING)
+        if type(result) == list:
+            result = list(result)
+        return result
+
+    @classmethod
+    def _get_stale(cls, key):
+        """Returns an expired cached result while the circuit breaker is open, or raises CircuitOpenError."""
+        result = cls._get_stale_cached(key)
+        if result is MISSING:
+            raise CircuitOpenError(
+                "The circuit breaker is open and no cached result is available"
+            )
+        return result
+
+    @classmethod
+    def _set_cached(cls, key, result):
+        if cls.cache is not None:
+            cls.cache.set(key, result)
+            if type(result) == list:
+                result = list(result)
+        return result
+
+    @classmethod
+    def invalidate_cache(cls):
+        """Removes all cached lookup results."""
+        if cls.cache is not None:
+            cls.cache.invalidate()
+
+    @classmethod
+    def _build_uri(cls, resource, term="", filters=None):
+        """Builds the request URI for a resource, a search term and filters."""
         # create the filter string
         filters_uri_string = ""
         if filters:
@@ -33,26 +317,90 @@ class RestCountryApiV2:
             if "?" in uri:
                 prefix = "&"
             uri += "{}{}".format(prefix, filters_uri_string)
+        return uri
 
-        response = requests.get(uri)
-        if response.status_code == 200:
-            result_list = []
-            data = json.loads(response.text)  # parse json to dict
-            if type(data) == list:
-                for (
-                    country_data
-                ) in (
-                    data
-                ):  # in case it is a list create python list with country instances
-                    country = Country(country_data)
-                    result_list.append(country)
-            else:
-                return Country(data)
-            return result_list
-        elif response.status_code == 404:
+    @classmethod
+    def _parse_response(cls, status_code, body, event=None, filters=None):
+        """Turns the status code and body of an API response into a Country object or a list of Countries.
+
+        :param status_code - HTTP status code of the response
+        :param body - response body, either str or bytes
+        :param event - optional CallEvent the parse and construction times are recorded in
+        :param filters - the filters of the request, they select the class of the countries
+        :returns - either a Country object or a list of Countries
+        """
+        if status_code == 200:
+            country_class = cls._country_class_for(filters)
+            if event is None:
+                return cls.json_backend.decode_countries(body, country_class)
+            return cls._decode_timed(body, event, country_class)
+        elif status_code == 404:
             raise requests.exceptions.InvalidURL
         else:
-            raise requests.exceptions.RequestException
+            raise requests.exceptions.HTTPError(
+                "Unexpected status code {}".format(status_code)
+            )
+
+    @classmethod
+    def _country_class_for(cls, filters):
+        """Returns the class of the countries of a lookup with filters."""
+        if filters and cls.projected_country_class is not None:
+            return cls.projected_country_class(filters)
+        return cls.country_class
+
+    @classmethod
+    def _decode_timed(cls, body, event, country_class):
+        """Decodes a response like `json_backend.decode_countries`, timing parsing and creating countries apart."""
+        started = time.perf_counter()
+        data = cls.json_backend.loads(body)
+        parsed = time.perf_counter()
+        if type(data) == list:
+            result = [country_class(country_data) for country_data in data]
+        else:
+            result = country_class(data)
+        event.parse_seconds = parsed - started
+        event.construct_seconds = time.perf_counter() - parsed
+        return result
+
+    @classmethod
+    def _iter_country_list(cls, resource, term="", filters=None):
+        """Like `_get_country_list`, but yields the countries one at a time while the response is being read.
+
+        The response is decoded incrementally, so the whole body and the whole list of countries are never held in
+        memory at once. Streamed responses are neither stored in nor served from the disk cache.
+        """
+        if cls.backend is not None:
+            result = cls.backend.query(resource, term, filters)
+        else:
+            result = cls._get_cached(cls._cache_key(resource, term, filters))
+        if result is not MISSING:
+            if type(result) == list:
+                yield from result
+            else:
+                yield result
+            return
+
+        uri = cls._build_uri(resource, term, filters)
+        response = cls._send(uri, stream=True)
+        try:
+            if response.status_code != 200:
+                cls._parse_response(response.status_code, response.content)
+            country_class = cls._country_class_for(filters)
+            for country_data in iter_json_array(
+                response.iter_content(chunk_size=cls.STREAM_CHUNK_SIZE)
+            ):
+                yield country_class(country_data)
+        finally:
+            response.close()
+
+    @classmethod
+    def iter_all(cls, filters=None):
+        """Yields all countries one at a time, without holding all of them in memory.
+
+        :param filters - a list of fields to filter the output of the request to include only the specified fields.
+        """
+        resource = "/all"
+        return cls._iter_country_list(resource, filters=filters)
 
     @classmethod
     def get_all(cls, filters=None):
@@ -121,6 +469,93 @@ class RestCountryApiV2:
         codes = cls.QUERY_SEPARATOR.join(codes)
         return cls._get_country_list(resource, codes, filters=filters)
 
+    @classmethod
+    def bulk_get_by_codes(cls, codes, filters=None):
+        """Returns the countries of many alpha codes with as few requests as possible.
+
+        Codes are de-duplicated, codes already in the cache are not requested again and the others are requested in
+        chunks of `/alpha?codes=` that keep every URI shorter than MAX_URI_LENGTH. The chunks are requested in
+        parallel.
+        :param codes - iterable of alpha2 or alpha3 codes. E.g. ['de', 'FRA']
+        :param filters - a list of fields to filter the output of the request to include only the specified fields.
+        alpha2Code and alpha3Code are always requested as well.
+        :returns: dict of code to Country in the order of codes, the value is None if no country has the code
+        """
+        codes, found, chunks, chunk_filters = cls._plan_bulk(codes, filters)
+
+        def fetch(chunk):
+            try:
+                return cls._fetch_bulk_chunk(chunk, chunk_filters)
+            except requests.exceptions.InvalidURL:
+                return []
+
+        if len(chunks) == 1:
+            results = [fetch(chunks[0])]
+        elif chunks:
+            with ThreadPoolExecutor(max_workers=cls.BULK_MAX_WORKERS) as executor:
+                results = list(executor.map(fetch, chunks))
+        else:
+            results = []
+        for chunk, countries in zip(chunks, results):
+            cls._apply_bulk_chunk(chunk, countries, found, filters)
+        return {code: found.get(code.strip().upper()) for code in codes}
+
+    @classmethod
+    def _plan_bulk(cls, codes, filters):
+        """Splits the codes of `bulk_get_by_codes` into cached countries and chunks that have to be requested.
+
+        :returns: a tuple (de-duplicated codes, dict of normalized code to cached Country, list of chunks,
+        filters for the chunk requests)
+        """
+        codes = list(dict.fromkeys(codes))
+        chunk_filters = None
+        if filters:
+            chunk_filters = list(filters) + [
+                field for field in ("alpha2Code", "alpha3Code") if field not in filters
+            ]
+        found = {}
+        chunks = []
+        chunk = []
+        base_length = len(cls._build_uri("/alpha?codes=", "", chunk_filters))
+        length = base_length
+        for code in dict.fromkeys(code.strip().upper() for code in codes):
+            cached = cls._get_cached(cls._cache_key("/alpha", code, filters))
+            if cached is not MISSING:
+                found[code] = cached
+                continue
+            code_length = len(code) + len(cls.QUERY_SEPARATOR)
+            if chunk and length + code_length > cls.MAX_URI_LENGTH:
+                chunks.append(chunk)
+                chunk = []
+                length = base_length
+            chunk.append(code)
+            length += code_length
+        if chunk:
+            chunks.append(chunk)
+        return codes, found, chunks, chunk_filters
+
+    @classmethod
+    def _fetch_bulk_chunk(cls, chunk, filters):
+        resource = "/alpha?codes="
+        term = cls.QUERY_SEPARATOR.join(chunk)
+        if cls.backend is not None:
+            return cls.backend.query(resource, term, filters)
+        status_code, body = cls._fetch(cls._build_uri(resource, term, filters))
+        return cls._parse_response(status_code, body, filters=filters)
+
+    @classmethod
+    def _apply_bulk_chunk(cls, chunk, countries, found, filters):
+        by_code = {}
+        for country in countries:
+            for code in (country.alpha2_code, country.alpha3_code):
+                if code:
+                    by_code[code.upper()] = country
+        for code in chunk:
+            country = by_code.get(code)
+            if country is not None:
+                found[code] = country
+                cls._set_cached(cls._cache_key("/alpha", code, filters), country)
+
     @classmethod
     def get_countries_by_currency(cls, currency, filters=None):
         """Returns a list of countries.
@@ -166,10 +601,60 @@ class RestCountryApiV2:
         return cls._get_country_list(resource, capital, filters=filters)
 
 
-class Country:
+# json keys of the API and the attribute names of a Country
+COUNTRY_FIELDS = (
+    ("topLevelDomain", "top_level_domain"),
+    ("alpha2Code", "alpha2_code"),
+    ("alpha3Code", "alpha3_code"),
+    ("currencies", "currencies"),
+    ("capital", "capital"),
+    ("callingCodes", "calling_codes"),
+    ("altSpellings", "alt_spellings"),
+    ("relevance", "relevance"),
+    ("region", "region"),
+    ("subregion", "subregion"),
+    ("translations", "translations"),
+    ("population", "population"),
+    ("latlng", "latlng"),
+    ("demonym", "demonym"),
+    ("area", "area"),
+    ("gini", "gini"),
+    ("timezones", "timezones"),
+    ("borders", "borders"),
+    ("nativeName", "native_name"),
+    ("name", "name"),
+    ("numericCode", "numeric_code"),
+    ("languages", "languages"),
+    ("flag", "flag"),
+    ("regionalBlocs", "regional_blocs"),
+    ("cioc", "cioc"),
+)
+
+
+class BaseCountry:
+    """Comparison and representation shared by all country classes."""
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        assert isinstance(other, BaseCountry)
+        return self.numeric_code == other.numeric_code
+
+    def __lt__(self, other):
+        assert isinstance(other, BaseCountry)
+        return self.numeric_code < other.numeric_code
+
+    def __hash__(self):
+        return int(self.numeric_code)
+
     def __str__(self):
-        return "{}".format(self.name)
+        return "<{} | {}>".format(self.name, self.alpha3_code)
+
+    def __repr__(self):
+        return "<{} | {}>".format(self.name, self.alpha3_code)
+
 
+class Country(BaseCountry):
     def __init__(self, country_data):
         self.top_level_domain = country_data.get("topLevelDomain")
         self.alpha2_code = country_data.get("alpha2Code")
@@ -197,19 +682,6 @@ class Country:
         self.regional_blocs = country_data.get("regionalBlocs")
         self.cioc = country_data.get("cioc")
 
-    def __eq__(self, other):
-        assert isinstance(other, Country)
-        return self.numeric_code == other.numeric_code
 
-    def __lt__(self, other):
-        assert isinstance(other, Country)
-        return self.numeric_code < other.numeric_code
-
-    def __hash__(self):
-        return int(self.numeric_code)
-
-    def __str__(self):
-        return "<{} | {}>".format(self.name, self.alpha3_code)
-
-    def __repr__(self):
-        return "<{} | {}>".format(self.name, self.alpha3_code)
+RestCountryApiV2.country_class = Country
+RestCountryApiV2.json_backend = get_json_backend()
@@ -0,0 +1,145 @@
+import concurrent.futures
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from restcountries.base import RestCountryApiV2
+
+
+class QueryResult:
+    """Outcome of one query of a batch, either a value or the exception the query raised."""
+
+    __slots__ = ("spec", "value", "error", "seconds")
+
+    def __init__(self, spec, value=None, error=None, seconds=None):
+        self.spec = spec
+        self.value = value
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def get(self):
+        """Returns the value of the query or raises its exception."""
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def __repr__(self):
+        if self.error is not None:
+            return "<QueryResult {!r} error={!r}>".format(self.spec, self.error)
+        return "<QueryResult {!r}>".format(self.spec)
+
+
+class QueryBatch:
+    """Runs several lookups of different kinds concurrently on a bounded thread pool.
+
+    All queries use the shared pooled session of the api class, so the total latency is close to the one of the
+    slowest query instead of the sum of all:
+    >>> batch = QueryBatch()
+    >>> batch.add("get_country_by_country_code", "de")
+    >>> batch.add("get_countries_by_currency", "eur", filters=["name"])
+    >>> germany, euro_countries = [result.get() for result in batch.run(timeout=5)]
+    """
+
+    def __init__(self, api=RestCountryApiV2, max_workers=None):
+        """
+        :param api - class the lookups are made with, e.g. RestCountryApiV2 or a subclass of it.
+        :param max_workers - number of queries running at once, by default the pool size of the shared session so
+        no connection has to be opened and discarded again.
+        """
+        self.api = api
+        self.max_workers = max_workers
+        self.specs = []
+
+    def add(self, method, args=(), filters=None):
+        """Adds a query to the batch.
+
+        :param method - name of a lookup method of the api class, e.g. 'get_countries_by_language', or a callable.
+        :param args - tuple of the positional arguments of the lookup, a single argument does not need to be in a tuple.
+        :param filters - a list of fields to filter the output of the request to include only the specified fields.
+        :returns: the position of the query's result in the list returned by `run`
+        """
+        if not isinstance(args, tuple):
+            args = (args,)
+        self._resolve(method)
+        self.specs.append((method, args, filters))
+        return len(self.specs) - 1
+
+    def _resolve(self, method):
+        if callable(method):
+            return method
+        if not isinstance(method, str) or not (
+            method.startswith("get_") or method == "bulk_get_by_codes"
+        ):
+            raise ValueError("{!r} is not a lookup method".format(method))
+        try:
+            return getattr(self.api, method)
+        except AttributeError:
+            raise ValueError("{!r} is not a lookup method".format(method))
+
+    def _call(self, spec):
+        method, args, filters = spec
+        lookup = self._resolve(method)
+        started = time.perf_counter()
+        try:
+            if filters is None:
+                value = lookup(*args)
+            else:
+                value = lookup(*args, filters=filters)
+        except Exception as e:
+            return QueryResult(spec, error=e, seconds=time.perf_counter() - started)
+        return QueryResult(spec, value=value, seconds=time.perf_counter() - started)
+
+    def run(self, timeout=None):
+        """Runs all queries and waits for them.
+
+        A failing query does not affect the others, its exception is stored in its result.
+        :param timeout - seconds to wait for all queries together. Queries that did not finish in time get a
+        `concurrent.futures.TimeoutError` as error, queries that did not start yet are cancelled.
+        :returns: a list of QueryResult, in the order the queries were added
+        """
+        specs = list(self.specs)
+        if not specs:
+            return []
+        if len(specs) == 1 and timeout is None:
+            return [self._call(specs[0])]
+        max_workers = min(self.max_workers or self.api.POOL_MAXSIZE, len(specs))
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [executor.submit(self._call, spec) for spec in specs]
+            concurrent.futures.wait(futures, timeout=timeout)
+            results = []
+            for spec, future in zip(specs, futures):
+                if future.done():
+                    results.append(future.result())
+                else:
+                    future.cancel()
+                    results.append(
+                        QueryResult(
+                            spec,
+                            error=concurrent.futures.TimeoutError(
+                                "Query did not finish within {} seconds".format(timeout)
+                            ),
+                        )
+                    )
+            return results
+        finally:
+            # queries still running after the deadline finish in the background
+            executor.shutdown(wait=False)
+
+
+def map_queries(specs, api=RestCountryApiV2, max_workers=None, timeout=None):
+    """Runs lookups concurrently and returns their results in order, see `QueryBatch`.
+
+    :param specs - iterable of (method, args, filters) tuples, e.g. ("get_countries_by_language", ("de",), None)
+    :param api - class the lookups are made with.
+    :param max_workers - number of queries running at once, by default the pool size of the shared session.
+    :param timeout - seconds to wait for all queries together.
+    :returns: a list of QueryResult
+    """
+    batch = QueryBatch(api=api, max_workers=max_workers)
+    for method, args, filters in specs:
+        batch.add(method, args, filters)
+    return batch.run(timeout=timeout)
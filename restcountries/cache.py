@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe in-memory cache with LRU eviction and optional TTL expiry.
+
+    Assign an instance to `RestCountryApiV2.cache` to cache the results of all lookups:
+    >>> RestCountryApiV2.cache = LRUCache(maxsize=512, ttl=3600)
+    """
+
+    def __init__(self, maxsize=256, ttl=None, timer=time.monotonic, max_stale=0):
+        """
+        :param maxsize - maximum number of entries, the least recently used entry is evicted when it is exceeded.
+        :param ttl - seconds an entry stays valid, None means entries never expire.
+        :param timer - clock used for expiry, mainly useful for testing.
+        :param max_stale - seconds an expired entry is kept, so `get_stale` can still return it, e.g. while the API
+        is unavailable.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.max_stale = max_stale
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Returns the cached value for key or default if it is missing or expired."""
+        with self._lock:
+            entry = self._data.get(key, MISSING)
+            if entry is not MISSING:
+                expires_at, value = entry
+                now = self.timer()
+                if expires_at is None or now < expires_at:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                if now >= expires_at + self.max_stale:
+                    del self._data[key]
+                    self.expirations += 1
+            self.misses += 1
+            return default
+
+    def get_stale(self, key, default=None):
+        """Returns the cached value for key even if it expired less than max_stale seconds ago."""
+        with self._lock:
+            entry = self._data.get(key, MISSING)
+            if entry is not MISSING:
+                expires_at, value = entry
+                if expires_at is None or self.timer() < expires_at + self.max_stale:
+                    return value
+            return default
+
+    def set(self, key, value):
+        """Stores value under key, evicting the least recently used entries if the cache is full."""
+        expires_at = None if self.ttl is None else self.timer() + self.ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=MISSING):
+        """Removes key from the cache, or every entry if no key is given."""
+        with self._lock:
+            if key is MISSING:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self):
+        """Returns the counters of the cache as a dict."""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self):
+        return len(self._data)
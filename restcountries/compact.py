@@ -0,0 +1,138 @@
+import json
+import sys
+import threading
+from types import MappingProxyType
+
+from restcountries.base import COUNTRY_FIELDS, BaseCountry
+
+# attributes holding nested lists and dicts, they are kept encoded until one of them is accessed
+NESTED_FIELDS = (
+    ("currencies", "currencies"),
+    ("languages", "languages"),
+    ("translations", "translations"),
+    ("regionalBlocs", "regional_blocs"),
+)
+SCALAR_FIELDS = tuple(field for field in COUNTRY_FIELDS if field not in NESTED_FIELDS)
+
+_shared_values = {}
+_shared_values_lock = threading.Lock()
+
+
+def _share(key, value):
+    shared = _shared_values.get(key)
+    if shared is None:
+        with _shared_values_lock:
+            shared = _shared_values.setdefault(key, value)
+    return shared
+
+
+def freeze(value):
+    """Returns an immutable version of a decoded json value, identical values share one object.
+
+    Dicts become read-only mappings, lists become tuples and strings are interned.
+    :returns: a tuple (frozen value, hashable key of the value)
+    """
+    value_type = type(value)
+    if value_type is str:
+        value = sys.intern(value)
+        return value, value
+    if value_type is list:
+        if all(type(item) is str for item in value):
+            # fast path for the many lists of strings, the tuple is its own key
+            frozen = tuple([sys.intern(item) for item in value])
+            key = (list, frozen)
+            return _share(key, frozen), key
+        items = [freeze(item) for item in value]
+        key = (list, tuple([item_key for _, item_key in items]))
+        return _share(key, tuple([item for item, _ in items])), key
+    if value_type is dict:
+        items = [(sys.intern(name), freeze(item)) for name, item in value.items()]
+        key = (dict, tuple([(name, item_key) for name, (_, item_key) in items]))
+        frozen = _shared_values.get(key)
+        if frozen is None:
+            frozen = _share(
+                key, MappingProxyType({name: item for name, (item, _) in items})
+            )
+        return frozen, key
+    return value, (value_type, value)
+
+
+def clear_shared_values():
+    """Forgets the values shared between countries, e.g. after a new dataset was loaded."""
+    with _shared_values_lock:
+        _shared_values.clear()
+
+
+class CompactCountry(BaseCountry):
+    """Memory efficient, read-only alternative to `Country`.
+
+    Attributes are stored in slots instead of a per-instance dict. Strings are interned, and lists and dicts are
+    replaced by tuples and read-only mappings that are shared by all countries with an identical value (e.g. the
+    currency record of the Euro). The nested attributes `currencies`, `languages`, `translations` and
+    `regional_blocs` are kept as a compact encoded string and only decoded when one of them is first accessed.
+
+    Creating a CompactCountry takes longer than creating a Country, it is meant for countries that are kept around,
+    e.g. in caches. Use it for all lookups with:
+    >>> RestCountryApiV2.country_class = CompactCountry
+    """
+
+    __slots__ = (
+        tuple(attribute for _, attribute in SCALAR_FIELDS)
+        + tuple("_" + attribute for _, attribute in NESTED_FIELDS)
+        + ("_nested",)
+    )
+
+    def __init__(self, country_data):
+        for key, attribute in SCALAR_FIELDS:
+            value = country_data.get(key)
+            if value is not None:
+                value, _ = freeze(value)
+            object.__setattr__(self, attribute, value)
+        nested = [country_data.get(key) for key, _ in NESTED_FIELDS]
+        object.__setattr__(
+            self,
+            "_nested",
+            json.dumps(nested, ensure_ascii=False, separators=(",", ":")),
+        )
+
+    def _decode_nested(self):
+        nested = self._nested
+        if nested is not None:
+            for (_, attribute), value in zip(NESTED_FIELDS, json.loads(nested)):
+                object.__setattr__(self, "_" + attribute, freeze(value)[0])
+            object.__setattr__(self, "_nested", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompactCountry objects are read-only")
+
+    def to_dict(self):
+        """Returns the data of the country with the json keys of the API."""
+        return {
+            key: _thaw(getattr(self, attribute)) for key, attribute in COUNTRY_FIELDS
+        }
+
+    def __reduce__(self):
+        return self.__class__, (self.to_dict(),)
+
+
+def _thaw(value):
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _nested_property(attribute):
+    slot = "_" + attribute
+
+    def getter(self):
+        if self._nested is not None:
+            self._decode_nested()
+        return getattr(self, slot)
+
+    return property(getter)
+
+
+for _, _attribute in NESTED_FIELDS:
+    setattr(CompactCountry, _attribute, _nested_property(_attribute))
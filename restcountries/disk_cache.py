@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class DiskCacheEntry:
+    """A cached response body together with its HTTP validators."""
+
+    def __init__(self, uri, body, etag=None, last_modified=None, stored_at=0.0):
+        self.uri = uri
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+    def age(self, now=None):
+        return (time.time() if now is None else now) - self.stored_at
+
+    def conditional_headers(self):
+        """Returns the headers to revalidate the entry with the server."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class DiskCache:
+    """Persistent cache of raw API responses, revalidated with ETag / Last-Modified.
+
+    Every response is stored as two files in `directory`: the body and a small json file with the validators. Entries
+    younger than `max_age` seconds are used without contacting the server. Older entries are revalidated with
+    `If-None-Match` / `If-Modified-Since`, a `304 Not Modified` answer counts as a hit. Assign an instance to
+    `RestCountryApiV2.disk_cache` to enable it:
+    >>> RestCountryApiV2.disk_cache = DiskCache("/var/cache/restcountries", max_age=3600)
+    """
+
+    BODY_SUFFIX = ".body"
+    META_SUFFIX = ".json"
+
+    def __init__(self, directory, max_size=50 * 1024 * 1024, max_age=0):
+        """
+        :param directory - directory to store the responses in, it is created if it does not exist.
+        :param max_size - maximum total size of the stored bodies in bytes, the least recently used entries are
+        removed when it is exceeded.
+        :param max_age - seconds a stored response is used without revalidating it with the server.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.max_age = max_age
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, uri):
+        return os.path.join(
+            self.directory, hashlib.sha256(uri.encode("utf-8")).hexdigest()
+        )
+
+    def get(self, uri):
+        """Returns the DiskCacheEntry stored for uri or None."""
+        path = self._path(uri)
+        try:
+            with open(path + self.META_SUFFIX, "r") as meta_file:
+                meta = json.load(meta_file)
+            with open(path + self.BODY_SUFFIX, "rb") as body_file:
+                body = body_file.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get("uri") != uri or meta.get("size") != len(body):
+            # hash collision or an entry that was only partially written
+            return None
+        return DiskCacheEntry(
+            uri,
+            body,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            stored_at=meta.get("stored_at", 0.0),
+        )
+
+    def is_fresh(self, entry):
+        """Returns True if the entry may be used without revalidation."""
+        return entry.age() < self.max_age
+
+    def lookup(self, uri):
+        """Looks up the stored response for uri before a request is sent.
+
+        :returns: a tuple (entry, headers). If headers is None the entry is fresh and can be used without a request,
+        otherwise the request should be sent with these headers.
+        """
+        entry = self.get(uri)
+        if entry is None:
+            return None, {}
+        if self.is_fresh(entry):
+            with self._lock:
+                self.hits += 1
+                try:
+                    # keep the modification time as the last access for the eviction
+                    os.utime(self._path(uri) + self.BODY_SUFFIX)
+                except OSError:
+                    pass
+            return entry, None
+        return entry, entry.conditional_headers()
+
+    def update(self, uri, entry, status_code, body, headers):
+        """Updates the cache with the response to a request sent after `lookup`.
+
+        :returns: a tuple (status_code, body), a `304 Not Modified` response is replaced by the stored response.
+        """
+        if status_code == 304 and entry is not None:
+            with self._lock:
+                self.revalidations += 1
+            self.touch(entry)
+            return 200, entry.body
+        with self._lock:
+            self.misses += 1
+        if status_code == 200:
+            self.set(uri, body, headers)
+        return status_code, body
+
+    def set(self, uri, body, headers=None):
+        """Stores a response body and the validators found in its headers."""
+        headers = headers or {}
+        entry = DiskCacheEntry(
+            uri,
+            body,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            stored_at=time.time(),
+        )
+        path = self._path(uri)
+        with self._lock:
+            self._write(path + self.BODY_SUFFIX, body)
+            self._write_meta(path, entry)
+            self._evict()
+        return entry
+
+    def touch(self, entry):
+        """Marks a revalidated entry as fresh again."""
+        entry.stored_at = time.time()
+        path = self._path(entry.uri)
+        with self._lock:
+            self._write_meta(path, entry)
+            try:
+                os.utime(path + self.BODY_SUFFIX)
+            except OSError:
+                pass
+
+    def clear(self):
+        """Removes all stored responses."""
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if name.endswith((self.BODY_SUFFIX, self.META_SUFFIX)):
+                    self._remove(os.path.join(self.directory, name))
+
+    def size(self):
+        """Returns the total size of the stored bodies in bytes."""
+        return sum(size for _, size, _ in self._bodies())
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "size": self.size(),
+        }
+
+    def _write_meta(self, path, entry):
+        meta = {
+            "uri": entry.uri,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "stored_at": entry.stored_at,
+            "size": len(entry.body),
+        }
+        self._write(path + self.META_SUFFIX, json.dumps(meta).encode("utf-8"))
+
+    def _write(self, path, data):
+        # write to a temporary file first, so readers never see a partially written file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+
+    def _bodies(self):
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(self.BODY_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    yield entry.path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        bodies = sorted(self._bodies(), key=lambda body: body[2])
+        total_size = sum(size for _, size, _ in bodies)
+        for body_path, size, _ in bodies:
+            if total_size <= self.max_size:
+                break
+            self._remove(body_path)
+            self._remove(body_path[: -len(self.BODY_SUFFIX)] + self.META_SUFFIX)
+            total_size -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
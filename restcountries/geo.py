@@ -0,0 +1,248 @@
+import heapq
+import math
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+# mean radius of the earth in kilometres
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_unit_vector(lat, lng):
+    """Returns the point on the unit sphere of a latitude and longitude in degrees."""
+    lat, lng = math.radians(lat), math.radians(lng)
+    cos_lat = math.cos(lat)
+    return (cos_lat * math.cos(lng), cos_lat * math.sin(lng), math.sin(lat))
+
+
+def _chord_to_km(chord):
+    # length of the arc under a chord of the unit sphere
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def _km_to_chord(km):
+    return 2 * math.sin(min(math.pi, km / EARTH_RADIUS_KM) / 2)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Returns the great-circle distance in kilometres between two points in degrees."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoIndex:
+    """Index of the `latlng` of countries for nearest-country and radius queries.
+
+    The coordinates are stored as points on the unit sphere in a k-d tree. The straight-line distance between two
+    such points grows with their great-circle distance, so the tree answers queries without computing a haversine
+    per country. Countries without coordinates are not indexed.
+    >>> index = GeoIndex(LocalDataset.from_api().countries)
+    >>> index.nearest(48.85, 2.35, k=3)
+    [(<France | FRA>, 197.9), (<Belgium | BEL>, 261.6), (<Luxembourg | LUX>, 289.2)]
+    """
+
+    def __init__(self, countries):
+        """
+        :param countries - countries with a `latlng` attribute, e.g. the countries of a LocalDataset.
+        """
+        self.countries = []
+        points = []
+        for country in countries:
+            latlng = getattr(country, "latlng", None)
+            if latlng and len(latlng) == 2:
+                self.countries.append(country)
+                points.append(to_unit_vector(*latlng))
+        self._points = points
+        # nodes of the tree as (position, axis, left node, right node), -1 marks a missing child
+        self._nodes = []
+        self._root = self._build(list(range(len(points))), 0)
+        self._matrix = (
+            numpy.array(points, dtype=numpy.float64).reshape(-1, 3) if numpy else None
+        )
+
+    def __len__(self):
+        return len(self.countries)
+
+    def _build(self, positions, depth):
+        if not positions:
+            return -1
+        axis = depth % 3
+        positions.sort(key=lambda position: self._points[position][axis])
+        middle = len(positions) // 2
+        node = len(self._nodes)
+        self._nodes.append(None)
+        left = self._build(positions[:middle], depth + 1)
+        right = self._build(positions[middle + 1 :], depth + 1)
+        self._nodes[node] = (positions[middle], axis, left, right)
+        return node
+
+    def _nearest_positions(self, point, k):
+        if k < 1:
+            return []
+        # max-heap of the k closest points so far, as (-squared chord, position)
+        heap = []
+        stack = [self._root]
+        points = self._points
+        nodes = self._nodes
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+            position, axis, left, right = nodes[node]
+            candidate = points[position]
+            squared = (
+                (point[0] - candidate[0]) ** 2
+                + (point[1] - candidate[1]) ** 2
+                + (point[2] - candidate[2]) ** 2
+            )
+            if len(heap) < k:
+                heapq.heappush(heap, (-squared, position))
+            elif squared < -heap[0][0]:
+                heapq.heapreplace(heap, (-squared, position))
+            difference = point[axis] - candidate[axis]
+            near, far = (left, right) if difference < 0 else (right, left)
+            # the far side can only hold closer points if the splitting plane is closer than the worst match
+            if len(heap) < k or difference * difference < -heap[0][0]:
+                stack.append(far)
+            stack.append(near)
+        return sorted((-squared, position) for squared, position in heap)
+
+    def nearest(self, lat, lng, k=1):
+        """Returns the k countries closest to a point.
+
+        :param lat, lng - the point in degrees
+        :returns: a list of (country, distance in km), the closest first
+        """
+        if k < 1:
+            return []
+        found = self._nearest_positions(to_unit_vector(lat, lng), k)
+        return [
+            (self.countries[position], _chord_to_km(math.sqrt(squared)))
+            for squared, position in found
+        ]
+
+    def _within_positions(self, point, radius):
+        limit = radius * radius
+        found = []
+        stack = [self._root]
+        points = self._points
+        nodes = self._nodes
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+            position, axis, left, right = nodes[node]
+            candidate = points[position]
+            squared = (
+                (point[0] - candidate[0]) ** 2
+                + (point[1] - candidate[1]) ** 2
+                + (point[2] - candidate[2]) ** 2
+            )
+            if squared <= limit:
+                found.append((squared, position))
+            difference = point[axis] - candidate[axis]
+            if difference <= radius:
+                stack.append(left)
+            if difference >= -radius:
+                stack.append(right)
+        found.sort()
+        return found
+
+    def within(self, lat, lng, radius_km):
+        """Returns the countries whose coordinates are at most radius_km from a point.
+
+        :returns: a list of (country, distance in km), the closest first
+        """
+        found = self._within_positions(
+            to_unit_vector(lat, lng), _km_to_chord(radius_km)
+        )
+        return [
+            (self.countries[position], _chord_to_km(math.sqrt(squared)))
+            for squared, position in found
+        ]
+
+    def nearest_many(self, points, k=1):
+        """Answers `nearest` for many points at once.
+
+        With numpy the distances of all points to all countries are computed as one matrix product.
+        :param points - sequence or array of (lat, lng) pairs in degrees
+        :returns: a tuple (distances in km, positions in `countries`), both of shape (len(points), k), closest first.
+        They are numpy arrays if numpy is installed, otherwise lists of lists.
+        """
+        k = max(0, min(k, len(self.countries)))
+        if numpy is None:
+            distances, positions = [], []
+            for lat, lng in points:
+                found = self._nearest_positions(to_unit_vector(lat, lng), k)
+                distances.append([_chord_to_km(math.sqrt(s)) for s, _ in found])
+                positions.append([position for _, position in found])
+            return distances, positions
+
+        squared = self._squared_chords(points)
+        if k < squared.shape[1]:
+            candidates = numpy.argpartition(squared, k - 1, axis=1)[:, :k]
+        else:
+            candidates = numpy.broadcast_to(
+                numpy.arange(squared.shape[1]), squared.shape
+            )
+        candidate_squared = numpy.take_along_axis(squared, candidates, axis=1)
+        order = numpy.argsort(candidate_squared, axis=1, kind="stable")
+        positions = numpy.take_along_axis(candidates, order, axis=1)
+        squared = numpy.take_along_axis(candidate_squared, order, axis=1)
+        return self._chords_to_km(squared), positions
+
+    def within_many(self, points, radius_km):
+        """Answers `within` for many points at once.
+
+        :returns: a list with a list of (position in `countries`, distance in km) per point, closest first
+        """
+        radius = _km_to_chord(radius_km)
+        if numpy is None:
+            return [
+                [
+                    (position, _chord_to_km(math.sqrt(squared)))
+                    for squared, position in self._within_positions(
+                        to_unit_vector(lat, lng), radius
+                    )
+                ]
+                for lat, lng in points
+            ]
+        squared = self._squared_chords(points)
+        distances = self._chords_to_km(squared)
+        results = []
+        for row_squared, row_distances in zip(squared, distances):
+            (positions,) = numpy.nonzero(row_squared <= radius * radius)
+            positions = positions[numpy.argsort(row_squared[positions], kind="stable")]
+            results.append(
+                [
+                    (int(position), float(row_distances[position]))
+                    for position in positions
+                ]
+            )
+        return results
+
+    def _squared_chords(self, points):
+        coordinates = numpy.radians(
+            numpy.asarray(points, dtype=numpy.float64).reshape(-1, 2)
+        )
+        lat, lng = coordinates[:, 0], coordinates[:, 1]
+        cos_lat = numpy.cos(lat)
+        vectors = numpy.stack(
+            (cos_lat * numpy.cos(lng), cos_lat * numpy.sin(lng), numpy.sin(lat)), axis=1
+        )
+        # |a - b|^2 = 2 - 2 a.b for unit vectors
+        return numpy.maximum(0.0, 2.0 - 2.0 * vectors @ self._matrix.T)
+
+    @staticmethod
+    def _chords_to_km(squared):
+        return (
+            2
+            * EARTH_RADIUS_KM
+            * numpy.arcsin(numpy.minimum(1.0, numpy.sqrt(squared) / 2))
+        )
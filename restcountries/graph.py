@@ -0,0 +1,289 @@
+import hashlib
+import heapq
+import json
+import os
+import sys
+import tempfile
+from array import array
+from collections import deque
+
+from restcountries.geo import haversine_km
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+# hop distance of countries without a land route between them in the hop matrix
+UNREACHABLE = -1
+
+
+class BorderGraph:
+    """Graph of the land borders between countries, built once from the `borders` of a snapshot.
+
+    Border walks, shortest land routes and landmasses are answered in memory instead of with one
+    `get_country_by_country_code` call per hop. Countries are identified by their alpha3 code, alpha2 codes are
+    accepted as well.
+    >>> graph = BorderGraph.from_dataset(LocalDataset.from_api())
+    >>> graph.route("PRT", "POL")
+    ['PRT', 'ESP', 'FRA', 'DEU', 'POL']
+    >>> graph.neighbourhood("CHE", 1)
+    {'AUT': 1, 'FRA': 1, 'ITA': 1, 'LIE': 1, 'DEU': 1}
+    """
+
+    def __init__(self, records, countries=None):
+        """
+        :param records - list of country dicts as returned by the /all endpoint.
+        :param countries - optional country objects in the same order as records, returned by `country`.
+        """
+        self.codes = []
+        self._positions = {}
+        self._latlng = []
+        for record in records:
+            code = (record.get("alpha3Code") or "").upper()
+            if not code or code in self._positions:
+                continue
+            self._positions[code] = len(self.codes)
+            alpha2 = (record.get("alpha2Code") or "").upper()
+            if alpha2:
+                self._positions.setdefault(alpha2, len(self.codes))
+            self.codes.append(code)
+            self._latlng.append(record.get("latlng") or None)
+        self._countries = list(countries) if countries is not None else None
+
+        # borders are listed by both countries, but one missing entry must not make the graph directed
+        neighbours = [set() for _ in self.codes]
+        for record in records:
+            source = self._positions.get((record.get("alpha3Code") or "").upper())
+            if source is None:
+                continue
+            for border in record.get("borders") or []:
+                target = self._positions.get(border.upper())
+                if target is not None and target != source:
+                    neighbours[source].add(target)
+                    neighbours[target].add(source)
+        self._adjacency = [tuple(sorted(positions)) for positions in neighbours]
+        self._matrix = None
+
+    @classmethod
+    def from_dataset(cls, dataset):
+        """Builds the graph from the snapshot of a `LocalDataset`."""
+        return cls(dataset.records, dataset.countries)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return str(code).strip().upper() in self._positions
+
+    def _position(self, code):
+        try:
+            return self._positions[str(code).strip().upper()]
+        except KeyError:
+            raise KeyError("unknown country code {!r}".format(code)) from None
+
+    def country(self, code):
+        """Returns the country object of the code, if the graph was built with countries."""
+        if self._countries is None:
+            raise ValueError("the graph was built without countries")
+        return self._countries[self._position(code)]
+
+    def neighbours(self, code):
+        """Returns the alpha3 codes of the countries sharing a border with the country."""
+        return [
+            self.codes[position] for position in self._adjacency[self._position(code)]
+        ]
+
+    def edge_count(self):
+        return sum(len(positions) for positions in self._adjacency) // 2
+
+    def _bfs(self, source, max_hops=None):
+        # hop distance of every position reachable from source
+        hops = {source: 0}
+        queue = deque([source])
+        adjacency = self._adjacency
+        while queue:
+            position = queue.popleft()
+            distance = hops[position] + 1
+            if max_hops is not None and distance > max_hops:
+                continue
+            for neighbour in adjacency[position]:
+                if neighbour not in hops:
+                    hops[neighbour] = distance
+                    queue.append(neighbour)
+        return hops
+
+    def neighbourhood(self, code, k=1):
+        """Returns the countries at most k border crossings away.
+
+        :returns: a dict of alpha3 code to the number of crossings, without the country itself
+        """
+        source = self._position(code)
+        return {
+            self.codes[position]: distance
+            for position, distance in self._bfs(source, k).items()
+            if position != source
+        }
+
+    def hops(self, source, target):
+        """Returns the least number of border crossings between two countries, or None without a land route."""
+        source, target = self._position(source), self._position(target)
+        if self._matrix is not None:
+            distance = int(self._matrix[source][target])
+            return None if distance == UNREACHABLE else distance
+        return self._bfs(source).get(target)
+
+    def route(self, source, target, weight=None):
+        """Returns a shortest land route between two countries.
+
+        :param weight - None to minimize the number of border crossings, 'distance' to minimize the great-circle
+        distance between the centres of the countries on the route, or a function (alpha3, alpha3) -> cost of
+        crossing from the first country into the second.
+        :returns: list of alpha3 codes from source to target, or None if there is no land route.
+        """
+        source, target = self._position(source), self._position(target)
+        if weight is None:
+            previous = self._bfs_tree(source, target)
+        else:
+            if weight == "distance":
+                weight = self._centre_distance
+            previous = self._dijkstra_tree(source, target, weight)
+        if target not in previous:
+            return None
+        path = [target]
+        while path[-1] != source:
+            path.append(previous[path[-1]])
+        return [self.codes[position] for position in reversed(path)]
+
+    def _bfs_tree(self, source, target):
+        previous = {source: source}
+        queue = deque([source])
+        while queue and target not in previous:
+            position = queue.popleft()
+            for neighbour in self._adjacency[position]:
+                if neighbour not in previous:
+                    previous[neighbour] = position
+                    queue.append(neighbour)
+        return previous
+
+    def _dijkstra_tree(self, source, target, weight):
+        previous = {source: source}
+        costs = {source: 0.0}
+        done = set()
+        heap = [(0.0, source)]
+        codes = self.codes
+        while heap:
+            cost, position = heapq.heappop(heap)
+            if position in done:
+                continue
+            if position == target:
+                break
+            done.add(position)
+            for neighbour in self._adjacency[position]:
+                candidate = cost + weight(codes[position], codes[neighbour])
+                if candidate < costs.get(neighbour, float("inf")):
+                    costs[neighbour] = candidate
+                    previous[neighbour] = position
+                    heapq.heappush(heap, (candidate, neighbour))
+        return previous
+
+    def _centre_distance(self, source, target):
+        source_latlng = self._latlng[self._positions[source]]
+        target_latlng = self._latlng[self._positions[target]]
+        if not source_latlng or not target_latlng:
+            return 0.0
+        return haversine_km(*source_latlng, *target_latlng)
+
+    def components(self):
+        """Returns the landmasses, the sets of alpha3 codes connected by land borders, the largest first.
+
+        Islands without land borders are components of their own.
+        """
+        seen = set()
+        components = []
+        for position in range(len(self.codes)):
+            if position in seen:
+                continue
+            reachable = self._bfs(position)
+            seen.update(reachable)
+            components.append({self.codes[member] for member in reachable})
+        components.sort(key=lambda component: (-len(component), min(component)))
+        return components
+
+    def hop_matrix(self, path=None):
+        """Computes the number of border crossings between all pairs of countries.
+
+        The matrix is kept, so `hops` becomes a lookup. Rows and columns are in the order of `codes`, pairs without a
+        land route are UNREACHABLE. It is a numpy int16 array if numpy is installed, a list of `array('h')` rows
+        otherwise.
+        :param path - optional file the matrix is cached in. It is reused as long as the borders did not change.
+        """
+        digest = self._digest()
+        matrix = self._read_matrix(path, digest) if path else None
+        if matrix is None:
+            matrix = self._compute_matrix()
+            if path:
+                self._write_matrix(path, digest, matrix)
+        self._matrix = matrix
+        return matrix
+
+    def _compute_matrix(self):
+        size = len(self.codes)
+        rows = []
+        for source in range(size):
+            row = array("h", [UNREACHABLE]) * size
+            for position, distance in self._bfs(source).items():
+                row[position] = distance
+            rows.append(row)
+        if numpy is not None:
+            return numpy.array(rows, dtype=numpy.int16).reshape(size, size)
+        return rows
+
+    def _digest(self):
+        adjacency = json.dumps([self.codes, self._adjacency]).encode("utf-8")
+        return hashlib.sha256(adjacency).hexdigest()
+
+    def _read_matrix(self, path, digest):
+        # the file is a json header line followed by the matrix as little endian int16 values
+        try:
+            with open(path, "rb") as matrix_file:
+                header = json.loads(matrix_file.readline().decode("utf-8"))
+                data = matrix_file.read()
+        except (OSError, ValueError):
+            return None
+        size = len(self.codes)
+        if header.get("digest") != digest or len(data) != size * size * 2:
+            return None
+        if numpy is not None:
+            return (
+                numpy.frombuffer(data, dtype="<i2")
+                .astype(numpy.int16)
+                .reshape(size, size)
+            )
+        values = array("h", data)
+        if sys.byteorder == "big":
+            values.byteswap()
+        return [values[start : start + size] for start in range(0, size * size, size)]
+
+    @staticmethod
+    def _write_matrix(path, digest, matrix):
+        if numpy is not None:
+            data = numpy.ascontiguousarray(matrix, dtype="<i2").tobytes()
+        else:
+            values = array("h")
+            for row in matrix:
+                values.extend(row)
+            if sys.byteorder == "big":
+                values.byteswap()
+            data = values.tobytes()
+        # write to a temporary file first, so readers never see a partially written matrix
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(json.dumps({"digest": digest}).encode("utf-8") + b"\n")
+                tmp_file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
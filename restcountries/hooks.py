@@ -0,0 +1,303 @@
+import logging
+import math
+import threading
+import time
+
+# upper bounds in seconds of the buckets of the timing histograms
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_logger = logging.getLogger("restcountries")
+
+
+class CallEvent:
+    """Measurements of one lookup, passed to every function in `RestCountryApiV2.hooks` when the lookup finished.
+
+    Times are in seconds, values that were not measured are None. E.g. a cache hit has no status code. requests does
+    not expose the DNS and connect times, so they are None for the synchronous client and the threaded transport of
+    the async one. The aiohttp transport measures them when it opens a new connection.
+    """
+
+    __slots__ = (
+        "resource",
+        "term",
+        "filters",
+        "uri",
+        "cache",
+        "coalesced",
+        "status_code",
+        "bytes_received",
+        "dns_seconds",
+        "connect_seconds",
+        "ttfb_seconds",
+        "total_seconds",
+        "parse_seconds",
+        "construct_seconds",
+        "error",
+        "_started",
+    )
+
+    def __init__(self, resource, term="", filters=None):
+        self.resource = resource
+        self.term = term
+        self.filters = filters
+        self.uri = None
+        # 'hit', 'stale', 'miss', or None if there is no cache or a backend answered the lookup
+        self.cache = None
+        # whether the lookup waited for an identical one instead of sending its own request
+        self.coalesced = False
+        self.status_code = None
+        self.bytes_received = None
+        self.dns_seconds = None
+        self.connect_seconds = None
+        self.ttfb_seconds = None
+        self.total_seconds = None
+        self.parse_seconds = None
+        self.construct_seconds = None
+        self.error = None
+        self._started = time.perf_counter()
+
+    def finish(self, hooks):
+        """Stops the timer and passes the event to every hook.
+
+        Exceptions raised by a hook are logged, they neither fail the lookup nor replace its exception.
+        """
+        self.total_seconds = time.perf_counter() - self._started
+        for hook in hooks:
+            try:
+                hook(self)
+            except Exception:
+                _logger.exception("hook %r failed for %r", hook, self)
+
+    def __repr__(self):
+        return "<CallEvent {}{} status={} cache={} total={}s>".format(
+            self.resource, self.term, self.status_code, self.cache, self.total_seconds
+        )
+
+
+class LoggingHook:
+    """Logs every lookup with the logging module of the standard library.
+
+    >>> RestCountryApiV2.hooks.append(LoggingHook())
+    """
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger or _logger
+        self.level = level
+
+    def __call__(self, event):
+        if not self.logger.isEnabledFor(self.level):
+            return
+        self.logger.log(
+            self.level if event.error is None else logging.WARNING,
+            "%s %s status=%s cache=%s bytes=%s ttfb=%s parse=%s construct=%s total=%.3fms%s",
+            event.resource,
+            event.term,
+            event.status_code,
+            event.cache,
+            event.bytes_received,
+            _milliseconds(event.ttfb_seconds),
+            _milliseconds(event.parse_seconds),
+            _milliseconds(event.construct_seconds),
+            event.total_seconds * 1000,
+            "" if event.error is None else " error={!r}".format(event.error),
+        )
+
+
+def _milliseconds(seconds):
+    return "-" if seconds is None else "{:.3f}ms".format(seconds * 1000)
+
+
+class Counter:
+    """Counter with labels, e.g. the number of requests per resource and status code."""
+
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    """Histogram with labels, counting observations in cumulative buckets like Prometheus does."""
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values = {}  # labels -> [bucket counts, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * len(self.buckets), 0.0)
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[position] += 1
+                    break
+            self._values[key] = counts, total + value
+
+    def count(self, **labels):
+        counts, _ = self._values.get(
+            tuple(str(labels[name]) for name in self.labelnames), ((), 0)
+        )
+        return sum(counts)
+
+    def samples(self):
+        with self._lock:
+            values = sorted((key, (list(c), s)) for key, (c, s) in self._values.items())
+        for key, (counts, total) in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else repr(float(bound))
+                yield self.name + "_bucket", dict(labels, le=le), cumulative
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """In-memory registry of counters and histograms that renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, *args, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(
+                    "{} is already registered as a {}".format(name, metric.type)
+                )
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """Returns the counter with name, it is created if it does not exist."""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Returns the histogram with name, it is created if it does not exist."""
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def get(self, name):
+        return self._metrics[name]
+
+    def render(self):
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append("# HELP {} {}".format(name, metric.documentation))
+            lines.append("# TYPE {} {}".format(name, metric.type))
+            for sample_name, labels, value in metric.samples():
+                lines.append(
+                    "{}{} {}".format(sample_name, _render_labels(labels), value)
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _render_labels(labels):
+    if not labels:
+        return ""
+    return "{{{}}}".format(
+        ",".join(
+            '{}="{}"'.format(
+                name,
+                value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+            )
+            for name, value in labels.items()
+        )
+    )
+
+
+class MetricsHook:
+    """Records every lookup in a MetricsRegistry.
+
+    >>> metrics = MetricsHook()
+    >>> RestCountryApiV2.hooks.append(metrics)
+    >>> print(metrics.registry.render())
+    """
+
+    def __init__(self, registry=None, buckets=DEFAULT_BUCKETS):
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self.calls = self.registry.counter(
+            "restcountries_calls_total",
+            "Lookups by resource, status code and cache result.",
+            ("resource", "status", "cache"),
+        )
+        self.errors = self.registry.counter(
+            "restcountries_errors_total",
+            "Lookups that raised an exception, by resource and exception.",
+            ("resource", "error"),
+        )
+        self.bytes_received = self.registry.counter(
+            "restcountries_received_bytes_total",
+            "Bytes of response bodies received, by resource.",
+            ("resource",),
+        )
+        self.total = self.registry.histogram(
+            "restcountries_call_seconds",
+            "Duration of lookups, by resource.",
+            ("resource",),
+            buckets,
+        )
+        self.ttfb = self.registry.histogram(
+            "restcountries_ttfb_seconds",
+            "Time until the response headers were received, by resource.",
+            ("resource",),
+            buckets,
+        )
+        self.parse = self.registry.histogram(
+            "restcountries_parse_seconds",
+            "Time decoding response bodies, by resource.",
+            ("resource",),
+            buckets,
+        )
+        self.construct = self.registry.histogram(
+            "restcountries_construct_seconds",
+            "Time creating the countries of responses, by resource.",
+            ("resource",),
+            buckets,
+        )
+
+    def __call__(self, event):
+        resource = event.resource
+        self.calls.inc(
+            resource=resource,
+            status=event.status_code if event.status_code is not None else "",
+            cache=event.cache or "",
+        )
+        if event.error is not None:
+            self.errors.inc(resource=resource, error=type(event.error).__name__)
+        if event.bytes_received is not None:
+            self.bytes_received.inc(event.bytes_received, resource=resource)
+        self.total.observe(event.total_seconds, resource=resource)
+        if event.ttfb_seconds is not None:
+            self.ttfb.observe(event.ttfb_seconds, resource=resource)
+        if event.parse_seconds is not None:
+            self.parse.observe(event.parse_seconds, resource=resource)
+        if event.construct_seconds is not None:
+            self.construct.observe(event.construct_seconds, resource=resource)
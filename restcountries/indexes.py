@@ -0,0 +1,109 @@
+import sys
+import time
+
+
+def _upper(value):
+    return str(value).strip().upper()
+
+
+def _lower(value):
+    return str(value).strip().lower()
+
+
+class DatasetIndexes:
+    """Hash indexes over a list of country records, built once.
+
+    Unique indexes (alpha2, alpha3, numeric) map a key to the position of a record, the others map a key to the list
+    of positions of all matching records in dataset order.
+    """
+
+    UNIQUE = ("alpha2", "alpha3", "numeric")
+    MULTI = (
+        "currency",
+        "language",
+        "calling_code",
+        "region",
+        "subregion",
+        "capital",
+        "border",
+    )
+    # how keys are normalized, for building the index and for lookups
+    NORMALIZE = {
+        "alpha2": _upper,
+        "alpha3": _upper,
+        "numeric": _lower,
+        "currency": _upper,
+        "language": _lower,
+        "calling_code": _lower,
+        "region": _lower,
+        "subregion": _lower,
+        "capital": _lower,
+        "border": _upper,
+    }
+
+    def __init__(self, records):
+        started = time.perf_counter()
+        self._indexes = {name: {} for name in self.UNIQUE + self.MULTI}
+        for position, record in enumerate(records):
+            self._add_unique("alpha2", record.get("alpha2Code"), position)
+            self._add_unique("alpha3", record.get("alpha3Code"), position)
+            self._add_unique("numeric", record.get("numericCode"), position)
+            for currency in record.get("currencies") or []:
+                self._add("currency", currency.get("code"), position)
+            for language in record.get("languages") or []:
+                self._add("language", language.get("iso639_1"), position)
+                self._add("language", language.get("iso639_2"), position)
+            for calling_code in record.get("callingCodes") or []:
+                self._add("calling_code", calling_code, position)
+            self._add("region", record.get("region"), position)
+            self._add("subregion", record.get("subregion"), position)
+            self._add("capital", record.get("capital"), position)
+            for border in record.get("borders") or []:
+                self._add("border", border, position)
+        self.build_seconds = time.perf_counter() - started
+
+    def _add_unique(self, name, key, position):
+        if key:
+            self._indexes[name].setdefault(self.NORMALIZE[name](key), position)
+
+    def _add(self, name, key, position):
+        if key:
+            positions = self._indexes[name].setdefault(self.NORMALIZE[name](key), [])
+            # a record can list the same key twice, e.g. a language by its iso639_1 and iso639_2 code
+            if not positions or positions[-1] != position:
+                positions.append(position)
+
+    def get(self, name, key):
+        """Returns the position of the record with key in a unique index or None."""
+        return self._indexes[name].get(self.NORMALIZE[name](key))
+
+    def get_all(self, name, key):
+        """Returns the positions of all records with key in an index."""
+        found = self._indexes[name].get(self.NORMALIZE[name](key))
+        if found is None:
+            return []
+        if name in self.UNIQUE:
+            return [found]
+        return found
+
+    def keys(self, name):
+        return self._indexes[name].keys()
+
+    def memory_size(self):
+        """Returns the approximate memory used by the indexes in bytes, without the records themselves."""
+        size = sys.getsizeof(self._indexes)
+        for index in self._indexes.values():
+            size += sys.getsizeof(index)
+            for key, value in index.items():
+                size += sys.getsizeof(key)
+                if type(value) == list:
+                    size += sys.getsizeof(value)
+        return size
+
+    def stats(self):
+        """Returns the build time, the memory use and the number of keys of every index."""
+        return {
+            "build_seconds": self.build_seconds,
+            "memory_bytes": self.memory_size(),
+            "keys": {name: len(index) for name, index in self._indexes.items()},
+        }
@@ -0,0 +1,157 @@
+import importlib
+import json
+from typing import Any, Dict, List, Optional
+
+# preferred backends first
+BACKENDS = ("orjson", "msgspec", "ujson", "json")
+
+
+class JsonBackend:
+    """Decodes API responses with the json module of the standard library."""
+
+    name = "json"
+
+    def loads(self, body):
+        """Decodes a json document, body may be bytes or str."""
+        return json.loads(body)
+
+    def decode_countries(self, body, country_class):
+        """Decodes a response into a country_class object or a list of them."""
+        data = self.loads(body)
+        if type(data) == list:
+            return [country_class(country_data) for country_data in data]
+        return country_class(data)
+
+
+class OrjsonBackend(JsonBackend):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._loads = orjson.loads
+
+    def loads(self, body):
+        return self._loads(body)
+
+
+class UjsonBackend(JsonBackend):
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+
+        self._loads = ujson.loads
+
+    def loads(self, body):
+        return self._loads(body)
+
+
+class MsgspecBackend(JsonBackend):
+    """Decodes responses into a typed record per country, the types of the fields are checked while decoding.
+
+    The records provide the `get` method `Country.__init__` reads the fields with, so every country class works with
+    them. Reading the fields through `get` costs about as much as decoding saves, so orjson is preferred.
+    """
+
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+
+        self._msgspec = msgspec
+        self._loads = msgspec.json.Decoder().decode
+        record_type = _country_record_type(msgspec)
+        self._decode_list = msgspec.json.Decoder(List[record_type]).decode
+        self._decode_one = msgspec.json.Decoder(record_type).decode
+
+    def loads(self, body):
+        try:
+            return self._loads(body)
+        except self._msgspec.DecodeError as e:
+            raise ValueError(str(e))
+
+    def decode_countries(self, body, country_class):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        try:
+            if body.lstrip()[:1] == b"[":
+                return [country_class(record) for record in self._decode_list(body)]
+            return country_class(self._decode_one(body))
+        except self._msgspec.ValidationError:
+            # a field has an unexpected type, decode without the schema
+            return super().decode_countries(body, country_class)
+        except self._msgspec.DecodeError as e:
+            raise ValueError(str(e))
+
+
+def _country_record_type(msgspec):
+    # imported here, because base imports this module
+    from restcountries.base import COUNTRY_FIELDS
+
+    attributes = dict(COUNTRY_FIELDS)
+    annotations = {
+        "top_level_domain": Optional[List[str]],
+        "alpha2_code": Optional[str],
+        "alpha3_code": Optional[str],
+        "currencies": Optional[List[Dict[str, Any]]],
+        "capital": Optional[str],
+        "calling_codes": Optional[List[str]],
+        "alt_spellings": Optional[List[str]],
+        "relevance": Any,
+        "region": Optional[str],
+        "subregion": Optional[str],
+        "translations": Optional[Dict[str, Any]],
+        "population": Optional[int],
+        "latlng": Optional[List[float]],
+        "demonym": Optional[str],
+        "area": Optional[float],
+        "gini": Optional[float],
+        "timezones": Optional[List[str]],
+        "borders": Optional[List[str]],
+        "native_name": Optional[str],
+        "name": Optional[str],
+        "numeric_code": Optional[str],
+        "languages": Optional[List[Dict[str, Any]]],
+        "flag": Optional[str],
+        "regional_blocs": Optional[List[Dict[str, Any]]],
+        "cioc": Optional[str],
+    }
+
+    def get(self, key, default=None):
+        attribute = attributes.get(key)
+        if attribute is None:
+            return default
+        return getattr(self, attribute)
+
+    namespace = {"__annotations__": annotations, "get": get}
+    namespace.update({attribute: None for attribute in annotations})
+    return type(
+        "CountryRecord",
+        (msgspec.Struct,),
+        namespace,
+        rename={attribute: key for key, attribute in COUNTRY_FIELDS},
+    )
+
+
+_BACKEND_CLASSES = {
+    "json": JsonBackend,
+    "orjson": OrjsonBackend,
+    "ujson": UjsonBackend,
+    "msgspec": MsgspecBackend,
+}
+
+
+def get_json_backend(name=None):
+    """Returns a json backend.
+
+    :param name - one of 'orjson', 'msgspec', 'ujson' or 'json'. By default the first one that is installed is used.
+    """
+    if name is not None:
+        return _BACKEND_CLASSES[name]()
+    for name in BACKENDS:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        return _BACKEND_CLASSES[name]()
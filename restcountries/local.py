@@ -0,0 +1,194 @@
+import json
+
+import requests
+
+from restcountries.base import RestCountryApiV2
+from restcountries.indexes import DatasetIndexes
+from restcountries.search import NameSearchIndex
+
+
+class LocalDataset:
+    """Answers all lookups of `RestCountryApiV2` in-process from one snapshot of the /all endpoint.
+
+    Assign an instance to `RestCountryApiV2.backend` to use it instead of the API:
+    >>> RestCountryApiV2.backend = LocalDataset.from_api()
+    >>> RestCountryApiV2.get_countries_by_currency("EUR")
+
+    Lookups that find nothing raise `requests.exceptions.InvalidURL`, like the 404 responses of the API.
+    """
+
+    def __init__(self, data, country_class=None):
+        """
+        :param data - list of country dicts as returned by the /all endpoint.
+        :param country_class - class of the returned countries, by default `RestCountryApiV2.country_class`.
+        """
+        self.country_class = country_class or RestCountryApiV2.country_class
+        self.load(data)
+
+    @classmethod
+    def from_api(cls, api=RestCountryApiV2):
+        """Fetches the /all snapshot once from the API."""
+        status_code, body = api._fetch(api._build_uri("/all"))
+        if status_code != 200:
+            raise requests.exceptions.RequestException
+        return cls(api.json_backend.loads(body))
+
+    @classmethod
+    def from_file(cls, path):
+        """Reads a snapshot saved with `save` or a stored response of the /all endpoint."""
+        with open(path, "rb") as snapshot_file:
+            return cls(json.load(snapshot_file))
+
+    def save(self, path):
+        """Writes the snapshot as json to path."""
+        with open(path, "w", encoding="utf-8") as snapshot_file:
+            json.dump(list(self.records), snapshot_file, ensure_ascii=False)
+
+    def load(self, data):
+        """Replaces the snapshot."""
+        records = list(data)
+        countries = [self.country_class(record) for record in records]
+        indexes = DatasetIndexes(records)
+        search_index = NameSearchIndex(countries)
+        # swap everything at once, so concurrent lookups never see a mix of two snapshots
+        self._snapshot = (records, countries, indexes, search_index)
+
+    @property
+    def records(self):
+        return self._snapshot[0]
+
+    @property
+    def countries(self):
+        return self._snapshot[1]
+
+    @property
+    def indexes(self):
+        return self._snapshot[2]
+
+    @property
+    def search_index(self):
+        return self._snapshot[3]
+
+    def search(self, query, limit=10, mode="fuzzy", full_text=False):
+        """Searches the countries by name, see `NameSearchIndex.search`.
+
+        Unlike `get_countries_by_name` this supports prefix and typo-tolerant matching with ranking and also
+        searches the alternative spellings and the translations of the names.
+        """
+        return self.search_index.search(
+            query, limit=limit, mode=mode, full_text=full_text
+        )
+
+    def index_stats(self):
+        """Returns the build time and the memory use of the indexes of the current snapshot."""
+        return self.indexes.stats()
+
+    def __len__(self):
+        return len(self.records)
+
+    def get_neighbours(self, alpha, filters=None):
+        """Returns the countries sharing a border with the country of the alpha code."""
+        records, countries, indexes, _ = self._snapshot
+        position = self._find_by_code(indexes, alpha)
+        if position is None:
+            raise requests.exceptions.InvalidURL
+        alpha3 = records[position].get("alpha3Code")
+        return [
+            self._country(records, countries, neighbour, filters)
+            for neighbour in indexes.get_all("border", alpha3)
+        ]
+
+    def query(self, resource, term="", filters=None):
+        """Answers a lookup like the API would.
+
+        :param resource - resource of the API, e.g. '/name'
+        :param term - search term provided by the user of this package
+        :param filters - a list of fields to filter the output of the request to include only the specified fields.
+        :returns - either a Country object or a list of Countries
+        """
+        records, countries, indexes, _ = self._snapshot
+        if resource == "/alpha":
+            position = self._find_by_code(indexes, term)
+            if position is None:
+                raise requests.exceptions.InvalidURL
+            return self._country(records, countries, position, filters)
+
+        if resource == "/all":
+            positions = range(len(records))
+        elif resource == "/alpha?codes=":
+            positions = []
+            seen = set()
+            for code in term.split(RestCountryApiV2.QUERY_SEPARATOR):
+                position = self._find_by_code(indexes, code)
+                if position is not None and position not in seen:
+                    seen.add(position)
+                    positions.append(position)
+        elif resource in INDEXED_RESOURCES:
+            positions = indexes.get_all(INDEXED_RESOURCES[resource], term)
+            if not positions and resource == "/capital":
+                # the API also matches parts of the name of a capital
+                positions = self._scan(records, _match_capital, term)
+        elif resource == "/name":
+            positions = self._scan(records, _match_name, term)
+        else:
+            raise requests.exceptions.InvalidURL
+
+        if not positions and resource != "/all":
+            raise requests.exceptions.InvalidURL
+        return [
+            self._country(records, countries, position, filters)
+            for position in positions
+        ]
+
+    def _country(self, records, countries, position, filters):
+        if not filters:
+            return countries[position]
+        record = records[position]
+        return self._country_class_for(filters)(
+            {field: record[field] for field in filters if field in record}
+        )
+
+    def _country_class_for(self, filters):
+        """Returns the class of the countries of a lookup with filters, like `RestCountryApiV2._country_class_for`."""
+        if RestCountryApiV2.projected_country_class is not None:
+            return RestCountryApiV2.projected_country_class(filters)
+        return self.country_class
+
+    @staticmethod
+    def _find_by_code(indexes, code):
+        code = str(code).strip()
+        if len(code) == 2:
+            return indexes.get("alpha2", code)
+        return indexes.get("alpha3", code)
+
+    @staticmethod
+    def _scan(records, matcher, term):
+        needle = str(term).strip().lower()
+        return [
+            position
+            for position, record in enumerate(records)
+            if matcher(record, needle)
+        ]
+
+
+def _match_name(record, needle):
+    return (
+        needle in (record.get("name") or "").lower()
+        or needle in (record.get("nativeName") or "").lower()
+        or needle in [spelling.lower() for spelling in record.get("altSpellings") or []]
+    )
+
+
+def _match_capital(record, needle):
+    return needle in (record.get("capital") or "").lower()
+
+
+# resources answered by a lookup in DatasetIndexes
+INDEXED_RESOURCES = {
+    "/lang": "language",
+    "/callingcode": "calling_code",
+    "/currency": "currency",
+    "/region": "region",
+    "/subregion": "subregion",
+    "/capital": "capital",
+}
@@ -0,0 +1,104 @@
+import threading
+
+from restcountries.base import COUNTRY_FIELDS, BaseCountry
+
+_ATTRIBUTES = dict(COUNTRY_FIELDS)
+_KEYS = {attribute: key for key, attribute in COUNTRY_FIELDS}
+
+_classes = {}
+_classes_lock = threading.Lock()
+
+
+class ProjectedCountry(BaseCountry):
+    """Base of the country classes holding only the fields requested with the filters of a lookup.
+
+    Accessing a field that was not requested raises an AttributeError naming the filter to add, instead of returning
+    None like `Country` does.
+    """
+
+    __slots__ = ()
+    # (json key, attribute) pairs of the requested fields
+    fields = ()
+
+    def __init__(self, country_data):
+        get = country_data.get
+        for key, attribute in self.fields:
+            setattr(self, attribute, get(key))
+
+    def __getattr__(self, name):
+        # only called for attributes that are not set, i.e. fields that were not requested
+        key = _KEYS.get(name)
+        if key is not None:
+            raise AttributeError(
+                "{} was not requested, add {!r} to the filters of the lookup".format(
+                    name, key
+                )
+            )
+        raise AttributeError(
+            "{!r} object has no attribute {!r}".format(type(self).__name__, name)
+        )
+
+    def _values(self):
+        return tuple(getattr(self, attribute) for _, attribute in self.fields)
+
+    def __eq__(self, other):
+        if "numeric_code" in self.__slots__:
+            return super().__eq__(other)
+        return type(other) is type(self) and self._values() == other._values()
+
+    def __lt__(self, other):
+        if "numeric_code" in self.__slots__:
+            return super().__lt__(other)
+        return repr(self._values()) < repr(other._values())
+
+    def __hash__(self):
+        if "numeric_code" in self.__slots__:
+            return super().__hash__()
+        return hash(repr(self._values()))
+
+    def __repr__(self):
+        return "<{} {}>".format(
+            type(self).__name__,
+            " ".join(
+                "{}={!r}".format(attribute, getattr(self, attribute))
+                for _, attribute in self.fields
+            ),
+        )
+
+    __str__ = __repr__
+
+    def to_dict(self):
+        """Returns the requested fields with the json keys of the API."""
+        return {key: getattr(self, attribute) for key, attribute in self.fields}
+
+    def __reduce__(self):
+        return _rebuild, (tuple(key for key, _ in self.fields), self.to_dict())
+
+
+def _rebuild(keys, country_data):
+    return projected_class(keys)(country_data)
+
+
+def projected_class(filters):
+    """Returns the country class holding exactly the fields in filters, one class per set of fields.
+
+    Unknown field names are ignored. Use it for all lookups with filters:
+    >>> RestCountryApiV2.projected_country_class = projected_class
+    >>> RestCountryApiV2.get_countries_by_region("europe", filters=["name", "capital"])
+    :param filters - json keys of the fields, e.g. ['name', 'capital']
+    """
+    keys = tuple(sorted(key for key in set(filters) if key in _ATTRIBUTES))
+    country_class = _classes.get(keys)
+    if country_class is None:
+        fields = tuple((key, _ATTRIBUTES[key]) for key in keys)
+        name = "Country_" + "_".join(attribute for _, attribute in fields)
+        namespace = {
+            "__slots__": tuple(attribute for _, attribute in fields),
+            "fields": fields,
+            "__module__": __name__,
+        }
+        with _classes_lock:
+            country_class = _classes.setdefault(
+                keys, type(name, (ProjectedCountry,), namespace)
+            )
+    return country_class
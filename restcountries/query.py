@@ -0,0 +1,445 @@
+import operator
+
+import requests
+
+from restcountries.base import RestCountryApiV2
+from restcountries.local import _match_name
+from restcountries.projection import _ATTRIBUTES, _KEYS
+
+
+def _contains(value, item):
+    return value is not None and item in value
+
+
+def _in(value, items):
+    return value in items
+
+
+def _is_null(value, expected):
+    return (value is None) == bool(expected)
+
+
+def _compare(function):
+    def compare(value, other):
+        # countries without a value, e.g. without a gini, never match a comparison
+        return value is not None and function(value, other)
+
+    return compare
+
+
+# operators of `where`, e.g. population__gt=5000000
+OPERATORS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": _compare(operator.gt),
+    "gte": _compare(operator.ge),
+    "lt": _compare(operator.lt),
+    "lte": _compare(operator.le),
+    "in": _in,
+    "contains": _contains,
+    "isnull": _is_null,
+}
+
+
+def _codes_match(items, key, term):
+    return any(str(item.get(key) or "").upper() == term.upper() for item in items or [])
+
+
+def _language_match(languages, term):
+    term = term.lower()
+    return any(
+        term in (language.get("iso639_1"), language.get("iso639_2"))
+        for language in languages or []
+    )
+
+
+def _text_match(value, term):
+    return (value or "").strip().lower() == term.strip().lower()
+
+
+def _name_match(country, term):
+    record = {
+        "name": country.name,
+        "nativeName": country.native_name,
+        "altSpellings": country.alt_spellings,
+    }
+    return _match_name(record, term.strip().lower())
+
+
+class _Constraint:
+    """A constraint that one endpoint of the API and one local index can answer."""
+
+    def __init__(self, kind, method, resource, index, keys, estimate, matcher):
+        self.kind = kind
+        # lookup method of the api and resource of LocalDataset.query
+        self.method = method
+        self.resource = resource
+        # index of DatasetIndexes with the exact number of matches, None if it has to be estimated
+        self.index = index
+        # json keys needed to check the constraint locally
+        self.keys = keys
+        # rough number of countries a remote lookup returns
+        self.estimate = estimate
+        self.matcher = matcher
+
+
+CONSTRAINTS = {
+    constraint.kind: constraint
+    for constraint in (
+        _Constraint(
+            "codes",
+            "get_countries_by_country_codes",
+            "/alpha?codes=",
+            None,
+            ("alpha2Code", "alpha3Code"),
+            None,
+            lambda country, codes: any(
+                code.upper() in (country.alpha2_code, country.alpha3_code)
+                for code in codes
+            ),
+        ),
+        _Constraint(
+            "capital",
+            "get_countries_by_capital",
+            "/capital",
+            "capital",
+            ("capital",),
+            1,
+            lambda country, term: _text_match(country.capital, term),
+        ),
+        _Constraint(
+            "calling_code",
+            "get_countries_by_calling_code",
+            "/callingcode",
+            "calling_code",
+            ("callingCodes",),
+            2,
+            lambda country, term: str(term) in (country.calling_codes or []),
+        ),
+        _Constraint(
+            "name",
+            "get_countries_by_name",
+            "/name",
+            None,
+            ("name", "nativeName", "altSpellings"),
+            3,
+            _name_match,
+        ),
+        _Constraint(
+            "subregion",
+            "get_countries_by_subregion",
+            "/subregion",
+            "subregion",
+            ("subregion",),
+            12,
+            lambda country, term: _text_match(country.subregion, term),
+        ),
+        _Constraint(
+            "currency",
+            "get_countries_by_currency",
+            "/currency",
+            "currency",
+            ("currencies",),
+            15,
+            lambda country, term: _codes_match(country.currencies, "code", term),
+        ),
+        _Constraint(
+            "language",
+            "get_countries_by_language",
+            "/lang",
+            "language",
+            ("languages",),
+            20,
+            lambda country, term: _language_match(country.languages, term),
+        ),
+        _Constraint(
+            "region",
+            "get_countries_by_region",
+            "/region",
+            "region",
+            ("region",),
+            50,
+            lambda country, term: _text_match(country.region, term),
+        ),
+    )
+}
+
+# rough number of countries returned by /all
+ALL_ESTIMATE = 250
+
+
+class Predicate:
+    """A condition on one field of a country, evaluated locally."""
+
+    __slots__ = ("key", "attribute", "op", "value")
+
+    def __init__(self, key, attribute, op, value):
+        self.key = key
+        self.attribute = attribute
+        self.op = op
+        self.value = value
+
+    @classmethod
+    def parse(cls, condition, value):
+        """Parses a keyword of `Query.where`, e.g. 'population__gt'."""
+        field, _, op = condition.partition("__")
+        op = op or "eq"
+        if op not in OPERATORS:
+            raise ValueError(
+                "unknown operator {!r}, use one of {}".format(
+                    op, ", ".join(sorted(OPERATORS))
+                )
+            )
+        if field in _ATTRIBUTES:
+            return cls(field, _ATTRIBUTES[field], op, value)
+        if field in _KEYS:
+            return cls(_KEYS[field], field, op, value)
+        raise ValueError("unknown field {!r}".format(field))
+
+    def __call__(self, country):
+        return OPERATORS[self.op](getattr(country, self.attribute), self.value)
+
+    def __repr__(self):
+        return "{} {} {!r}".format(self.key, self.op, self.value)
+
+
+class Query:
+    """Describes a lookup by several constraints, conditions and the fields to return.
+
+    Every method returns a new query. The planner answers one constraint with a lookup, preferring the one that
+    returns the fewest countries, and checks the other constraints and the conditions of `where` locally. The fields
+    are passed on as filters of the lookup, together with the fields needed to check the rest:
+    >>> query = (
+    ...     Query()
+    ...     .currency("EUR")
+    ...     .subregion("Western Europe")
+    ...     .where(population__gt=5000000)
+    ...     .fields(["name", "capital"])
+    ... )
+    >>> query.run()
+    [<Country_capital_name capital='Vienna' name='Austria'>, ...]
+    >>> print(query.explain())
+    """
+
+    def __init__(self):
+        self._constraints = ()
+        self._predicates = ()
+        self._fields = None
+
+    def _copy(self, **changes):
+        query = Query()
+        query._constraints = self._constraints
+        query._predicates = self._predicates
+        query._fields = self._fields
+        for name, value in changes.items():
+            setattr(query, "_" + name, value)
+        return query
+
+    def _constrain(self, kind, term):
+        return self._copy(constraints=self._constraints + ((CONSTRAINTS[kind], term),))
+
+    def currency(self, currency):
+        """Countries using the currency, e.g. 'EUR'."""
+        return self._constrain("currency", currency)
+
+    def language(self, language):
+        """Countries speaking the language, by its iso639_1 or iso639_2 code, e.g. 'de'."""
+        return self._constrain("language", language)
+
+    def calling_code(self, calling_code):
+        return self._constrain("calling_code", str(calling_code))
+
+    def region(self, region):
+        return self._constrain("region", region)
+
+    def subregion(self, subregion):
+        return self._constrain("subregion", subregion)
+
+    def capital(self, capital):
+        return self._constrain("capital", capital)
+
+    def name(self, name):
+        """Countries whose name, native name or alternative spellings contain name."""
+        return self._constrain("name", name)
+
+    def codes(self, codes):
+        """Countries with one of the alpha2 or alpha3 codes."""
+        return self._constrain("codes", tuple(codes))
+
+    def where(self, **conditions):
+        """Adds conditions on fields, checked locally.
+
+        A condition is a field, by its json key or attribute name, and an operator separated by a double underscore:
+        `population__gt=5000000`, `gini__isnull=False`, `alpha3_code__in=["DEU", "FRA"]`. Without an operator the
+        field has to be equal to the value. Operators: eq, ne, gt, gte, lt, lte, in, contains and isnull.
+        """
+        predicates = tuple(
+            Predicate.parse(condition, value)
+            for condition, value in sorted(conditions.items())
+        )
+        return self._copy(predicates=self._predicates + predicates)
+
+    def fields(self, fields):
+        """Returns only the fields, given by their json keys, e.g. ['name', 'capital']."""
+        unknown = [field for field in fields if field not in _ATTRIBUTES]
+        if unknown:
+            raise ValueError("unknown fields {}".format(", ".join(unknown)))
+        return self._copy(fields=tuple(fields))
+
+    def plan(self, api=RestCountryApiV2, dataset=None):
+        """Chooses how the query is answered.
+
+        :param api - class the lookups are made with.
+        :param dataset - a LocalDataset to answer the query from, by default the backend of api if it is one. Its
+        indexes give the exact number of matches of every constraint.
+        :returns: a QueryPlan
+        """
+        if dataset is None and hasattr(api.backend, "indexes"):
+            dataset = api.backend
+        candidates = [
+            (self._estimate(constraint, term, dataset), index, constraint, term)
+            for index, (constraint, term) in enumerate(self._constraints)
+        ]
+        candidates.sort(key=lambda candidate: candidate[:2])
+        source = None
+        if candidates:
+            estimate, _, constraint, term = candidates[0]
+            source = (estimate, constraint, term)
+        residual = tuple(
+            (constraint, term) for _, _, constraint, term in candidates[1:]
+        )
+
+        filters = None
+        if self._fields is not None:
+            filters = list(self._fields)
+            needed = [key for constraint, _ in residual for key in constraint.keys]
+            needed += [predicate.key for predicate in self._predicates]
+            for key in needed:
+                if key not in filters:
+                    filters.append(key)
+        return QueryPlan(
+            api,
+            dataset,
+            source,
+            [candidate[0::2] for candidate in candidates[1:]],
+            residual,
+            self._predicates,
+            filters,
+            self._fields,
+        )
+
+    @staticmethod
+    def _estimate(constraint, term, dataset):
+        if constraint.kind == "codes":
+            return len(term)
+        if dataset is not None and constraint.index is not None:
+            return len(dataset.indexes.get_all(constraint.index, term))
+        return constraint.estimate
+
+    def run(self, api=RestCountryApiV2, dataset=None):
+        """Plans and runs the query, see `plan`.
+
+        :returns: list of countries, empty if no country matches
+        """
+        return self.plan(api, dataset).run()
+
+    def explain(self, api=RestCountryApiV2, dataset=None):
+        """Returns a description of the plan of the query, see `plan`."""
+        return self.plan(api, dataset).explain()
+
+
+class QueryPlan:
+    """The lookup answering a query, followed by the constraints and conditions checked locally."""
+
+    def __init__(
+        self, api, dataset, source, skipped, residual, predicates, filters, fields
+    ):
+        self.api = api
+        self.dataset = dataset
+        # (estimated countries, constraint, term) of the lookup or None to look up all countries
+        self.source = source
+        # (estimated countries, constraint) of the constraints that were not chosen
+        self.skipped = skipped
+        self.residual = residual
+        self.predicates = predicates
+        # filters of the lookup and fields of the result
+        self.filters = filters
+        self.fields = fields
+
+    @property
+    def local(self):
+        return self.dataset is not None
+
+    def _lookup(self):
+        if self.source is None:
+            if self.local:
+                return self.dataset.query("/all", filters=self.filters)
+            return self.api.get_all(filters=self.filters)
+        _, constraint, term = self.source
+        if self.local:
+            if constraint.kind == "codes":
+                term = RestCountryApiV2.QUERY_SEPARATOR.join(term)
+            return self.dataset.query(constraint.resource, term, filters=self.filters)
+        return getattr(self.api, constraint.method)(term, filters=self.filters)
+
+    def run(self):
+        """Makes the lookup and returns the countries matching everything else."""
+        try:
+            countries = self._lookup()
+        except requests.exceptions.InvalidURL:
+            # the API answers lookups without matches with 404
+            return []
+        countries = [
+            country
+            for country in countries
+            if all(
+                constraint.matcher(country, term) for constraint, term in self.residual
+            )
+            and all(predicate(country) for predicate in self.predicates)
+        ]
+        if self.fields is not None and len(self.filters) > len(self.fields):
+            countries = [self._project(country) for country in countries]
+        return countries
+
+    def _project(self, country):
+        # drops the fields that were only requested to check the constraints and conditions
+        owner = self.dataset if self.local else self.api
+        country_class = owner._country_class_for(self.fields)
+        return country_class(
+            {key: getattr(country, _ATTRIBUTES[key]) for key in self.fields}
+        )
+
+    def explain(self):
+        """Describes the lookup and the local steps, one per line."""
+        lines = []
+        where = "local index" if self.local else "remote"
+        filters = ""
+        if self.filters is not None:
+            filters = " fields={}".format(";".join(self.filters))
+        if self.source is None:
+            estimate = len(self.dataset) if self.local else ALL_ESTIMATE
+            lines.append(
+                "lookup /all{} ({}, ~{} countries)".format(filters, where, estimate)
+            )
+        else:
+            estimate, constraint, term = self.source
+            if constraint.kind == "codes":
+                term = ";".join(term)
+            lines.append(
+                "lookup {}/{}{} ({}, ~{} countries)".format(
+                    constraint.resource.split("?")[0], term, filters, where, estimate
+                )
+            )
+        for estimate, constraint in self.skipped:
+            lines.append(
+                "  not chosen: {} (~{} countries)".format(constraint.kind, estimate)
+            )
+        for constraint, term in self.residual:
+            lines.append("filter {} = {!r}".format(constraint.kind, term))
+        for predicate in self.predicates:
+            lines.append("filter {!r}".format(predicate))
+        if self.fields is not None and len(self.filters) > len(self.fields):
+            lines.append("project {}".format(";".join(self.fields)))
+        return "\n".join(lines)
+
+    __str__ = explain
@@ -0,0 +1,146 @@
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+# state of a FileTokenBucket: tokens left and the time they were counted
+_FILE_STATE = struct.Struct("<dd")
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the rate of requests.
+
+    The bucket holds up to `capacity` tokens and is refilled with `rate` tokens per second. Every request takes a
+    token, if none is left the request waits until the bucket is refilled. Waiting requests are served in the order
+    they asked, so a burst of requests is spread evenly over time:
+    >>> RestCountryApiV2.rate_limiter = TokenBucket(rate=10, capacity=20)
+    """
+
+    def __init__(self, rate, capacity=None, timer=time.monotonic, sleep=time.sleep):
+        """
+        :param rate - tokens added per second, i.e. the sustained number of requests per second.
+        :param capacity - maximum number of tokens, i.e. the largest burst. By default one second worth of tokens.
+        :param timer, sleep - mainly useful for testing.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(max(1, rate) if capacity is None else capacity)
+        self.timer = timer
+        self.sleep = sleep
+        self.acquired = 0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated_at = timer()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            yield
+
+    def _read(self):
+        return self._tokens, self._updated_at
+
+    def _write(self, tokens, updated_at):
+        self._tokens = tokens
+        self._updated_at = updated_at
+
+    def _take(self, tokens, wait):
+        """Takes tokens and returns the seconds until they are available, or None if wait is false and they are not."""
+        if tokens > self.capacity:
+            raise ValueError("Cannot take more tokens than the capacity of the bucket")
+        with self._locked():
+            stored, updated_at = self._read()
+            now = self.timer()
+            available = min(
+                self.capacity, stored + max(0.0, now - updated_at) * self.rate
+            )
+            if available < tokens and not wait:
+                return None
+            # the bucket may go below zero, later callers wait for the tokens taken in advance
+            self._write(available - tokens, now)
+            delay = max(0.0, (tokens - available) / self.rate)
+            self.acquired += 1
+            self.waited += delay
+        return delay
+
+    def reserve(self, tokens=1):
+        """Takes tokens and returns the seconds the caller has to wait before sending its request."""
+        return self._take(tokens, True)
+
+    def acquire(self, tokens=1):
+        """Takes tokens, waiting until they are available.
+
+        :returns: the seconds waited
+        """
+        delay = self._take(tokens, True)
+        if delay:
+            self.sleep(delay)
+        return delay
+
+    def try_acquire(self, tokens=1):
+        """Takes tokens if they are available right now and returns whether they were."""
+        return self._take(tokens, False) is not None
+
+
+class FileTokenBucket(TokenBucket):
+    """Token bucket shared by all processes of a host through a small state file.
+
+    Every process creates a FileTokenBucket with the same path and rate, access to the state is serialized with
+    `fcntl.flock`. Put the file on a tmpfs such as /dev/shm to keep it in memory. Only available on POSIX systems.
+    >>> RestCountryApiV2.rate_limiter = FileTokenBucket("/dev/shm/restcountries.bucket", rate=10)
+    """
+
+    def __init__(self, path, rate, capacity=None, timer=time.time, sleep=time.sleep):
+        """
+        :param path - path of the state file, created if it does not exist.
+        :param rate - tokens added per second, shared by all processes.
+        :param capacity - maximum number of tokens, by default one second worth of tokens.
+        :param timer - wall clock shared by all processes, mainly useful for testing.
+        """
+        if fcntl is None:
+            raise ImportError("FileTokenBucket requires fcntl, i.e. a POSIX system")
+        super().__init__(rate, capacity=capacity, timer=timer, sleep=sleep)
+        self.path = path
+        self._fd = None
+        self._pid = None
+
+    def _open(self):
+        # a forked child must not share the open file with its parent, flock would not exclude them
+        if self._fd is None or self._pid != os.getpid():
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+        return self._fd
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            fd = self._open()
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _read(self):
+        data = os.pread(self._fd, _FILE_STATE.size, 0)
+        if len(data) < _FILE_STATE.size:
+            return self.capacity, self.timer()
+        return _FILE_STATE.unpack(data)
+
+    def _write(self, tokens, updated_at):
+        os.pwrite(self._fd, _FILE_STATE.pack(tokens, updated_at), 0)
+
+    def close(self):
+        """Closes the state file, it is reopened on the next request."""
+        with self._lock:
+            if self._fd is not None and self._pid == os.getpid():
+                os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundRefresher:
+    """Refreshes expired cache entries in the background while serving them (stale-while-revalidate).
+
+    A lookup finding an expired entry that is not older than the `max_stale` of the cache returns it right away and
+    the refresher fetches a new result in the background. Every entry is refreshed once at a time. After a failed
+    refresh the entry is not refreshed again for `error_backoff` seconds, doubled for every further failure up to
+    `max_error_backoff`, and every function in `on_error` is called with the cache key and the exception.
+    >>> RestCountryApiV2.cache = LRUCache(ttl=3600, max_stale=24 * 3600)
+    >>> RestCountryApiV2.refresher = BackgroundRefresher()
+    """
+
+    def __init__(
+        self,
+        max_workers=2,
+        error_backoff=5,
+        max_error_backoff=300,
+        timer=time.monotonic,
+    ):
+        """
+        :param max_workers - number of threads refreshing entries of the synchronous client.
+        :param error_backoff - seconds an entry is not refreshed after a failed refresh.
+        :param max_error_backoff - longest pause after repeated failures.
+        :param timer - clock used for the backoff, mainly useful for testing.
+        """
+        self.max_workers = max_workers
+        self.error_backoff = error_backoff
+        self.max_error_backoff = max_error_backoff
+        self.timer = timer
+        self.on_error = []
+        self.refreshes = 0
+        self.failures = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._running = {}  # key -> future or task
+        self._backoff = {}  # key -> (consecutive failures, retry at)
+        self._executor = None
+
+    def _start(self, key):
+        with self._lock:
+            if key in self._running:
+                return False
+            _, retry_at = self._backoff.get(key, (0, None))
+            if retry_at is not None and self.timer() < retry_at:
+                self.skipped += 1
+                return False
+            self._running[key] = None
+            return True
+
+    def _finish(self, key, error):
+        with self._lock:
+            self._running.pop(key, None)
+            if error is None:
+                self.refreshes += 1
+                self._backoff.pop(key, None)
+                return
+            self.failures += 1
+            failures = self._backoff.get(key, (0, None))[0] + 1
+            delay = min(
+                self.max_error_backoff, self.error_backoff * 2 ** (failures - 1)
+            )
+            self._backoff[key] = (failures, self.timer() + delay)
+        for on_error in list(self.on_error):
+            on_error(key, error)
+
+    def _run(self, key, func):
+        try:
+            func()
+        except Exception as e:
+            self._finish(key, e)
+        else:
+            self._finish(key, None)
+
+    def schedule(self, key, func):
+        """Calls func() in a background thread, unless key is being refreshed or backing off after an error.
+
+        :returns: whether a refresh was started
+        """
+        if not self._start(key):
+            return False
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="restcountries-refresh",
+                )
+            self._running[key] = self._executor.submit(self._run, key, func)
+        return True
+
+    def schedule_async(self, key, coroutine_function):
+        """Awaits coroutine_function() in a task of the running event loop, see `schedule`."""
+        if not self._start(key):
+            return False
+
+        async def run():
+            try:
+                await coroutine_function()
+            except Exception as e:
+                self._finish(key, e)
+            else:
+                self._finish(key, None)
+
+        task = asyncio.ensure_future(run())
+        with self._lock:
+            if key in self._running:
+                self._running[key] = task
+        return True
+
+    def wait(self):
+        """Waits for the refreshes running in background threads, e.g. before shutting down."""
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self):
+        """Returns the counters of the refresher as a dict."""
+        with self._lock:
+            return {
+                "running": len(self._running),
+                "refreshes": self.refreshes,
+                "failures": self.failures,
+                "skipped": self.skipped,
+                "failing": len(self._backoff),
+            }
@@ -0,0 +1,219 @@
+import asyncio
+import email.utils
+import random
+import threading
+import time
+
+import requests
+
+# status codes worth retrying, the API is throttling or temporarily unavailable
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+
+def parse_retry_after(value, now=None):
+    """Returns the seconds to wait from a Retry-After header, either seconds or an HTTP date, or None if invalid."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date is None:
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, date.timestamp() - now)
+
+
+class RetryPolicy:
+    """Retries requests that failed with a connection error, a timeout or a status code in RETRY_STATUSES.
+
+    The n-th retry waits `backoff_factor * 2 ** n` seconds, at most `max_backoff`. With jitter, a random part of
+    that time is waited, so many clients do not retry at the same moment. A Retry-After header of the response is
+    honored, the request is not retried if it asks to wait longer than `max_retry_after`.
+    >>> RestCountryApiV2.retry_policy = RetryPolicy(total=3, backoff_factor=0.5)
+    """
+
+    def __init__(
+        self,
+        total=3,
+        backoff_factor=0.5,
+        max_backoff=30,
+        jitter=True,
+        statuses=RETRY_STATUSES,
+        max_retry_after=60,
+        sleep=time.sleep,
+        random=random.random,
+        async_sleep=asyncio.sleep,
+    ):
+        """
+        :param total - maximum number of retries, the request is sent at most total + 1 times.
+        :param backoff_factor - seconds waited before the first retry, doubled for every further retry.
+        :param max_backoff - longest wait between two attempts, without Retry-After.
+        :param jitter - whether to wait a random time between 0 and the backoff.
+        :param statuses - status codes that are retried.
+        :param max_retry_after - longest Retry-After that is honored.
+        :param sleep, random, async_sleep - mainly useful for testing.
+        """
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.max_retry_after = max_retry_after
+        self.sleep = sleep
+        self.random = random
+        self.async_sleep = async_sleep
+        self.retries = 0
+
+    def backoff(self, attempt):
+        """Returns the seconds to wait before retry number attempt, starting at 0."""
+        delay = min(self.max_backoff, self.backoff_factor * 2 ** attempt)
+        if self.jitter:
+            delay *= self.random()
+        return delay
+
+    def call(self, send):
+        """Calls send() until it returns a response that is not retried or the retries are used up.
+
+        :param send - function sending the request and returning a requests.Response
+        :returns: the last response
+        """
+        attempt = 0
+        while True:
+            try:
+                response = send()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.total:
+                    raise
+                delay = self.backoff(attempt)
+            else:
+                delay = self._retry_delay(
+                    attempt, response.status_code, response.headers
+                )
+                if delay is None:
+                    return response
+                response.close()
+            self.sleep(delay)
+            attempt += 1
+            self.retries += 1
+
+    async def call_async(self, send):
+        """Coroutine version of `call`, waits without blocking the event loop.
+
+        :param send - coroutine function sending the request and returning (status code, body, headers)
+        :returns: the last (status code, body, headers)
+        """
+        attempt = 0
+        while True:
+            try:
+                response = await send()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.total:
+                    raise
+                delay = self.backoff(attempt)
+            else:
+                status_code, _, headers = response
+                delay = self._retry_delay(attempt, status_code, headers)
+                if delay is None:
+                    return response
+            await self.async_sleep(delay)
+            attempt += 1
+            self.retries += 1
+
+    def _retry_delay(self, attempt, status_code, headers):
+        """Returns the seconds to wait before retrying a response, or None if it is not retried."""
+        if status_code not in self.statuses or attempt >= self.total:
+            return None
+        delay = self.backoff(attempt)
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                return None
+            delay = max(delay, retry_after)
+        return delay
+
+
+class CircuitBreaker:
+    """Stops sending requests to an API that keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens and requests fail fast with CircuitOpenError.
+    After `recovery_timeout` seconds one trial request is let through: if it succeeds the circuit closes again,
+    otherwise it stays open for another recovery_timeout.
+    >>> RestCountryApiV2.circuit_breaker = CircuitBreaker(failure_threshold=5, recovery_timeout=30)
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30, timer=time.monotonic):
+        """
+        :param failure_threshold - consecutive failures after which the circuit opens.
+        :param recovery_timeout - seconds the circuit stays open before a trial request is sent.
+        :param timer - clock used for the recovery timeout, mainly useful for testing.
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.timer = timer
+        self.failures = 0
+        self.rejected = 0
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if (
+            self._state == self.OPEN
+            and self.timer() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def before_request(self):
+        """Raises CircuitOpenError if no request may be sent now."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+            self.rejected += 1
+        raise CircuitOpenError("The circuit breaker is open, the API keeps failing")
+
+    def is_failure(self, status_code):
+        """Returns whether a response with status_code counts as a failure of the API."""
+        return status_code == 429 or status_code >= 500
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self.timer()
+            self._trial_running = False
+
+    def reset(self):
+        """Closes the circuit."""
+        self.record_success()
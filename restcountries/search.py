@@ -0,0 +1,266 @@
+import heapq
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+
+# kinds of matches, lower ranks first
+EXACT = 0
+PREFIX = 1
+WORD_PREFIX = 2
+SUBSTRING = 3
+FUZZY = 4
+
+# maximum number of typos for typo-tolerant matching
+MAX_DISTANCE = 2
+
+MODES = {"exact": EXACT, "prefix": WORD_PREFIX, "substring": SUBSTRING, "fuzzy": FUZZY}
+
+
+def normalize(text):
+    """Returns text in lower case without accents, which is how names are compared."""
+    text = unicodedata.normalize("NFKD", str(text))
+    return (
+        "".join(char for char in text if not unicodedata.combining(char))
+        .casefold()
+        .strip()
+    )
+
+
+def _bigrams(text):
+    return {text[i : i + 2] for i in range(len(text) - 1)}
+
+
+def _prefix_distance(query, text, max_distance):
+    """Returns the edit distance between query and the closest prefix of text, or None if it exceeds max_distance.
+
+    Insertions, deletions, substitutions and transpositions of two adjacent characters count as one edit.
+    """
+    # cells further than max_distance from the diagonal cannot be within max_distance, so only the band around it is
+    # computed and every other cell holds the bound
+    limit = max_distance + 1
+    width = len(text) + 1
+    before_previous = None
+    previous = [min(j, limit) for j in range(width)]
+    for i, query_char in enumerate(query, 1):
+        current = [limit] * width
+        current[0] = min(i, limit)
+        best = current[0]
+        for j in range(max(1, i - max_distance), min(len(text), i + max_distance) + 1):
+            text_char = text[j - 1]
+            distance = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (query_char != text_char),
+            )
+            if (
+                before_previous is not None
+                and j > 1
+                and query_char == text[j - 2]
+                and query[i - 2] == text_char
+            ):
+                distance = min(distance, before_previous[j - 2] + 1)
+            if distance < limit:
+                current[j] = distance
+                if distance < best:
+                    best = distance
+        if best > max_distance:
+            return None
+        before_previous, previous = previous, current
+    distance = min(previous)
+    return distance if distance <= max_distance else None
+
+
+class NameSearchIndex:
+    """Search index over the names of countries for autocompletion.
+
+    Indexes `name`, `native_name`, `alt_spellings` and all `translations`, and supports exact, prefix, substring and
+    typo-tolerant matching. Results are ranked by the kind of match, then by the field that matched (the name before
+    other spellings before translations), then by the length of the matched name.
+    """
+
+    # fields that are indexed and their rank
+    FIELDS = (
+        ("name", 0),
+        ("native_name", 1),
+        ("alt_spellings", 1),
+        ("translations", 2),
+    )
+
+    # typo-tolerant matching compares the start of the query with the start of the words of a name up to this length
+    FUZZY_WINDOW = 12
+    # typo-tolerant matching computes edit distances for at most this many names sharing the most bigrams with the query
+    FUZZY_CANDIDATES = 32
+
+    def __init__(self, countries):
+        """
+        :param countries - list of Country objects to index.
+        """
+        self.countries = list(countries)
+        entries = {}  # (normalized name, position) -> field rank
+        for position, country in enumerate(self.countries):
+            for name, rank in self._names(country):
+                key = (normalize(name), position)
+                if key[0] and rank < entries.get(key, rank + 1):
+                    entries[key] = rank
+        # every entry is (normalized name, position of the country, field rank)
+        self._entries = [
+            (name, position, rank) for (name, position), rank in entries.items()
+        ]
+
+        self._exact = {}
+        prefix_keys = []
+        self._bigram_postings = {}
+        self._fuzzy_postings = {}
+        for entry_id, (name, _, _) in enumerate(self._entries):
+            self._exact.setdefault(name, []).append(entry_id)
+            fuzzy_bigrams = set()
+            for start in self._word_starts(name):
+                prefix_keys.append((name[start:], entry_id, start > 0))
+                fuzzy_bigrams.update(
+                    _bigrams(name[start : start + self.FUZZY_WINDOW + MAX_DISTANCE])
+                )
+            for bigram in _bigrams(name):
+                self._bigram_postings.setdefault(bigram, []).append(entry_id)
+            for bigram in fuzzy_bigrams:
+                self._fuzzy_postings.setdefault(bigram, []).append(entry_id)
+        prefix_keys.sort()
+        self._prefix_keys = [key for key, _, _ in prefix_keys]
+        self._prefix_entries = [(entry_id, inner) for _, entry_id, inner in prefix_keys]
+
+    def _names(self, country):
+        for field, rank in self.FIELDS:
+            value = getattr(country, field, None)
+            if not value:
+                continue
+            if isinstance(value, str):
+                yield value, rank
+            elif isinstance(value, dict):
+                for name in value.values():
+                    if name:
+                        yield name, rank
+            else:
+                for name in value:
+                    if name:
+                        yield name, rank
+
+    @staticmethod
+    def _word_starts(name):
+        yield 0
+        for i in range(1, len(name)):
+            if not name[i - 1].isalnum() and name[i].isalnum():
+                yield i
+
+    def search(self, query, limit=10, mode="fuzzy", full_text=False, max_distance=None):
+        """Returns the countries matching query, best matches first.
+
+        :param query - (partial) name of a country, case and accents are ignored.
+        :param limit - maximum number of countries to return, None for all.
+        :param mode - 'exact', 'prefix' (of the name or of a word in it), 'substring' or 'fuzzy'. Every mode includes
+        the matches of the modes before it.
+        :param full_text - only match complete names, like `fullText=true` of the API. Same as mode='exact'.
+        :param max_distance - maximum number of typos for mode='fuzzy', by default it depends on the query length.
+        :returns: list of Country objects
+        """
+        return [
+            country
+            for country, _ in self.ranked(query, limit, mode, full_text, max_distance)
+        ]
+
+    def ranked(self, query, limit=10, mode="fuzzy", full_text=False, max_distance=None):
+        """Like `search`, but returns tuples of (Country, score). Lower scores are better matches."""
+        max_kind = EXACT if full_text else MODES[mode]
+        query = normalize(query)
+        if not query:
+            return []
+        if max_distance is None:
+            max_distance = 0 if len(query) < 5 else 1 if len(query) < 9 else 2
+        max_distance = min(max_distance, MAX_DISTANCE)
+
+        best = {}
+
+        def add(entry_id, kind, distance=0):
+            name, position, rank = self._entries[entry_id]
+            score = (kind + distance, rank, len(name))
+            if score < best.get(position, (FUZZY + max_distance + 1,)):
+                best[position] = score
+
+        for entry_id in self._exact.get(query, ()):
+            add(entry_id, EXACT)
+        if max_kind >= PREFIX:
+            start = bisect_left(self._prefix_keys, query)
+            for i in range(start, len(self._prefix_keys)):
+                if not self._prefix_keys[i].startswith(query):
+                    break
+                entry_id, inner = self._prefix_entries[i]
+                add(entry_id, WORD_PREFIX if inner else PREFIX)
+        if max_kind >= SUBSTRING:
+            bigrams = _bigrams(query)
+            for entry_id in self._candidates(bigrams, self._bigram_postings):
+                if query in self._entries[entry_id][0]:
+                    add(entry_id, SUBSTRING)
+        if max_kind >= FUZZY and max_distance and (limit is None or len(best) < limit):
+            # fuzzy matches rank after all others, so they are only needed when there are not enough results yet.
+            # Every typo changes at most three bigrams of the query (a transposition of two characters).
+            bigrams = _bigrams(query[: self.FUZZY_WINDOW])
+            min_shared = len(bigrams) - 3 * max_distance
+            # only prefixes up to this length can be within max_distance of the query
+            max_length = len(query) + max_distance
+            # a name shorter than this has no prefix within max_distance of the query
+            min_length = len(query) - max_distance
+            counts = self._overlaps(bigrams, self._fuzzy_postings)
+            candidates = heapq.nlargest(
+                self.FUZZY_CANDIDATES,
+                (
+                    (count, -entry_id)
+                    for entry_id, count in counts.items()
+                    if count >= min_shared
+                    and len(self._entries[entry_id][0]) >= min_length
+                ),
+            )
+            distances = {}
+            for _, entry_id in candidates:
+                entry_id = -entry_id
+                name = self._entries[entry_id][0]
+                if name not in distances:
+                    distances[name] = min(
+                        (
+                            _prefix_distance(
+                                query, name[start : start + max_length], max_distance
+                            )
+                            for start in self._word_starts(name)
+                            if len(name) - start >= min_length
+                        ),
+                        key=lambda d: max_distance + 1 if d is None else d,
+                        default=None,
+                    )
+                if distances[name] is not None:
+                    add(entry_id, FUZZY, distances[name])
+
+        ranked = sorted(
+            best.items(), key=lambda item: (item[1], self.countries[item[0]].name or "")
+        )
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(self.countries[position], score) for position, score in ranked]
+
+    def _candidates(self, bigrams, postings):
+        """Returns the entries having all of the bigrams."""
+        if not bigrams:
+            return range(len(self._entries))
+        # intersect starting with the rarest bigram, so the candidate set is small from the start
+        lists = sorted((postings.get(bigram, ()) for bigram in bigrams), key=len)
+        candidates = set(lists[0])
+        for entry_ids in lists[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(entry_ids)
+        return candidates
+
+    def _overlaps(self, bigrams, postings):
+        """Returns the number of bigrams every entry shares with the query."""
+        if not bigrams:
+            return dict.fromkeys(range(len(self._entries)), 0)
+        return Counter(
+            chain.from_iterable(postings.get(bigram, ()) for bigram in bigrams)
+        )
@@ -0,0 +1,90 @@
+from restcountries.snapshot import Snapshot, SnapshotDataset, encode_snapshot
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # pragma: no cover
+    # python < 3.8
+    resource_tracker = shared_memory = None
+
+# names of the blocks created by this process
+_created = set()
+
+
+class SharedDataset(SnapshotDataset):
+    """A SnapshotDataset in shared memory, for servers with preforked worker processes.
+
+    The parent process encodes the snapshot and its indexes once into a block of shared memory. Workers attach to the
+    block by its name and read it in place: they hold no list of countries and no indexes of their own, and reading
+    does not touch reference counts on the shared pages, so they stay shared. Countries are created from their
+    records when a lookup returns them.
+    >>> shared = SharedDataset.create(LocalDataset.from_api().records)  # in the parent, before forking
+    >>> RestCountryApiV2.backend = SharedDataset.attach(shared.name)  # in every worker
+    >>> shared.unlink()  # in the parent, when the server stops
+
+    `search` builds its index from the shared records when it is first called, every process that searches holds
+    its own. Lookups by name and the fallback of capital lookups decode every record.
+    """
+
+    def __init__(self, block, owner=False, country_class=None):
+        """Use `create` or `attach` instead.
+
+        :param block - the SharedMemory block holding the snapshot.
+        :param owner - whether this process created the block and unlinks it.
+        """
+        self.block = block
+        self.owner = owner
+        super().__init__(Snapshot.from_buffer(block.buf), country_class=country_class)
+
+    @classmethod
+    def create(cls, data, name=None, country_class=None):
+        """Copies the countries into a new block of shared memory.
+
+        :param data - list of country dicts as returned by the /all endpoint.
+        :param name - name of the block, by default a random one.
+        """
+        _check_support()
+        _, encoded = encode_snapshot(data, source="shared memory")
+        block = shared_memory.SharedMemory(name=name, create=True, size=len(encoded))
+        block.buf[: len(encoded)] = encoded
+        _created.add(block.name)
+        return cls(block, owner=True, country_class=country_class)
+
+    @classmethod
+    def attach(cls, name, country_class=None):
+        """Attaches to a block created with `create`, e.g. in a worker process."""
+        _check_support()
+        block = shared_memory.SharedMemory(name=name)
+        if block.name not in _created:
+            # only the creating process may remove the block, the resource tracker would remove it when this one exits
+            resource_tracker.unregister(block._name, "shared_memory")
+        return cls(block, country_class=country_class)
+
+    @property
+    def name(self):
+        return self.block.name
+
+    @property
+    def size(self):
+        """Size of the shared block in bytes."""
+        return self.block.size
+
+    def load(self, data):
+        raise TypeError(
+            "a SharedDataset is read-only, create a new one and attach the workers to it"
+        )
+
+    def close(self):
+        """Detaches this process from the block."""
+        super().close()
+        self.block.close()
+
+    def unlink(self):
+        """Detaches and removes the block, call it once in the process that created it."""
+        self.close()
+        self.block.unlink()
+        _created.discard(self.block.name)
+
+
+def _check_support():
+    if shared_memory is None:  # pragma: no cover
+        raise RuntimeError("SharedDataset needs multiprocessing.shared_memory")
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+
+def _share(result):
+    # every waiter gets its own list, so callers cannot change each others results
+    if type(result) == list:
+        return list(result)
+    return result
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one.
+
+    While a call for a key is running, other threads calling `do` with the same key wait for it and receive its
+    result or its exception instead of running the function again.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def do(self, key, func):
+        """Runs func() unless a call for key is already running, in which case its outcome is shared."""
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return _share(call.result)
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """Asyncio version of `SingleFlight`, coalesces concurrent coroutines with the same key into one."""
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._in_flight = {}
+
+    async def do(self, key, coroutine_function):
+        """Awaits coroutine_function() unless a call for key is already running, in which case its outcome is shared."""
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.shared += 1
+            # shield, so a cancelled waiter does not cancel the call of the others
+            return _share(await asyncio.shield(future))
+
+        self.calls += 1
+        future = asyncio.ensure_future(coroutine_function())
+        self._in_flight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
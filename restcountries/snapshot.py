@@ -0,0 +1,527 @@
+"""Compact binary snapshot of the /all endpoint that is memory-mapped instead of parsed.
+
+Build it from the API or from a saved response of /all:
+
+    python -m restcountries.snapshot build --output countries.snapshot
+    python -m restcountries.snapshot build --input all.json --output countries.snapshot
+    python -m restcountries.snapshot info countries.snapshot
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+from restcountries import __version__
+from restcountries.base import RestCountryApiV2
+from restcountries.indexes import DatasetIndexes
+from restcountries.local import LocalDataset
+from restcountries.search import NameSearchIndex
+from restcountries.table import NUMERIC_COLUMNS, STRING_COLUMNS, CountryTable, _float
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+MAGIC = b"RCSNAP\r\n"
+FORMAT_VERSION = 2
+# magic, format version, number of countries, offset and size of the json directory
+HEADER = struct.Struct("<8sIIQQ")
+# string id of missing values in the string columns
+NO_STRING = 0xFFFFFFFF
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _little_endian(values):
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def encode_snapshot(data, source=None):
+    """Encodes the countries in the snapshot format.
+
+    Every numeric column of `CountryTable` is stored as float64 values, every string column as ids into a table of
+    unique strings. Each record is kept as json in the string table as well, for the fields that have no column. The
+    indexes of `DatasetIndexes` are stored as sorted keys with the positions of their countries.
+    :param data - list of country dicts as returned by the /all endpoint.
+    :param source - where the data came from, stored in the metadata of the snapshot.
+    :returns: a tuple (metadata, bytes of the snapshot)
+    """
+    records = list(data)
+    strings = []
+    string_ids = {}
+
+    def string_id(value):
+        if value is None:
+            return NO_STRING
+        found = string_ids.get(value)
+        if found is None:
+            found = string_ids[value] = len(strings)
+            strings.append(value)
+        return found
+
+    columns = {}
+    for name, read in NUMERIC_COLUMNS.items():
+        columns[name] = array("d", [_float(read(record)) for record in records])
+    for name, key in STRING_COLUMNS.items():
+        columns[name] = array("I", [string_id(record.get(key)) for record in records])
+    encoded_records = [
+        json.dumps(record, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+        for record in records
+    ]
+    columns["record"] = array("I", [string_id(text) for text in encoded_records])
+
+    started = time.perf_counter()
+    dataset_indexes = DatasetIndexes(records)
+    indexes = {}
+    for name in DatasetIndexes.UNIQUE + DatasetIndexes.MULTI:
+        keys = sorted(dataset_indexes.keys(name))
+        starts = array("I", [0])
+        positions = array("I")
+        for key in keys:
+            positions.extend(dataset_indexes.get_all(name, key))
+            starts.append(len(positions))
+        indexes[name] = {
+            "keys": array("I", [string_id(key) for key in keys]),
+            "starts": starts,
+            "positions": positions,
+        }
+    index_seconds = time.perf_counter() - started
+
+    blob = bytearray()
+    offsets = array("I", [0])
+    for value in strings:
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+
+    meta = {
+        "format": FORMAT_VERSION,
+        "count": len(records),
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "source": source,
+        "package_version": __version__,
+        "index_build_seconds": index_seconds,
+        "sha256": hashlib.sha256(
+            "\n".join(encoded_records).encode("utf-8")
+        ).hexdigest(),
+    }
+
+    # the sections follow the header, every one aligned to 8 bytes
+    snapshot = bytearray(HEADER.size)
+
+    def append(values):
+        snapshot.extend(b"\0" * (_align(len(snapshot)) - len(snapshot)))
+        offset = len(snapshot)
+        snapshot.extend(_little_endian(values))
+        return offset
+
+    directory = {"meta": meta, "columns": {}, "indexes": {}}
+    for name, column in columns.items():
+        directory["columns"][name] = {"type": column.typecode, "offset": append(column)}
+    for name, index in indexes.items():
+        directory["indexes"][name] = {
+            "count": len(index["keys"]),
+            "keys": append(index["keys"]),
+            "starts": append(index["starts"]),
+            "positions": append(index["positions"]),
+        }
+    directory["strings"] = {"count": len(strings), "offsets": append(offsets)}
+    directory["strings"]["data"] = len(snapshot)
+    snapshot.extend(blob)
+    directory_bytes = json.dumps(directory).encode("utf-8")
+    HEADER.pack_into(
+        snapshot,
+        0,
+        MAGIC,
+        FORMAT_VERSION,
+        len(records),
+        len(snapshot),
+        len(directory_bytes),
+    )
+    snapshot.extend(directory_bytes)
+    return meta, bytes(snapshot)
+
+
+def build_snapshot(data, path, source=None):
+    """Writes the countries as a snapshot to path, see `encode_snapshot`.
+
+    :returns: the metadata of the snapshot
+    """
+    meta, snapshot = encode_snapshot(data, source=source)
+    target = os.path.dirname(os.path.abspath(path))
+    os.makedirs(target, exist_ok=True)
+    # write to a temporary file first, so processes mapping the old snapshot never see a partial one
+    fd, tmp_path = tempfile.mkstemp(dir=target, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as snapshot_file:
+            snapshot_file.write(snapshot)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return meta
+
+
+class Snapshot:
+    """Read-only view of a snapshot file written by `build_snapshot`.
+
+    The file is memory-mapped, opening it only reads the header and a small json directory. Indexes and the string
+    ids of the columns are views of the mapped pages, so processes opening the same snapshot share its memory, and a
+    record is only decoded when it is accessed. Numeric columns are copied when they are requested, at 8 bytes per
+    country, so they stay valid after `close`. `to_dataset` answers the lookups of the API from the mapped file:
+    >>> snapshot = Snapshot("countries.snapshot")
+    >>> snapshot.column("population")[snapshot.find("de")]
+    83240525.0
+    >>> RestCountryApiV2.backend = snapshot.to_dataset()
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as snapshot_file:
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._load(self._mmap)
+        except ValueError:
+            self._mmap.close()
+            raise
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """Reads a snapshot from a buffer holding the bytes of `encode_snapshot`, e.g. a block of shared memory.
+
+        The buffer is not copied.
+        """
+        snapshot = cls.__new__(cls)
+        snapshot.path = None
+        snapshot._mmap = None
+        snapshot._load(buffer)
+        return snapshot
+
+    def _load(self, buffer):
+        self._buffer = buffer
+        self._views = []
+        self._id_columns = {}
+        magic, version, count, directory_offset, directory_size = HEADER.unpack_from(
+            buffer
+        )
+        if magic != MAGIC:
+            raise ValueError("{} is not a country snapshot".format(self.path))
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                "{} has format version {}, expected {}, rebuild it with "
+                "'python -m restcountries.snapshot build'".format(
+                    self.path, version, FORMAT_VERSION
+                )
+            )
+        directory = json.loads(
+            bytes(buffer[directory_offset : directory_offset + directory_size])
+        )
+        self.meta = directory["meta"]
+        self._count = count
+        self._columns = directory["columns"]
+        strings = directory["strings"]
+        self._string_offsets = self._view(strings["offsets"], "I", strings["count"] + 1)
+        self._string_data = strings["data"]
+        self._indexes = {}
+        for name, index in directory["indexes"].items():
+            starts = self._view(index["starts"], "I", index["count"] + 1)
+            self._indexes[name] = (
+                self._view(index["keys"], "I", index["count"]),
+                starts,
+                self._view(index["positions"], "I", starts[-1]),
+            )
+        self._record_ids = self._ids("record")
+
+    def close(self):
+        """Unmaps the file. Columns and tables stay valid, records can no longer be decoded."""
+        for view in self._views:
+            if isinstance(view, memoryview):
+                view.release()
+        self._views = []
+        self._id_columns = {}
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def _view(self, offset, typecode, count):
+        size = array(typecode).itemsize * count
+        view = memoryview(self._buffer)[offset : offset + size].cast(typecode)
+        if sys.byteorder == "big":  # pragma: no cover
+            values = array(typecode, view)
+            values.byteswap()
+            return values
+        self._views.append(view)
+        return view
+
+    def _string(self, string_id):
+        if string_id == NO_STRING:
+            return None
+        start = self._string_data + self._string_offsets[string_id]
+        end = self._string_data + self._string_offsets[string_id + 1]
+        return str(self._buffer[start:end], "utf-8")
+
+    def column(self, name):
+        """Returns a column of `CountryTable.columns`.
+
+        Numeric columns are float64 copies of the file, numpy arrays if numpy is installed and `array('d')`
+        otherwise. String columns are lists of strings.
+        """
+        if name in NUMERIC_COLUMNS:
+            offset = self._columns[name]["offset"]
+            # copied, a view would keep the buffer exported and close could not unmap it
+            values = array("d")
+            values.frombytes(
+                self._buffer[offset : offset + values.itemsize * self._count]
+            )
+            if sys.byteorder == "big":  # pragma: no cover
+                values.byteswap()
+            if numpy is not None:
+                return numpy.frombuffer(values, dtype=numpy.float64)
+            return values
+        if name in STRING_COLUMNS:
+            return [self._string(string_id) for string_id in self._ids(name)]
+        raise KeyError(name)
+
+    def _ids(self, name):
+        ids = self._id_columns.get(name)
+        if ids is None:
+            ids = self._id_columns[name] = self._view(
+                self._columns[name]["offset"], "I", self._count
+            )
+        return ids
+
+    def string(self, name, position):
+        """Returns one value of a string column."""
+        return self._string(self._ids(name)[position])
+
+    def record(self, position):
+        """Returns the country dict at position."""
+        return json.loads(self._string(self._record_ids[position]))
+
+    @property
+    def records(self):
+        """The country dicts, decoded on access."""
+        return _Records(self)
+
+    def country(self, position, country_class=None):
+        country_class = country_class or RestCountryApiV2.country_class
+        return country_class(self.record(position))
+
+    def lookup(self, name, key):
+        """Returns the positions of the countries with key in an index, like `DatasetIndexes.get_all`.
+
+        :param name - name of an index of DatasetIndexes, e.g. 'currency'
+        """
+        keys, starts, positions = self._indexes[name]
+        key = DatasetIndexes.NORMALIZE[name](key)
+        # binary search over the sorted keys, only the compared keys are decoded
+        low, high = 0, len(keys)
+        while low < high:
+            middle = (low + high) // 2
+            if self._string(keys[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(keys) and self._string(keys[low]) == key:
+            return list(positions[starts[low] : starts[low + 1]])
+        return []
+
+    def index_stats(self):
+        """Returns the build time, the size in the snapshot and the number of keys of every index, like
+        `DatasetIndexes.stats`.
+
+        The size counts the key ids, starts and positions of the indexes, the keys themselves are in the string table.
+        """
+        return {
+            "build_seconds": self.meta.get("index_build_seconds"),
+            "memory_bytes": sum(
+                len(view) * view.itemsize
+                for index in self._indexes.values()
+                for view in index
+            ),
+            "keys": {name: len(keys) for name, (keys, _, _) in self._indexes.items()},
+        }
+
+    def find(self, code):
+        """Returns the position of the country with an alpha2 or alpha3 code, or None."""
+        code = str(code).strip()
+        found = self.lookup("alpha2" if len(code) == 2 else "alpha3", code)
+        return found[0] if found else None
+
+    def to_table(self):
+        """Returns a CountryTable over the columns of the snapshot, without decoding the records.
+
+        The records of the table are decoded from the snapshot, `to_countries` needs it to be open.
+        """
+        numeric = {name: self.column(name) for name in NUMERIC_COLUMNS}
+        strings = {
+            name: [None if value is None else sys.intern(value) for value in column]
+            for name, column in ((name, self.column(name)) for name in STRING_COLUMNS)
+        }
+        return CountryTable(numeric, strings, self.records)
+
+    def to_dataset(self, country_class=None):
+        """Returns a `SnapshotDataset` answering the lookups of a LocalDataset from this snapshot in place."""
+        return SnapshotDataset(self, country_class=country_class)
+
+
+class SnapshotDataset(LocalDataset):
+    """A LocalDataset reading a `Snapshot` in place, see `Snapshot.to_dataset`.
+
+    It holds no list of countries and no indexes of its own: lookups use the indexes stored in the snapshot, and
+    countries are created from their records when a lookup returns them. Creating one takes no time, and processes
+    mapping the same snapshot share its pages. The snapshot must stay open while the dataset is used.
+
+    `search` builds its index from the records when it is first called, every process that searches holds its own.
+    Lookups by name and the fallback of capital lookups decode every record.
+    """
+
+    def __init__(self, snapshot, country_class=None):
+        """
+        :param snapshot - the Snapshot to read.
+        :param country_class - class of the returned countries, by default `RestCountryApiV2.country_class`.
+        """
+        self.country_class = country_class or RestCountryApiV2.country_class
+        self.snapshot = snapshot
+        self._snapshot = (
+            snapshot.records,
+            _Countries(snapshot, self.country_class),
+            _Indexes(snapshot),
+            None,
+        )
+
+    def load(self, data):
+        raise TypeError(
+            "a {} is read-only, build a new snapshot instead".format(
+                type(self).__name__
+            )
+        )
+
+    @property
+    def search_index(self):
+        records, countries, indexes, search_index = self._snapshot
+        if search_index is None:
+            search_index = NameSearchIndex(countries)
+            self._snapshot = (records, countries, indexes, search_index)
+        return search_index
+
+    def close(self):
+        """Closes the snapshot."""
+        self.snapshot.close()
+
+
+class _Countries:
+    """Sequence of the countries of a snapshot, each one is created from its record when it is accessed."""
+
+    def __init__(self, snapshot, country_class):
+        self._snapshot = snapshot
+        self._country_class = country_class
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def __getitem__(self, position):
+        return self._snapshot.country(position, self._country_class)
+
+
+class _Indexes:
+    """The lookups of DatasetIndexes answered by the indexes stored in a snapshot."""
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def get(self, name, key):
+        found = self._snapshot.lookup(name, key)
+        return found[0] if found else None
+
+    def get_all(self, name, key):
+        return self._snapshot.lookup(name, key)
+
+    def stats(self):
+        return self._snapshot.index_stats()
+
+
+class _Records:
+    """Sequence of the records of a snapshot, each one is decoded when it is accessed."""
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[index] for index in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        return self._snapshot.record(position)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self._snapshot.record(position)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+    build = commands.add_parser("build", help="build a snapshot")
+    build.add_argument(
+        "--input", help="saved response of /all, by default it is fetched from the API"
+    )
+    build.add_argument("--output", required=True, help="path of the snapshot")
+    info = commands.add_parser("info", help="show the metadata of a snapshot")
+    info.add_argument("path")
+    options = parser.parse_args(argv)
+
+    if options.command == "build":
+        if options.input:
+            with open(options.input, "rb") as input_file:
+                data = json.load(input_file)
+            source = os.path.abspath(options.input)
+        else:
+            uri = RestCountryApiV2._build_uri("/all")
+            status_code, body = RestCountryApiV2._fetch(uri)
+            if status_code != 200:
+                print("GET {} returned {}".format(uri, status_code), file=sys.stderr)
+                return 1
+            data = RestCountryApiV2.json_backend.loads(body)
+            source = uri
+        meta = build_snapshot(data, options.output, source=source)
+        print(
+            "wrote {} countries to {} ({} bytes)".format(
+                meta["count"], options.output, os.path.getsize(options.output)
+            )
+        )
+        return 0
+
+    with Snapshot(options.path) as snapshot:
+        print(json.dumps(snapshot.meta, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(chunks, encoding="utf-8"):
+    """Decodes a json array incrementally and yields its items one at a time.
+
+    Only the current item and the unparsed rest of the last chunk are kept in memory. If the document is not an array,
+    e.g. a single country, it is decoded as a whole and yielded as the only item.
+    :param chunks - iterable of bytes, e.g. `response.iter_content()`
+    :param encoding - encoding of the bytes
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)()
+    buffer = ""
+    started = False
+    expect_item = True
+    finished = False
+    chunks = iter(chunks)
+
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position == len(buffer):
+                break
+            if not started:
+                if buffer[position] != "[":
+                    # not an array, decode the whole document
+                    rest = buffer[position:] + "".join(
+                        text_decoder.decode(chunk) for chunk in chunks
+                    )
+                    rest += text_decoder.decode(b"", final=True)
+                    yield json.loads(rest)
+                    return
+                started = True
+                position += 1
+                continue
+            char = buffer[position]
+            if char == "]":
+                finished = True
+                break
+            if expect_item:
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except ValueError:
+                    break  # the item continues in the next chunk
+                if end == len(buffer):
+                    # a number could continue in the next chunk, wait for the separator
+                    break
+                yield item
+                position = end
+                expect_item = False
+            elif char == ",":
+                position += 1
+                expect_item = True
+            else:
+                raise ValueError(
+                    "Invalid json array at {!r}".format(buffer[position:][:20])
+                )
+        buffer = buffer[position:]
+        if finished:
+            return
+
+    buffer += text_decoder.decode(b"", final=True)
+    if not started and not buffer.strip():
+        raise ValueError("Empty json document")
+    raise ValueError("Incomplete json array")
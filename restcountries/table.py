@@ -0,0 +1,237 @@
+import math
+import operator
+import sys
+from array import array
+
+import requests
+
+from restcountries.base import RestCountryApiV2
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+# numeric columns and how they are read from a country dict, missing values become NaN
+NUMERIC_COLUMNS = {
+    "population": lambda data: data.get("population"),
+    "area": lambda data: data.get("area"),
+    "gini": lambda data: data.get("gini"),
+    "lat": lambda data: (data.get("latlng") or [None, None])[0],
+    "lng": lambda data: (data.get("latlng") or [None, None])[1],
+}
+# string columns and their json keys
+STRING_COLUMNS = {
+    "name": "name",
+    "alpha2_code": "alpha2Code",
+    "alpha3_code": "alpha3Code",
+    "numeric_code": "numericCode",
+    "region": "region",
+    "subregion": "subregion",
+    "capital": "capital",
+    "demonym": "demonym",
+    "cioc": "cioc",
+}
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+AGGREGATIONS = ("sum", "mean", "min", "max", "count")
+
+
+def _float(value):
+    return float("nan") if value is None else float(value)
+
+
+class CountryTable:
+    """Column oriented container for analytics over many countries.
+
+    Numeric fields (population, area, gini, lat, lng) are stored as contiguous float columns, NaN marks missing values.
+    They are numpy arrays if numpy is installed, otherwise `array.array('d')`. Codes and names are stored as columns of
+    interned strings. Filtering, sorting and aggregation work on the columns without creating a Country per row:
+    >>> table = CountryTable.from_api()
+    >>> table.filter(table.mask("population", ">", 5000000)).group_by("region", "population")
+    """
+
+    def __init__(self, numeric_columns, string_columns, records):
+        self._numeric = numeric_columns
+        self._strings = string_columns
+        self._records = records
+
+    @classmethod
+    def from_data(cls, data):
+        """Builds a table from a list of country dicts as returned by the /all endpoint."""
+        records = list(data)
+        numeric = {
+            name: cls._to_column([_float(read(record)) for record in records])
+            for name, read in NUMERIC_COLUMNS.items()
+        }
+        strings = {
+            name: [
+                None if record.get(key) is None else sys.intern(record[key])
+                for record in records
+            ]
+            for name, key in STRING_COLUMNS.items()
+        }
+        return cls(numeric, strings, records)
+
+    @classmethod
+    def from_api(cls, api=RestCountryApiV2):
+        """Builds a table from one request to the /all endpoint."""
+        status_code, body = api._fetch(api._build_uri("/all"))
+        if status_code != 200:
+            raise requests.exceptions.RequestException
+        return cls.from_data(api.json_backend.loads(body))
+
+    @staticmethod
+    def _to_column(values):
+        if numpy is not None:
+            return numpy.array(values, dtype=numpy.float64)
+        return array("d", values)
+
+    def __len__(self):
+        return len(self._records)
+
+    @property
+    def columns(self):
+        return tuple(self._numeric) + tuple(self._strings)
+
+    def column(self, name):
+        """Returns a column, numeric columns are numpy arrays or `array.array('d')`, string columns are lists."""
+        if name in self._numeric:
+            return self._numeric[name]
+        return self._strings[name]
+
+    def density(self):
+        """Returns the population per square kilometre of every row, NaN if the area is unknown or zero."""
+        population, area = self._numeric["population"], self._numeric["area"]
+        if numpy is not None:
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                return numpy.where(area > 0, population / area, numpy.nan)
+        return array(
+            "d", (p / a if a > 0 else float("nan") for p, a in zip(population, area))
+        )
+
+    def mask(self, name, op, value):
+        """Returns a boolean mask of the rows where `column <op> value` holds, e.g. mask("area", ">", 1000).
+
+        :param op - one of ==, !=, <, <=, >, >= or 'in' with a collection as value.
+        """
+        column = self.column(name)
+        if numpy is not None and name in self._numeric:
+            if op == "in":
+                return numpy.isin(column, list(value))
+            return OPERATORS[op](column, value)
+        if op == "in":
+            value = set(value)
+            return [item in value for item in column]
+        compare = OPERATORS[op]
+        return [item is not None and compare(item, value) for item in column]
+
+    def filter(self, mask):
+        """Returns a new table with the rows where mask is true."""
+        if numpy is not None:
+            return self.take(numpy.flatnonzero(mask))
+        return self.take([position for position, keep in enumerate(mask) if keep])
+
+    def take(self, positions):
+        """Returns a new table with the rows at positions, in that order."""
+        if numpy is not None:
+            index = numpy.asarray(positions, dtype=numpy.intp)
+            numeric = {name: column[index] for name, column in self._numeric.items()}
+            positions = index.tolist()
+        else:
+            positions = list(positions)
+            numeric = {
+                name: array("d", (column[position] for position in positions))
+                for name, column in self._numeric.items()
+            }
+        strings = {
+            name: [column[position] for position in positions]
+            for name, column in self._strings.items()
+        }
+        return CountryTable(
+            numeric, strings, [self._records[position] for position in positions]
+        )
+
+    def sort_by(self, name, reverse=False):
+        """Returns a new table sorted by a column, rows with missing values come last."""
+        column = self.column(name)
+        if numpy is not None and name in self._numeric:
+            # numpy sorts NaN to the end, a stable sort keeps the order of equal values
+            order = numpy.argsort(-column if reverse else column, kind="stable")
+            return self.take(order.tolist())
+        present = [
+            position
+            for position, value in enumerate(column)
+            if value is not None and value == value
+        ]
+        missing = [
+            position
+            for position, value in enumerate(column)
+            if value is None or value != value
+        ]
+        present.sort(key=column.__getitem__, reverse=reverse)
+        return self.take(present + missing)
+
+    def aggregate(self, name, func="sum"):
+        """Aggregates a numeric column, NaN values are ignored.
+
+        :param func - one of 'sum', 'mean', 'min', 'max' or 'count'.
+        """
+        return self._aggregate(self._numeric[name], func)
+
+    def group_by(self, by, name, func="sum"):
+        """Aggregates a numeric column per value of a string column.
+
+        E.g. group_by("region", "population") returns the total population per region.
+        :returns: dict of group value to aggregate
+        """
+        groups = {}
+        for position, key in enumerate(self._strings[by]):
+            groups.setdefault(key, []).append(position)
+        column = self._numeric[name]
+        if numpy is not None:
+            return {
+                key: self._aggregate(column[numpy.array(positions)], func)
+                for key, positions in groups.items()
+            }
+        return {
+            key: self._aggregate([column[position] for position in positions], func)
+            for key, positions in groups.items()
+        }
+
+    @staticmethod
+    def _aggregate(values, func):
+        if func not in AGGREGATIONS:
+            raise ValueError("func must be one of {}".format(", ".join(AGGREGATIONS)))
+        if numpy is not None:
+            values = numpy.asarray(values)
+            values = values[~numpy.isnan(values)]
+            if func == "count":
+                return int(values.size)
+            if not values.size:
+                return 0.0 if func == "sum" else float("nan")
+            return float(getattr(numpy, func)(values))
+        values = [value for value in values if not math.isnan(value)]
+        if func == "count":
+            return len(values)
+        if func == "sum":
+            return math.fsum(values)
+        if not values:
+            return float("nan")
+        if func == "mean":
+            return math.fsum(values) / len(values)
+        return {"min": min, "max": max}[func](values)
+
+    def to_countries(self, country_class=None):
+        """Returns the rows as Country objects.
+
+        :param country_class - class of the countries, by default `RestCountryApiV2.country_class`.
+        """
+        country_class = country_class or RestCountryApiV2.country_class
+        return [country_class(record) for record in self._records]
@@ -2,6 +2,7 @@ import pytest
 
 from restcountries.base import Country
 from restcountries.tests.countries_data import RSA, NGR, EGY, KEN
+from restcountries.tests.server import StubServer
 
 BASE_URI = "https://restcountries.com/v2"
 
@@ -39,6 +40,15 @@ def fixture_all_countries(south_africa, nigeria, egypt, kenya):
     }
 
 
+@pytest.fixture(name="stub_server")
+def fixture_stub_server():
+    """
+    Runs a local stub server of the API in a background thread.
+    """
+    with StubServer() as server:
+        yield server
+
+
 @pytest.fixture(name="mock_get_all_countries")
 def fixture_mock_get_all_countries(requests_mock):
     """
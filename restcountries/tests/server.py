@@ -0,0 +1,78 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    """
+    Local HTTP server answering GET requests from a map of path to (status code, json payload).
+
+    Used by the tests and by the benchmarks, so the request paths run offline and without rate limits.
+    >>> with StubServer({"/v2/all": (200, payload)}) as server:
+    ...     RestCountryApiV2.BASE_URI = server.base_uri
+    """
+
+    daemon_threads = True
+    # the benchmarks of concurrent lookups open many connections at once
+    request_queue_size = 128
+
+    def __init__(self, routes=None, delay=0):
+        """
+        :param routes - dict of request path, e.g. '/v2/all', to (status code, json payload). A payload of bytes is
+        sent as it is.
+        :param delay - seconds every response is delayed, to simulate a slow API or the network.
+        """
+        super().__init__(("127.0.0.1", 0), StubRequestHandler)
+        self.routes = routes if routes is not None else {}
+        self.delay = delay
+        self.requests = []
+        self._thread = None
+
+    @property
+    def base_uri(self):
+        return "http://127.0.0.1:{}/v2".format(self.server_address[1])
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def handle_error(self, request, client_address):
+        # clients that timed out close the connection before the response is written
+        pass
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, without this every response waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        status_code, payload = self.server.routes.get(
+            self.path, (404, {"status": 404, "message": "Not Found"})
+        )
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
@@ -0,0 +1,182 @@
+import asyncio
+import json
+
+import pytest
+import requests
+
+from restcountries.aio import AsyncRestCountryApiV2, ThreadedTransport
+from restcountries.resilience import CircuitBreaker, CircuitOpenError
+from restcountries.tests.countries_data import RSA, NGR, EGY, KEN
+
+BASE_URI = "https://restcountries.com/v2"
+
+
+class FakeTransport:
+    """
+    Transport answering from a map of uri to (status code, json payload).
+    """
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.fetched = []
+
+    async def fetch(self, uri, headers=None, event=None):
+        self.fetched.append(uri)
+        await asyncio.sleep(0)
+        status_code, payload = self.routes.get(uri, (404, {}))
+        return status_code, json.dumps(payload).encode("utf-8"), {}
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture(name="fake_transport")
+def fixture_fake_transport(monkeypatch):
+    transport = FakeTransport(
+        {
+            BASE_URI + "/all": (200, [RSA, NGR, EGY, KEN]),
+            BASE_URI + "/name/kenya": (200, [KEN]),
+            BASE_URI + "/alpha/ng": (200, NGR),
+            BASE_URI + "/alpha?codes=ng;eg&fields=name": (200, [NGR, EGY]),
+            BASE_URI + "/currency/zar": (200, [RSA]),
+            BASE_URI + "/region/africa?fields=name": (200, [RSA, NGR, EGY, KEN]),
+            BASE_URI + "/all?fields=name": (500, {}),
+        }
+    )
+    monkeypatch.setattr(AsyncRestCountryApiV2, "transport", transport)
+    return transport
+
+
+def test_async_lookups(fake_transport, countries_map):
+    """
+    Test that every lookup is available as a coroutine.
+    """
+
+    async def lookups():
+        return await asyncio.gather(
+            AsyncRestCountryApiV2.get_all(),
+            AsyncRestCountryApiV2.get_countries_by_name("kenya"),
+            AsyncRestCountryApiV2.get_country_by_country_code("ng"),
+            AsyncRestCountryApiV2.get_countries_by_country_codes(
+                ["ng", "eg"], filters=["name"]
+            ),
+            AsyncRestCountryApiV2.get_countries_by_currency("zar"),
+            AsyncRestCountryApiV2.get_countries_by_region("africa", filters=["name"]),
+        )
+
+    all_countries, by_name, by_code, by_codes, by_currency, by_region = asyncio.run(
+        lookups()
+    )
+    assert sorted(all_countries) == sorted(countries_map.values())
+    assert by_name == [countries_map["kenya"]]
+    assert by_code == countries_map["nigeria"]
+    assert by_codes == [countries_map["nigeria"], countries_map["egypt"]]
+    assert by_currency == [countries_map["south_africa"]]
+    assert sorted(by_region) == sorted(countries_map.values())
+
+
+def test_async_gather_many_lookups(fake_transport, kenya):
+    """
+    Test that hundreds of lookups can be gathered at once and identical ones share one request.
+    """
+
+    async def lookups():
+        return await asyncio.gather(
+            *(AsyncRestCountryApiV2.get_countries_by_name("kenya") for _ in range(300))
+        )
+
+    results = asyncio.run(lookups())
+    assert results == [[kenya]] * 300
+    assert len(fake_transport.fetched) == 1
+
+
+@pytest.mark.parametrize(
+    "lookup, exception",
+    [
+        (
+            lambda: AsyncRestCountryApiV2.get_countries_by_name("atlantis"),
+            requests.exceptions.InvalidURL,
+        ),
+        (
+            lambda: AsyncRestCountryApiV2.get_all(filters=["name"]),
+            requests.exceptions.RequestException,
+        ),
+    ],
+)
+def test_async_errors(fake_transport, lookup, exception):
+    """
+    Test that failing requests raise the same exceptions as the synchronous client.
+    """
+    with pytest.raises(exception):
+        asyncio.run(lookup())
+
+
+@pytest.mark.usefixtures("mock_get_countries_by_name")
+def test_threaded_transport(monkeypatch, kenya):
+    """
+    Test that the threaded fallback transport uses the pooled session.
+    """
+    monkeypatch.setattr(AsyncRestCountryApiV2, "transport", ThreadedTransport())
+
+    async def lookup():
+        try:
+            return await AsyncRestCountryApiV2.get_countries_by_name("kenya")
+        finally:
+            await AsyncRestCountryApiV2.close()
+
+    assert asyncio.run(lookup()) == [kenya]
+
+
+def test_aiohttp_transport(monkeypatch, stub_server, nigeria, kenya):
+    """
+    Test the aiohttp transport against a local stub server.
+    """
+    pytest.importorskip("aiohttp")
+    from restcountries.aio import AiohttpTransport
+
+    stub_server.routes["/v2/alpha/ng"] = (200, NGR)
+    stub_server.routes["/v2/name/kenya"] = (200, [KEN])
+    monkeypatch.setattr(AsyncRestCountryApiV2, "BASE_URI", stub_server.base_uri)
+    monkeypatch.setattr(AsyncRestCountryApiV2, "transport", AiohttpTransport(limit=4))
+
+    async def lookups():
+        try:
+            return await asyncio.gather(
+                *(
+                    AsyncRestCountryApiV2.get_country_by_country_code("ng")
+                    for _ in range(20)
+                ),
+                AsyncRestCountryApiV2.get_countries_by_name("kenya"),
+            )
+        finally:
+            await AsyncRestCountryApiV2.close()
+
+    results = asyncio.run(lookups())
+    assert results[:20] == [nigeria] * 20
+    assert results[20] == [kenya]
+
+
+def test_threaded_transport_subclass(requests_mock):
+    """
+    Test that the threaded transport honors the circuit breaker of the class it fetches for.
+    """
+
+    class BreakingApi(AsyncRestCountryApiV2):
+        transport = ThreadedTransport()
+        circuit_breaker = CircuitBreaker(failure_threshold=1)
+
+    requests_mock.get(BASE_URI + "/name/kenya", status_code=500)
+
+    async def lookups():
+        try:
+            with pytest.raises(requests.exceptions.HTTPError):
+                await BreakingApi.get_countries_by_name("kenya")
+            for _ in range(2):
+                with pytest.raises(CircuitOpenError):
+                    await BreakingApi.get_countries_by_name("kenya")
+        finally:
+            await BreakingApi.close()
+
+    asyncio.run(lookups())
+    assert BreakingApi.circuit_breaker.failures == 1
+    assert requests_mock.call_count == 1
@@ -271,3 +271,28 @@ def test_get_countries_by_subregion_with_filter(countries_map, subregion, countr
     """
     countries = rapi.get_countries_by_subregion(subregion, filters=["name"])
     assert countries == [countries_map[country_name]]
+
+
+@pytest.mark.usefixtures("mock_get_countries_by_name", "mock_get_all_countries")
+def test_session_is_shared_between_lookups():
+    """
+    Test that all lookups go through the same pooled session.
+    """
+    session = rapi.get_session()
+    rapi.get_all()
+    rapi.get_countries_by_name("kenya")
+    assert rapi.get_session() is session
+
+
+def test_configure_session():
+    """
+    Test that the shared session can be replaced and its pool size configured.
+    """
+    old_session = rapi.get_session()
+    try:
+        rapi.configure_session(pool_maxsize=32)
+        session = rapi.get_session()
+        assert session is not old_session
+        assert session.get_adapter(rapi.BASE_URI)._pool_maxsize == 32
+    finally:
+        rapi.configure_session(pool_maxsize=10)
@@ -0,0 +1,110 @@
+import concurrent.futures
+import time
+
+import pytest
+import requests
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.batch import QueryBatch, map_queries
+from restcountries.tests.countries_data import RSA, NGR, EGY, KEN
+
+BASE_URI = "https://restcountries.com/v2"
+
+
+def test_map_queries(requests_mock, countries_map):
+    """
+    Test that queries of different kinds are returned in order.
+    """
+    requests_mock.get(BASE_URI + "/alpha/ke", json=KEN)
+    requests_mock.get(BASE_URI + "/currency/ngn?fields=name", json=[NGR])
+    requests_mock.get(BASE_URI + "/alpha?codes=za;eg", json=[RSA, EGY])
+    results = map_queries(
+        [
+            ("get_country_by_country_code", "ke", None),
+            ("get_countries_by_currency", ("ngn",), ["name"]),
+            ("get_countries_by_country_codes", (["za", "eg"],), None),
+        ]
+    )
+    assert [result.get() for result in results] == [
+        countries_map["kenya"],
+        [countries_map["nigeria"]],
+        [countries_map["south_africa"], countries_map["egypt"]],
+    ]
+    assert all(result.ok for result in results)
+
+
+def test_map_queries_runs_concurrently(monkeypatch, stub_server):
+    """
+    Test that the total latency is close to the one of the slowest query.
+    """
+    monkeypatch.setattr(rapi, "BASE_URI", stub_server.base_uri)
+    stub_server.delay = 0.2
+    stub_server.routes["/v2/name/kenya"] = (200, [KEN])
+    stub_server.routes["/v2/name/nigeria"] = (200, [NGR])
+    stub_server.routes["/v2/currency/egp"] = (200, [EGY])
+    stub_server.routes["/v2/alpha/za"] = (200, RSA)
+    started = time.perf_counter()
+    results = map_queries(
+        [
+            ("get_countries_by_name", "kenya", None),
+            ("get_countries_by_name", "nigeria", None),
+            ("get_countries_by_currency", "egp", None),
+            ("get_country_by_country_code", "za", None),
+        ]
+    )
+    assert time.perf_counter() - started < 0.6
+    assert results[3].get().name == "South Africa"
+    assert [result.get()[0].name for result in results[:3]] == [
+        "Kenya",
+        "Nigeria",
+        "Egypt",
+    ]
+
+
+def test_map_queries_errors(requests_mock, kenya):
+    """
+    Test that a failing query does not affect the others.
+    """
+    requests_mock.get(BASE_URI + "/name/kenya", json=[KEN])
+    requests_mock.get(BASE_URI + "/name/atlantis", status_code=404)
+    ok, failed = map_queries(
+        [
+            ("get_countries_by_name", "kenya", None),
+            ("get_countries_by_name", "atlantis", None),
+        ]
+    )
+    assert ok.get() == [kenya]
+    assert not failed.ok
+    assert isinstance(failed.error, requests.exceptions.InvalidURL)
+    with pytest.raises(requests.exceptions.InvalidURL):
+        failed.get()
+
+
+def test_query_batch_timeout(kenya):
+    """
+    Test that queries still running at the deadline are reported as timed out.
+    """
+
+    def slow_lookup():
+        time.sleep(1)
+
+    batch = QueryBatch(max_workers=2)
+    assert batch.add(lambda name: [kenya], "kenya") == 0
+    assert batch.add(slow_lookup) == 1
+    started = time.perf_counter()
+    fast, slow = batch.run(timeout=0.2)
+    assert time.perf_counter() - started < 0.8
+    assert fast.get() == [kenya]
+    assert isinstance(slow.error, concurrent.futures.TimeoutError)
+
+
+def test_query_batch_rejects_unknown_methods():
+    """
+    Test that only lookup methods can be queried by name.
+    """
+    batch = QueryBatch()
+    with pytest.raises(ValueError):
+        batch.add("close_session")
+    with pytest.raises(ValueError):
+        batch.add("get_countries_by_planet", "mars")
+    assert batch.run() == []
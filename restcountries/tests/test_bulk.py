@@ -0,0 +1,109 @@
+import asyncio
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.aio import AsyncRestCountryApiV2
+from restcountries.cache import LRUCache
+from restcountries.local import LocalDataset
+from restcountries.tests.countries_data import RSA, NGR, EGY, KEN
+from restcountries.tests.test_aio import FakeTransport
+
+BASE_URI = "https://restcountries.com/v2"
+
+
+def test_bulk_get_by_codes(requests_mock, countries_map):
+    """
+    Test that codes are de-duplicated, requested at once and returned in their order.
+    """
+    requests_mock.get(BASE_URI + "/alpha?codes=KE;NGA;XX;ZA", json=[RSA, NGR, KEN])
+    result = rapi.bulk_get_by_codes(["ke", "NGA", "xx", "ke", "za"])
+    assert list(result) == ["ke", "NGA", "xx", "za"]
+    assert result == {
+        "ke": countries_map["kenya"],
+        "NGA": countries_map["nigeria"],
+        "xx": None,
+        "za": countries_map["south_africa"],
+    }
+    assert requests_mock.call_count == 1
+
+
+def test_bulk_get_by_codes_chunks(monkeypatch, requests_mock, countries_map):
+    """
+    Test that long lists of codes are split into several requests.
+    """
+    monkeypatch.setattr(rapi, "MAX_URI_LENGTH", len(BASE_URI) + 19)
+    requests_mock.get(BASE_URI + "/alpha?codes=ZA;NG", json=[RSA, NGR])
+    requests_mock.get(BASE_URI + "/alpha?codes=EG;KE", json=[EGY, KEN])
+    result = rapi.bulk_get_by_codes(["za", "ng", "eg", "ke"])
+    assert list(result.values()) == [
+        countries_map["south_africa"],
+        countries_map["nigeria"],
+        countries_map["egypt"],
+        countries_map["kenya"],
+    ]
+    assert requests_mock.call_count == 2
+
+
+def test_bulk_get_by_codes_not_found(requests_mock):
+    """
+    Test that a chunk without any known code marks all its codes as missing.
+    """
+    requests_mock.get(BASE_URI + "/alpha?codes=XX;YY", status_code=404)
+    assert rapi.bulk_get_by_codes(["xx", "yy"]) == {"xx": None, "yy": None}
+
+
+def test_bulk_get_by_codes_filters(requests_mock, kenya):
+    """
+    Test that the alpha codes are added to the filters to match the countries to the codes.
+    """
+    requests_mock.get(
+        BASE_URI + "/alpha?codes=KE&fields=name;alpha2Code;alpha3Code", json=[KEN]
+    )
+    assert rapi.bulk_get_by_codes(["ke"], filters=["name"]) == {"ke": kenya}
+
+
+def test_bulk_get_by_codes_uses_cache(monkeypatch, requests_mock, countries_map):
+    """
+    Test that cached codes are not requested again and fetched codes are cached.
+    """
+    monkeypatch.setattr(rapi, "cache", LRUCache())
+    requests_mock.get(BASE_URI + "/alpha/ke", json=KEN)
+    requests_mock.get(BASE_URI + "/alpha?codes=NG", json=[NGR])
+    rapi.get_country_by_country_code("ke")
+    result = rapi.bulk_get_by_codes(["ke", "ng"])
+    assert result == {"ke": countries_map["kenya"], "ng": countries_map["nigeria"]}
+    assert rapi.bulk_get_by_codes(["ng", "ke"]) == {
+        "ng": countries_map["nigeria"],
+        "ke": countries_map["kenya"],
+    }
+    assert requests_mock.call_count == 2
+
+
+def test_bulk_get_by_codes_local(monkeypatch, countries_map):
+    """
+    Test that the codes are looked up in the local dataset.
+    """
+    monkeypatch.setattr(rapi, "backend", LocalDataset([RSA, NGR, EGY, KEN]))
+    assert rapi.bulk_get_by_codes(["egy", "xx"]) == {
+        "egy": countries_map["egypt"],
+        "xx": None,
+    }
+
+
+def test_async_bulk_get_by_codes(monkeypatch, countries_map):
+    """
+    Test the asyncio version.
+    """
+    transport = FakeTransport(
+        {
+            BASE_URI + "/alpha?codes=ZA": (200, [RSA]),
+            BASE_URI + "/alpha?codes=KEN": (200, [KEN]),
+        }
+    )
+    monkeypatch.setattr(AsyncRestCountryApiV2, "transport", transport)
+    monkeypatch.setattr(AsyncRestCountryApiV2, "MAX_URI_LENGTH", len(BASE_URI) + 17)
+    result = asyncio.run(AsyncRestCountryApiV2.bulk_get_by_codes(["za", "ken"]))
+    assert result == {
+        "za": countries_map["south_africa"],
+        "ken": countries_map["kenya"],
+    }
+    assert len(transport.fetched) == 2
@@ -0,0 +1,130 @@
+import threading
+
+import pytest
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.cache import LRUCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(name="cache")
+def fixture_cache(monkeypatch):
+    cache = LRUCache(maxsize=4)
+    monkeypatch.setattr(rapi, "cache", cache)
+    return cache
+
+
+def test_lru_eviction():
+    """
+    Test that the least recently used entry is evicted when the cache is full.
+    """
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {
+        "size": 2,
+        "maxsize": 2,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+        "expirations": 0,
+    }
+
+
+def test_ttl_expiry():
+    """
+    Test that entries expire after their time to live.
+    """
+    timer = FakeTimer()
+    cache = LRUCache(ttl=10, timer=timer)
+    cache.set("a", 1)
+    timer.now = 9.9
+    assert cache.get("a") == 1
+    timer.now = 10
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+    assert len(cache) == 0
+
+
+def test_invalidate():
+    """
+    Test that single entries or the whole cache can be invalidated.
+    """
+    cache = LRUCache()
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_concurrent_access():
+    """
+    Test that the cache stays consistent when used from many threads.
+    """
+    cache = LRUCache(maxsize=50)
+
+    def worker(offset):
+        for i in range(1000):
+            cache.set((offset + i) % 100, i)
+            cache.get(i % 100)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats["size"] == 50
+    assert stats["hits"] + stats["misses"] == 8000
+
+
+def test_lookups_are_cached(cache, requests_mock, mock_get_countries_by_region):
+    """
+    Test that repeated lookups are answered from the cache.
+    """
+    countries = rapi.get_countries_by_region("africa")
+    assert rapi.get_countries_by_region(" Africa") == countries
+    assert requests_mock.call_count == 1
+    assert cache.hits == 1
+
+    # the cached list cannot be changed by callers
+    countries.clear()
+    assert len(rapi.get_countries_by_region("africa")) == 4
+
+
+def test_cache_key_includes_filters(cache, requests_mock):
+    """
+    Test that lookups with other filters are not answered from the cache.
+    """
+    requests_mock.get(rapi.BASE_URI + "/all?fields=name", json=[])
+    requests_mock.get(rapi.BASE_URI + "/all?fields=capital;name", json=[])
+    rapi.get_all(filters=["name"])
+    rapi.get_all(filters=["capital", "name"])
+    rapi.get_all(filters=["name", "capital"])
+    assert requests_mock.call_count == 2
+
+
+@pytest.mark.usefixtures("mock_get_country_by_country_code")
+def test_invalidate_cache(cache, requests_mock):
+    """
+    Test that invalidating the cache makes the next lookup hit the API again.
+    """
+    rapi.get_country_by_country_code("za")
+    rapi.invalidate_cache()
+    rapi.get_country_by_country_code("za")
+    assert requests_mock.call_count == 2
@@ -0,0 +1,83 @@
+import pickle
+from types import MappingProxyType
+
+import pytest
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.compact import CompactCountry
+from restcountries.tests.countries_data import RSA, NGR, KEN
+
+
+@pytest.fixture(name="compact_kenya")
+def fixture_compact_kenya():
+    return CompactCountry(KEN)
+
+
+def test_attributes(compact_kenya, kenya):
+    """
+    Test that a compact country has the same attributes as a Country.
+    """
+    assert compact_kenya.name == kenya.name
+    assert compact_kenya.population == kenya.population
+    assert list(compact_kenya.borders) == kenya.borders
+    assert [dict(currency) for currency in compact_kenya.currencies] == kenya.currencies
+    assert dict(compact_kenya.translations) == kenya.translations
+    assert compact_kenya == kenya
+    assert hash(compact_kenya) == hash(kenya)
+    assert not hasattr(compact_kenya, "__dict__")
+
+
+def test_nested_fields_are_decoded_lazily(compact_kenya):
+    """
+    Test that nested fields are only decoded on first access.
+    """
+    assert compact_kenya._nested is not None
+    assert isinstance(compact_kenya.translations, MappingProxyType)
+    assert compact_kenya._nested is None
+
+
+def test_values_are_shared():
+    """
+    Test that identical nested values of different countries are the same object.
+    """
+    south_africa = CompactCountry(RSA)
+    nigeria = CompactCountry(NGR)
+    kenya = CompactCountry(KEN)
+    english = [lang for lang in kenya.languages if lang["iso639_1"] == "en"][0]
+    assert [lang for lang in nigeria.languages if lang["iso639_1"] == "en"][
+        0
+    ] is english
+    assert [lang for lang in south_africa.languages if lang["iso639_1"] == "en"][
+        0
+    ] is english
+    assert south_africa.region is kenya.region
+
+
+def test_read_only(compact_kenya):
+    """
+    Test that compact countries cannot be changed.
+    """
+    with pytest.raises(AttributeError):
+        compact_kenya.name = "Atlantis"
+    with pytest.raises(TypeError):
+        compact_kenya.translations["de"] = "Atlantis"
+
+
+def test_pickle(compact_kenya):
+    """
+    Test that compact countries can be pickled, e.g. to send them to other processes.
+    """
+    copy = pickle.loads(pickle.dumps(compact_kenya))
+    assert copy == compact_kenya
+    assert copy.to_dict() == compact_kenya.to_dict()
+
+
+@pytest.mark.usefixtures("mock_get_all_countries")
+def test_country_class(monkeypatch, countries_map):
+    """
+    Test that lookups can return compact countries.
+    """
+    monkeypatch.setattr(rapi, "country_class", CompactCountry)
+    countries = rapi.get_all()
+    assert all(isinstance(country, CompactCountry) for country in countries)
+    assert sorted(countries) == sorted(countries_map.values())
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.aio import AsyncRestCountryApiV2, ThreadedTransport
+from restcountries.disk_cache import DiskCache
+from restcountries.tests.countries_data import RSA, NGR, EGY, KEN
+
+ALL_URI = rapi.BASE_URI + "/all"
+
+
+@pytest.fixture(name="disk_cache")
+def fixture_disk_cache(monkeypatch, tmp_path):
+    disk_cache = DiskCache(str(tmp_path))
+    monkeypatch.setattr(rapi, "disk_cache", disk_cache)
+    return disk_cache
+
+
+def test_revalidation_with_etag(disk_cache, requests_mock, countries_map):
+    """
+    Test that a stored response is revalidated with its ETag and a 304 is answered from the disk.
+    """
+    requests_mock.get(
+        ALL_URI,
+        [
+            {
+                "json": [RSA, NGR, EGY, KEN],
+                "headers": {"ETag": '"v1"', "Last-Modified": "Wed, 01 Jun 2022"},
+            },
+            {"status_code": 304},
+        ],
+    )
+    assert sorted(rapi.get_all()) == sorted(countries_map.values())
+    assert sorted(rapi.get_all()) == sorted(countries_map.values())
+
+    revalidation = requests_mock.request_history[1]
+    assert revalidation.headers["If-None-Match"] == '"v1"'
+    assert revalidation.headers["If-Modified-Since"] == "Wed, 01 Jun 2022"
+    assert disk_cache.stats()["revalidations"] == 1
+    assert disk_cache.stats()["misses"] == 1
+
+
+def test_cache_survives_restarts(tmp_path, monkeypatch, requests_mock, kenya):
+    """
+    Test that a new cache instance on the same directory uses the stored responses.
+    """
+    requests_mock.get(rapi.BASE_URI + "/name/kenya", json=[KEN])
+    monkeypatch.setattr(rapi, "disk_cache", DiskCache(str(tmp_path), max_age=60))
+    rapi.get_countries_by_name("kenya")
+
+    monkeypatch.setattr(rapi, "disk_cache", DiskCache(str(tmp_path), max_age=60))
+    assert rapi.get_countries_by_name("kenya") == [kenya]
+    assert requests_mock.call_count == 1
+    assert rapi.disk_cache.hits == 1
+
+
+def test_changed_response_replaces_entry(disk_cache, requests_mock, kenya):
+    """
+    Test that a 200 answer to a revalidation replaces the stored response.
+    """
+    requests_mock.get(
+        ALL_URI,
+        [
+            {"json": [RSA], "headers": {"ETag": '"v1"'}},
+            {"json": [KEN], "headers": {"ETag": '"v2"'}},
+        ],
+    )
+    rapi.get_all()
+    assert rapi.get_all() == [kenya]
+    assert disk_cache.get(ALL_URI).etag == '"v2"'
+
+
+def test_errors_are_not_stored(disk_cache, requests_mock):
+    """
+    Test that error responses are not written to the disk.
+    """
+    requests_mock.get(ALL_URI, status_code=500)
+    with pytest.raises(Exception):
+        rapi.get_all()
+    assert disk_cache.get(ALL_URI) is None
+
+
+def test_max_size_eviction(tmp_path):
+    """
+    Test that the least recently used responses are removed when the cache grows too large.
+    """
+    disk_cache = DiskCache(str(tmp_path), max_size=25)
+    disk_cache.set("a", b"0123456789")
+    disk_cache.set("b", b"0123456789")
+    past = time.time() - 100
+    os.utime(disk_cache._path("a") + disk_cache.BODY_SUFFIX, (past, past))
+    disk_cache.set("c", b"0123456789")
+    assert disk_cache.get("a") is None
+    assert disk_cache.get("b").body == b"0123456789"
+    assert disk_cache.get("c").body == b"0123456789"
+    assert disk_cache.size() == 20
+
+
+class RevalidatingTransport:
+    """
+    Async transport answering with an ETag and with 304 to requests sending it back.
+    """
+
+    def __init__(self):
+        self.requests = []
+
+    async def fetch(self, uri, headers=None, event=None):
+        self.requests.append(headers)
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return 304, b"", {}
+        return 200, json.dumps([KEN]).encode("utf-8"), {"ETag": '"v1"'}
+
+    async def close(self):
+        pass
+
+
+def test_async_disk_cache(tmp_path, monkeypatch, kenya):
+    """
+    Test that the async client uses fresh stored responses and revalidates stale ones.
+    """
+    transport = RevalidatingTransport()
+    monkeypatch.setattr(AsyncRestCountryApiV2, "transport", transport)
+    disk_cache = DiskCache(str(tmp_path), max_age=3600)
+    monkeypatch.setattr(AsyncRestCountryApiV2, "disk_cache", disk_cache)
+
+    async def lookups():
+        return [
+            await AsyncRestCountryApiV2.get_countries_by_name("kenya") for _ in range(3)
+        ]
+
+    assert asyncio.run(lookups()) == [[kenya]] * 3
+    assert transport.requests == [{}]
+    assert disk_cache.stats()["hits"] == 2
+
+    disk_cache.max_age = 0
+    assert asyncio.run(lookups()) == [[kenya]] * 3
+    assert transport.requests[1]["If-None-Match"] == '"v1"'
+    assert disk_cache.stats()["revalidations"] == 3
+
+
+def test_threaded_transport_disk_cache(tmp_path, monkeypatch, requests_mock, kenya):
+    """
+    Test that the threaded transport uses the disk cache of the async client.
+    """
+    requests_mock.get(rapi.BASE_URI + "/name/kenya", json=[KEN])
+    monkeypatch.setattr(AsyncRestCountryApiV2, "transport", ThreadedTransport())
+    disk_cache = DiskCache(str(tmp_path), max_age=3600)
+    monkeypatch.setattr(AsyncRestCountryApiV2, "disk_cache", disk_cache)
+
+    async def lookups():
+        try:
+            for _ in range(3):
+                assert await AsyncRestCountryApiV2.get_countries_by_name("kenya") == [
+                    kenya
+                ]
+        finally:
+            await AsyncRestCountryApiV2.close()
+
+    asyncio.run(lookups())
+    assert requests_mock.call_count == 1
+    assert disk_cache.stats()["hits"] == 2
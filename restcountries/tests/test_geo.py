@@ -0,0 +1,128 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from restcountries import geo as geo_module
+from restcountries.base import Country
+from restcountries.geo import GeoIndex, haversine_km
+from restcountries.tests.countries_data import RSA, NGR, EGY, KEN
+
+
+@pytest.fixture(name="backend", params=["numpy", "array"])
+def fixture_backend(request, monkeypatch):
+    """
+    Runs every test with numpy, if numpy is installed, and with the pure python fallback.
+    """
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(geo_module, "numpy", None)
+    return request.param
+
+
+def _random_places(seed, count):
+    generator = random.Random(seed)
+    return [
+        SimpleNamespace(
+            name=str(i),
+            latlng=[generator.uniform(-90, 90), generator.uniform(-180, 180)],
+        )
+        for i in range(count)
+    ]
+
+
+def _brute_force(places, lat, lng):
+    return sorted(
+        (haversine_km(lat, lng, *place.latlng), place.name) for place in places
+    )
+
+
+def test_nearest_and_within(backend):
+    """
+    Test nearest-country and radius queries on the african test countries.
+    """
+    countries = [Country(data) for data in (RSA, NGR, EGY, KEN)]
+    countries.append(SimpleNamespace(name="Nowhere", latlng=[]))
+    index = GeoIndex(countries)
+    assert len(index) == 4
+
+    ((kenya, distance),) = index.nearest(-1.29, 36.82)
+    assert kenya.name == "Kenya"
+    assert distance == pytest.approx(haversine_km(-1.29, 36.82, 1.0, 38.0))
+    assert [country.name for country, _ in index.nearest(0, 0, k=10)] == [
+        "Nigeria",
+        "South Africa",
+        "Kenya",
+        "Egypt",
+    ]
+    assert [country.name for country, _ in index.within(1.0, 38.0, 3200)] == [
+        "Kenya",
+        "Egypt",
+    ]
+    assert index.nearest(0, 0, k=0) == []
+
+
+def test_queries_match_brute_force(backend):
+    """
+    Test that the tree gives the same answers as computing the distance to every country.
+    """
+    places = _random_places(1, 300)
+    index = GeoIndex(places)
+    generator = random.Random(2)
+    for _ in range(50):
+        lat, lng = generator.uniform(-90, 90), generator.uniform(-180, 180)
+        expected = _brute_force(places, lat, lng)
+        found = index.nearest(lat, lng, k=5)
+        assert [place.name for place, _ in found] == [name for _, name in expected[:5]]
+        assert [d for _, d in found] == pytest.approx([d for d, _ in expected[:5]])
+
+        radius = generator.uniform(100, 3000)
+        found = index.within(lat, lng, radius)
+        assert [place.name for place, _ in found] == [
+            name for distance, name in expected if distance <= radius
+        ]
+
+
+def test_batch_queries(backend):
+    """
+    Test that the batch queries match the single queries.
+    """
+    places = _random_places(3, 200)
+    index = GeoIndex(places)
+    points = [(p.latlng[0] + 1, p.latlng[1] - 1) for p in _random_places(4, 40)]
+
+    distances, positions = index.nearest_many(points, k=3)
+    assert len(distances) == len(positions) == 40
+    for point, row_distances, row_positions in zip(points, distances, positions):
+        expected = index.nearest(*point, k=3)
+        assert [index.countries[p] for p in row_positions] == [c for c, _ in expected]
+        assert list(row_distances) == pytest.approx([d for _, d in expected])
+
+    for point, found in zip(points, index.within_many(points, 1500)):
+        expected = index.within(*point, 1500)
+        assert [index.countries[p] for p, _ in found] == [c for c, _ in expected]
+        assert [d for _, d in found] == pytest.approx([d for _, d in expected])
+
+    distances, positions = index.nearest_many(points[:2], k=500)
+    assert len(positions[0]) == 200
+
+
+def test_batch_queries_edge_cases(backend):
+    """
+    Test batch queries without points, with k=0 and on an index without countries.
+    """
+    index = GeoIndex(_random_places(5, 20))
+    distances, positions = index.nearest_many([], k=3)
+    assert len(distances) == len(positions) == 0
+    assert index.within_many([], 1000) == []
+
+    distances, positions = index.nearest_many([(0, 0), (10, 10)], k=0)
+    assert [len(row) for row in positions] == [0, 0]
+    assert [len(row) for row in distances] == [0, 0]
+
+    empty = GeoIndex([])
+    assert empty.nearest(0, 0) == []
+    distances, positions = empty.nearest_many([(0, 0)], k=2)
+    assert [len(row) for row in positions] == [0]
+    assert empty.within_many([(0, 0)], 1000) == [[]]
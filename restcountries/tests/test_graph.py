@@ -0,0 +1,149 @@
+import pytest
+
+from restcountries import graph as graph_module
+from restcountries.graph import UNREACHABLE, BorderGraph
+from restcountries.local import LocalDataset
+from restcountries.tests.countries_data import KEN
+
+# a small map: the iberian peninsula to poland, plus an island and a one-sided border entry
+RECORDS = [
+    {"alpha2Code": "PT", "alpha3Code": "PRT", "borders": ["ESP"], "latlng": [39.5, -8]},
+    {
+        "alpha2Code": "ES",
+        "alpha3Code": "ESP",
+        "borders": ["PRT", "FRA", "AND"],
+        "latlng": [40, -4],
+    },
+    {
+        "alpha2Code": "AD",
+        "alpha3Code": "AND",
+        "borders": ["ESP", "FRA"],
+        "latlng": [42.5, 1.5],
+    },
+    {
+        "alpha2Code": "FR",
+        "alpha3Code": "FRA",
+        "borders": ["ESP", "AND", "BEL", "DEU", "CHE"],
+        "latlng": [46, 2],
+    },
+    {
+        "alpha2Code": "BE",
+        "alpha3Code": "BEL",
+        "borders": ["FRA", "DEU"],
+        "latlng": [50.8, 4],
+    },
+    {
+        "alpha2Code": "CH",
+        "alpha3Code": "CHE",
+        "borders": ["FRA", "DEU"],
+        "latlng": [47, 8],
+    },
+    {
+        "alpha2Code": "DE",
+        "alpha3Code": "DEU",
+        "borders": ["FRA", "BEL", "CHE", "POL"],
+        "latlng": [51, 9],
+    },
+    {"alpha2Code": "PL", "alpha3Code": "POL", "borders": [], "latlng": [52, 20]},
+    {"alpha2Code": "IS", "alpha3Code": "ISL", "borders": [], "latlng": [65, -18]},
+]
+
+
+@pytest.fixture(name="graph", params=["numpy", "array"])
+def fixture_graph(request, monkeypatch):
+    """
+    Runs every test with a numpy hop matrix, if numpy is installed, and with array rows.
+    """
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(graph_module, "numpy", None)
+    return BorderGraph(RECORDS)
+
+
+def test_neighbours_and_neighbourhood(graph):
+    """
+    Test that the graph is undirected, even if only one of two neighbours lists the border.
+    """
+    assert len(graph) == 9
+    assert graph.edge_count() == 10
+    assert graph.neighbours("pl") == ["DEU"]
+    assert graph.neighbours("PRT") == ["ESP"]
+    assert graph.neighbourhood("CHE", 1) == {"FRA": 1, "DEU": 1}
+    assert graph.neighbourhood("PRT", 2) == {"ESP": 1, "FRA": 2, "AND": 2}
+    assert graph.neighbourhood("ISL", 5) == {}
+    with pytest.raises(KeyError, match="XYZ"):
+        graph.neighbours("XYZ")
+
+
+def test_routes(graph):
+    """
+    Test shortest routes by border crossings and by distance.
+    """
+    assert graph.route("PRT", "POL") == ["PRT", "ESP", "FRA", "DEU", "POL"]
+    assert graph.route("PRT", "PRT") == ["PRT"]
+    assert graph.route("PRT", "ISL") is None
+    assert graph.hops("PRT", "POL") == 4
+    assert graph.hops("PRT", "ISL") is None
+
+    # via andorra is one crossing more, but cheaper with the custom weight
+    expensive = {("ESP", "FRA"), ("FRA", "ESP")}
+    route = graph.route(
+        "ESP", "FRA", weight=lambda a, b: 10 if (a, b) in expensive else 1
+    )
+    assert route == ["ESP", "AND", "FRA"]
+    assert graph.route("ESP", "FRA", weight="distance") in (
+        ["ESP", "FRA"],
+        ["ESP", "AND", "FRA"],
+    )
+    assert graph.route("BEL", "ISL", weight="distance") is None
+
+
+def test_components(graph):
+    """
+    Test that countries connected by land form one component and islands their own.
+    """
+    components = graph.components()
+    assert components == [
+        {"PRT", "ESP", "AND", "FRA", "BEL", "CHE", "DEU", "POL"},
+        {"ISL"},
+    ]
+
+
+def test_hop_matrix(graph, tmp_path):
+    """
+    Test the all-pairs matrix and that it is cached on disk as long as the borders do not change.
+    """
+    path = str(tmp_path / "hops.bin")
+    matrix = graph.hop_matrix(path)
+    portugal, poland, iceland = (graph.codes.index(c) for c in ("PRT", "POL", "ISL"))
+    assert matrix[portugal][poland] == 4
+    assert matrix[iceland][portugal] == UNREACHABLE
+    assert matrix[poland][poland] == 0
+    assert graph.hops("POL", "PRT") == 4
+    assert graph.hops("ISL", "PRT") is None
+
+    def fail():
+        raise AssertionError("the matrix should be read from the file")
+
+    cached = BorderGraph(RECORDS)
+    cached._compute_matrix = fail
+    assert [list(row) for row in cached.hop_matrix(path)] == [
+        list(row) for row in matrix
+    ]
+
+    changed = BorderGraph(RECORDS[:-2])
+    changed_matrix = changed.hop_matrix(path)
+    assert len(changed_matrix) == 7
+    assert BorderGraph(RECORDS[:-2]).hop_matrix(path)[0][6] == 3
+
+
+def test_from_dataset():
+    """
+    Test building the graph from a LocalDataset.
+    """
+    graph = BorderGraph.from_dataset(LocalDataset([KEN]))
+    assert graph.country("ke").name == "Kenya"
+    assert graph.neighbours("KEN") == []
+    with pytest.raises(ValueError):
+        BorderGraph([KEN]).country("KEN")
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+
+import pytest
+import requests
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.aio import AsyncRestCountryApiV2
+from restcountries.cache import LRUCache
+from restcountries.hooks import LoggingHook, MetricsHook, MetricsRegistry
+from restcountries.tests.countries_data import KEN
+from restcountries.tests.test_aio import FakeTransport
+
+BASE_URI = "https://restcountries.com/v2"
+
+
+@pytest.fixture(name="events")
+def fixture_events(monkeypatch):
+    events = []
+    monkeypatch.setattr(rapi, "hooks", [events.append])
+    return events
+
+
+def test_call_event(events, requests_mock, kenya):
+    """
+    Test that a lookup reports its response, timings and cache result.
+    """
+    requests_mock.get(BASE_URI + "/name/kenya", json=[KEN])
+    assert rapi.get_countries_by_name("kenya") == [kenya]
+    (event,) = events
+    assert (event.resource, event.term, event.uri) == (
+        "/name",
+        "kenya",
+        BASE_URI + "/name/kenya",
+    )
+    assert event.status_code == 200
+    assert event.bytes_received > 1000
+    assert event.cache is None
+    assert not event.coalesced
+    assert event.error is None
+    assert event.dns_seconds is None and event.connect_seconds is None
+    for seconds in (event.ttfb_seconds, event.parse_seconds, event.construct_seconds):
+        assert 0 <= seconds <= event.total_seconds
+
+
+def test_call_event_cache_and_errors(monkeypatch, events, requests_mock):
+    """
+    Test that cache hits and failed lookups are reported.
+    """
+    monkeypatch.setattr(rapi, "cache", LRUCache())
+    requests_mock.get(BASE_URI + "/name/kenya", json=[KEN])
+    requests_mock.get(BASE_URI + "/name/atlantis", status_code=404)
+    rapi.get_countries_by_name("kenya")
+    rapi.get_countries_by_name("kenya")
+    with pytest.raises(requests.exceptions.InvalidURL):
+        rapi.get_countries_by_name("atlantis")
+    assert [(event.cache, event.status_code) for event in events] == [
+        ("miss", 200),
+        ("hit", None),
+        ("miss", 404),
+    ]
+    assert isinstance(events[2].error, requests.exceptions.InvalidURL)
+
+
+def test_metrics_hook(monkeypatch, requests_mock):
+    """
+    Test that the metrics hook counts lookups and renders them in the Prometheus format.
+    """
+    metrics = MetricsHook()
+    monkeypatch.setattr(rapi, "hooks", [metrics])
+    requests_mock.get(BASE_URI + "/name/kenya", json=[KEN])
+    requests_mock.get(BASE_URI + "/name/atlantis", status_code=404)
+    rapi.get_countries_by_name("kenya")
+    rapi.get_countries_by_name("kenya")
+    with pytest.raises(requests.exceptions.InvalidURL):
+        rapi.get_countries_by_name("atlantis")
+
+    assert metrics.calls.get(resource="/name", status=200, cache="") == 2
+    assert metrics.errors.get(resource="/name", error="InvalidURL") == 1
+    assert metrics.total.count(resource="/name") == 3
+    assert metrics.parse.count(resource="/name") == 2
+    text = metrics.registry.render()
+    assert "# TYPE restcountries_call_seconds histogram" in text
+    assert 'restcountries_calls_total{resource="/name",status="200",cache=""} 2' in text
+    assert 'restcountries_call_seconds_bucket{resource="/name",le="+Inf"} 3' in text
+    assert 'restcountries_call_seconds_count{resource="/name"} 3' in text
+
+
+def test_metrics_registry():
+    """
+    Test that histograms count observations in cumulative buckets.
+    """
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency", "Latency.", ("path",), buckets=(1, 5))
+    for value in (0.5, 2, 10):
+        histogram.observe(value, path='a"b')
+    assert registry.histogram("latency", "Latency.", ("path",)) is histogram
+    with pytest.raises(ValueError):
+        registry.counter("latency", "Latency.")
+    assert registry.render().splitlines() == [
+        "# HELP latency Latency.",
+        "# TYPE latency histogram",
+        'latency_bucket{path="a\\"b",le="1.0"} 1',
+        'latency_bucket{path="a\\"b",le="5.0"} 2',
+        'latency_bucket{path="a\\"b",le="+Inf"} 3',
+        'latency_sum{path="a\\"b"} 12.5',
+        'latency_count{path="a\\"b"} 3',
+    ]
+
+
+def test_logging_hook(monkeypatch, requests_mock, caplog):
+    """
+    Test that the logging hook logs every lookup.
+    """
+    monkeypatch.setattr(rapi, "hooks", [LoggingHook(level=logging.INFO)])
+    requests_mock.get(BASE_URI + "/name/kenya", json=[KEN])
+    with caplog.at_level(logging.INFO, logger="restcountries"):
+        rapi.get_countries_by_name("kenya")
+    (record,) = caplog.records
+    assert record.getMessage().startswith("/name kenya status=200 cache=None bytes=")
+
+
+def test_failing_hook(monkeypatch, events, requests_mock, caplog, kenya):
+    """
+    Test that a raising hook is logged and neither fails a lookup nor replaces its exception.
+    """
+
+    def failing_hook(event):
+        raise RuntimeError("hook failed")
+
+    monkeypatch.setattr(rapi, "hooks", [failing_hook, events.append])
+    requests_mock.get(BASE_URI + "/name/kenya", json=[KEN])
+    requests_mock.get(BASE_URI + "/name/atlantis", status_code=404)
+    with caplog.at_level(logging.ERROR, logger="restcountries"):
+        assert rapi.get_countries_by_name("kenya") == [kenya]
+        with pytest.raises(requests.exceptions.InvalidURL):
+            rapi.get_countries_by_name("atlantis")
+    assert len(events) == 2
+    assert len(caplog.records) == 2
+    assert caplog.records[0].exc_info[0] is RuntimeError
+
+
+def test_async_call_event(monkeypatch, events):
+    """
+    Test that the async client reports its lookups, coalesced ones included.
+    """
+    transport = FakeTransport({BASE_URI + "/name/kenya": (200, [KEN])})
+    monkeypatch.setattr(AsyncRestCountryApiV2, "transport", transport)
+
+    async def lookups():
+        await asyncio.gather(
+            AsyncRestCountryApiV2.get_countries_by_name("kenya"),
+            AsyncRestCountryApiV2.get_countries_by_name("kenya"),
+        )
+
+    asyncio.run(lookups())
+    assert [(event.status_code, event.coalesced) for event in events] == [
+        (200, False),
+        (None, True),
+    ]
+    assert events[0].parse_seconds is not None
+
+
+def test_aiohttp_call_event(monkeypatch, events, stub_server):
+    """
+    Test that the aiohttp transport reports the DNS, connect and first byte times, the first two for new connections.
+    """
+    pytest.importorskip("aiohttp")
+    from restcountries.aio import AiohttpTransport
+
+    stub_server.routes["/v2/name/kenya"] = (200, [KEN])
+    stub_server.routes["/v2/alpha/ke"] = (200, KEN)
+    # a host name, so it is resolved
+    base_uri = stub_server.base_uri.replace("127.0.0.1", "localhost")
+    monkeypatch.setattr(AsyncRestCountryApiV2, "BASE_URI", base_uri)
+    monkeypatch.setattr(AsyncRestCountryApiV2, "transport", AiohttpTransport())
+
+    async def lookups():
+        try:
+            await AsyncRestCountryApiV2.get_countries_by_name("kenya")
+            await AsyncRestCountryApiV2.get_country_by_country_code("ke")
+        finally:
+            await AsyncRestCountryApiV2.close()
+
+    asyncio.run(lookups())
+    first, second = events
+    assert (first.status_code, second.status_code) == (200, 200)
+    assert 0 < first.dns_seconds <= first.connect_seconds
+    assert first.connect_seconds <= first.ttfb_seconds <= first.total_seconds
+    # the second lookup reuses the pooled connection
+    assert second.dns_seconds is None and second.connect_seconds is None
+    assert 0 < second.ttfb_seconds <= second.total_seconds
+    assert first.bytes_received > 1000
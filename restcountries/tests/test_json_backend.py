@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.base import Country
+from restcountries.compact import CompactCountry
+from restcountries.json_backend import BACKENDS, get_json_backend
+from restcountries.tests.countries_data import RSA, NGR, EGY, KEN
+
+
+@pytest.fixture(name="backend", params=BACKENDS)
+def fixture_backend(request):
+    if request.param != "json":
+        pytest.importorskip(request.param)
+    return get_json_backend(request.param)
+
+
+@pytest.mark.parametrize("country_class", [Country, CompactCountry])
+def test_decode_countries(backend, country_class, countries_map):
+    """
+    Test that every backend decodes lists and single countries.
+    """
+    body = json.dumps([RSA, NGR, EGY, KEN]).encode("utf-8")
+    countries = backend.decode_countries(body, country_class)
+    assert all(isinstance(country, country_class) for country in countries)
+    assert sorted(countries) == sorted(countries_map.values())
+
+    country = backend.decode_countries(json.dumps(KEN), country_class)
+    assert country == countries_map["kenya"]
+    assert country.currencies[0]["code"] == "KES"
+    assert country.alt_spellings[0] == "KE"
+
+
+def test_decode_filtered_countries(backend):
+    """
+    Test that fields missing from filtered responses are None.
+    """
+    country = backend.decode_countries(b'[{"name": "Kenya"}]', Country)[0]
+    assert country.name == "Kenya"
+    assert country.capital is None
+
+
+def test_unexpected_types(backend):
+    """
+    Test that fields with unexpected types are still decoded.
+    """
+    country = backend.decode_countries(b'{"name": "Kenya", "area": "big"}', Country)
+    assert country.area == "big"
+
+
+def test_invalid_json(backend):
+    """
+    Test that invalid documents raise a ValueError.
+    """
+    with pytest.raises(ValueError):
+        backend.decode_countries(b"[{", Country)
+
+
+def test_default_backend():
+    """
+    Test that the fastest installed backend is used by default.
+    """
+    assert rapi.json_backend.name in BACKENDS
+    assert get_json_backend().name == rapi.json_backend.name
@@ -0,0 +1,159 @@
+import json
+
+import pytest
+import requests
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.local import LocalDataset
+from restcountries.tests.countries_data import RSA, NGR, EGY, KEN
+
+
+@pytest.fixture(name="dataset")
+def fixture_dataset(monkeypatch):
+    dataset = LocalDataset([RSA, NGR, EGY, KEN])
+    monkeypatch.setattr(rapi, "backend", dataset)
+    return dataset
+
+
+@pytest.mark.usefixtures("dataset")
+@pytest.mark.parametrize(
+    "lookup, country_names",
+    [
+        (lambda: rapi.get_all(), ["south_africa", "nigeria", "egypt", "kenya"]),
+        (lambda: rapi.get_countries_by_name("south africa"), ["south_africa"]),
+        (lambda: rapi.get_countries_by_name("RSA"), ["south_africa"]),
+        (lambda: rapi.get_countries_by_name("ri"), ["south_africa", "nigeria"]),
+        (
+            lambda: rapi.get_countries_by_language("en"),
+            ["south_africa", "nigeria", "kenya"],
+        ),
+        (lambda: rapi.get_countries_by_language("afr"), ["south_africa"]),
+        (lambda: rapi.get_countries_by_calling_code("254"), ["kenya"]),
+        (lambda: rapi.get_countries_by_currency("egp"), ["egypt"]),
+        (
+            lambda: rapi.get_countries_by_region("Africa"),
+            ["south_africa", "nigeria", "egypt", "kenya"],
+        ),
+        (lambda: rapi.get_countries_by_subregion("western africa"), ["nigeria"]),
+        (lambda: rapi.get_countries_by_capital("Nairobi"), ["kenya"]),
+        (
+            lambda: rapi.get_countries_by_country_codes(["ken", "ng", "eg"]),
+            ["kenya", "nigeria", "egypt"],
+        ),
+    ],
+)
+def test_local_lookups(countries_map, lookup, country_names):
+    """
+    Test that all lookups are answered from the local dataset.
+    """
+    assert lookup() == [countries_map[name] for name in country_names]
+
+
+@pytest.mark.usefixtures("dataset")
+@pytest.mark.parametrize("country_code", ["za", "ZAF"])
+def test_local_country_by_code(south_africa, country_code):
+    """
+    Test that a single country is returned for an alpha code.
+    """
+    assert rapi.get_country_by_country_code(country_code) == south_africa
+
+
+@pytest.mark.usefixtures("dataset")
+def test_local_filters():
+    """
+    Test that filters restrict the attributes of the returned countries.
+    """
+    country = rapi.get_country_by_country_code("ke", filters=["name", "capital"])
+    assert country.name == "Kenya"
+    assert country.capital == "Nairobi"
+    assert country.population is None
+
+
+@pytest.mark.usefixtures("dataset")
+@pytest.mark.parametrize(
+    "lookup",
+    [
+        lambda: rapi.get_country_by_country_code("xx"),
+        lambda: rapi.get_countries_by_region("europe"),
+        lambda: rapi.get_countries_by_name("atlantis"),
+    ],
+)
+def test_local_not_found(lookup):
+    """
+    Test that lookups finding nothing raise like a 404 of the API.
+    """
+    with pytest.raises(requests.exceptions.InvalidURL):
+        lookup()
+
+
+@pytest.mark.usefixtures("mock_get_all_countries")
+def test_from_api_and_file(tmp_path, countries_map):
+    """
+    Test that a snapshot can be fetched once from the API, saved and loaded again.
+    """
+    dataset = LocalDataset.from_api()
+    path = str(tmp_path / "all.json")
+    dataset.save(path)
+    with open(path, encoding="utf-8") as snapshot_file:
+        assert json.load(snapshot_file) == [RSA, NGR, EGY, KEN]
+    assert sorted(LocalDataset.from_file(path).countries) == sorted(
+        countries_map.values()
+    )
+
+
+def test_indexes():
+    """
+    Test the lookups in the secondary indexes.
+    """
+    dataset = LocalDataset([RSA, NGR, EGY, KEN])
+    indexes = dataset.indexes
+    assert indexes.get("alpha2", "za") == 0
+    assert indexes.get("alpha3", "NGA") == 1
+    assert indexes.get("numeric", "818") == 2
+    assert indexes.get_all("language", "en") == [0, 1, 3]
+    assert indexes.get_all("language", "eng") == [0, 1, 3]
+    assert indexes.get_all("currency", "kes") == [3]
+    assert indexes.get_all("region", "AFRICA") == [0, 1, 2, 3]
+    assert indexes.get_all("border", "ken") == indexes.get_all("border", "KEN")
+    stats = dataset.index_stats()
+    assert stats["build_seconds"] >= 0
+    assert stats["memory_bytes"] > 0
+    assert stats["keys"]["alpha3"] == 4
+
+
+def test_get_neighbours(kenya):
+    """
+    Test that neighbours are looked up in the border index.
+    """
+    dataset = LocalDataset(
+        [
+            RSA,
+            NGR,
+            EGY,
+            KEN,
+            dict(KEN, alpha3Code="ETH", alpha2Code="ET", borders=["KEN"]),
+        ]
+    )
+    assert [country.alpha3_code for country in dataset.get_neighbours("ke")] == ["ETH"]
+    assert dataset.get_neighbours("eth") == [kenya]
+
+
+def test_load_swaps_indexes(dataset):
+    """
+    Test that loading a new snapshot replaces the records and the indexes together.
+    """
+    old_indexes = dataset.indexes
+    dataset.load([KEN])
+    assert dataset.indexes is not old_indexes
+    assert dataset.indexes.get("alpha2", "ke") == 0
+    with pytest.raises(requests.exceptions.InvalidURL):
+        rapi.get_country_by_country_code("za")
+
+
+def test_search(dataset, south_africa, nigeria):
+    """
+    Test that the dataset can be searched by partial and misspelled names.
+    """
+    assert dataset.search("suid") == [south_africa]
+    assert dataset.search("nigria") == [nigeria]
+    assert dataset.search("nigeria", full_text=True) == [nigeria]
@@ -0,0 +1,105 @@
+import pickle
+
+import pytest
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.local import LocalDataset
+from restcountries.projection import ProjectedCountry, projected_class
+from restcountries.tests.countries_data import KEN, NGR
+
+BASE_URI = "https://restcountries.com/v2"
+
+
+@pytest.fixture(name="projection")
+def fixture_projection(monkeypatch):
+    monkeypatch.setattr(rapi, "projected_country_class", projected_class)
+
+
+def test_projected_class():
+    """
+    Test that a class holds exactly the requested fields and is shared by lookups with the same fields.
+    """
+    country_class = projected_class(["name", "capital", "unknown"])
+    assert country_class is projected_class(["capital", "name"])
+    assert issubclass(country_class, ProjectedCountry)
+    assert country_class.__slots__ == ("capital", "name")
+
+    kenya = country_class(KEN)
+    assert (kenya.name, kenya.capital) == ("Kenya", "Nairobi")
+    assert not hasattr(kenya, "__dict__")
+    with pytest.raises(AttributeError, match="add 'alpha3Code' to the filters"):
+        kenya.alpha3_code
+    with pytest.raises(AttributeError, match="no attribute 'planet'"):
+        kenya.planet
+    assert repr(kenya) == "<Country_capital_name capital='Nairobi' name='Kenya'>"
+
+
+def test_projected_country_comparison(kenya):
+    """
+    Test that projected countries compare by numeric code if it was requested, by their fields otherwise.
+    """
+    with_code = projected_class(["name", "numericCode"])
+    assert with_code(KEN) == kenya
+    assert hash(with_code(KEN)) == hash(kenya)
+    assert with_code(KEN) < with_code(NGR)
+
+    names = projected_class(["name"])
+    assert names(KEN) == names(KEN)
+    assert names(KEN) != names(NGR)
+    assert len({names(KEN), names(KEN), names(NGR)}) == 2
+
+
+def test_projected_country_pickle():
+    """
+    Test that projected countries can be pickled, e.g. to send them to other processes.
+    """
+    kenya = projected_class(["name", "capital"])(KEN)
+    restored = pickle.loads(pickle.dumps(kenya))
+    assert type(restored) is type(kenya)
+    assert restored.to_dict() == {"capital": "Nairobi", "name": "Kenya"}
+
+
+def test_lookups_with_filters(projection, requests_mock):
+    """
+    Test that lookups with filters create projected countries and lookups without filters create Country objects.
+    """
+    requests_mock.get(
+        BASE_URI + "/region/africa?fields=name;capital",
+        json=[{"name": "Kenya", "capital": "Nairobi"}],
+    )
+    requests_mock.get(BASE_URI + "/name/kenya", json=[KEN])
+    (kenya,) = rapi.get_countries_by_region("africa", filters=["name", "capital"])
+    assert isinstance(kenya, projected_class(["name", "capital"]))
+    with pytest.raises(AttributeError):
+        kenya.population
+    (kenya,) = rapi.get_countries_by_name("kenya")
+    assert type(kenya) is rapi.country_class
+
+
+def test_bulk_and_streaming_with_filters(projection, requests_mock):
+    """
+    Test that bulk and streamed lookups create projected countries as well.
+    """
+    requests_mock.get(
+        BASE_URI + "/alpha?codes=KE&fields=name;alpha2Code;alpha3Code",
+        json=[{"name": "Kenya", "alpha2Code": "KE", "alpha3Code": "KEN"}],
+    )
+    requests_mock.get(BASE_URI + "/all?fields=name", json=[{"name": "Kenya"}])
+    kenya = rapi.bulk_get_by_codes(["ke"], filters=["name"])["ke"]
+    assert kenya.name == "Kenya"
+    assert isinstance(kenya, ProjectedCountry)
+    (kenya,) = rapi.iter_all(filters=["name"])
+    assert type(kenya) is projected_class(["name"])
+
+
+def test_local_dataset_with_filters(projection, monkeypatch):
+    """
+    Test that lookups answered by a LocalDataset create projected countries as well.
+    """
+    monkeypatch.setattr(rapi, "backend", LocalDataset([KEN, NGR]))
+    kenya = rapi.get_country_by_country_code("ke", filters=["name", "capital"])
+    assert type(kenya) is projected_class(["name", "capital"])
+    assert (kenya.name, kenya.capital) == ("Kenya", "Nairobi")
+    with pytest.raises(AttributeError):
+        kenya.population
+    assert type(rapi.get_country_by_country_code("ng")) is rapi.country_class
@@ -0,0 +1,125 @@
+import pytest
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.local import LocalDataset
+from restcountries.projection import projected_class
+from restcountries.query import Query
+from restcountries.tests.countries_data import RSA, NGR, EGY, KEN
+
+BASE_URI = "https://restcountries.com/v2"
+
+
+@pytest.fixture(name="dataset")
+def fixture_dataset():
+    return LocalDataset([RSA, NGR, EGY, KEN])
+
+
+def test_plan_with_local_indexes(dataset):
+    """
+    Test that the constraint with the fewest matches in the local indexes is looked up and the rest filtered.
+    """
+    query = (
+        Query()
+        .region("africa")
+        .language("en")
+        .where(population__gt=100000000)
+        .fields(["name"])
+    )
+    plan = query.plan(dataset=dataset)
+    assert (plan.source[1].kind, plan.source[2]) == ("language", "en")
+    assert plan.filters == ["name", "region", "population"]
+    assert query.explain(dataset=dataset).splitlines() == [
+        "lookup /lang/en fields=name;region;population (local index, ~3 countries)",
+        "  not chosen: region (~4 countries)",
+        "filter region = 'africa'",
+        "filter population gt 100000000",
+        "project name",
+    ]
+
+    (nigeria,) = query.run(dataset=dataset)
+    assert nigeria.name == "Nigeria"
+    assert nigeria.population is None
+
+
+def test_queries_without_lookup_constraints(dataset):
+    """
+    Test queries with only conditions, queries without matches and several conditions on one field.
+    """
+    query = Query().where(gini__gt=40, alpha3Code__in=["KEN", "EGY", "NGA"])
+    assert [c.name for c in query.run(dataset=dataset)] == ["Nigeria", "Kenya"]
+    assert query.explain(dataset=dataset).startswith(
+        "lookup /all (local index, ~4 countries)"
+    )
+    assert Query().currency("XXX").run(dataset=dataset) == []
+    assert Query().currency("ZAR").region("europe").run(dataset=dataset) == []
+    large = Query().where(area__gte=900000, area__lt=1100000)
+    assert [c.name for c in large.run(dataset=dataset)] == ["Nigeria", "Egypt"]
+    assert [c.name for c in Query().codes(["ke", "EGY"]).run(dataset=dataset)] == [
+        "Kenya",
+        "Egypt",
+    ]
+
+
+def test_invalid_conditions():
+    """
+    Test that unknown fields and operators are rejected when the query is built.
+    """
+    with pytest.raises(ValueError, match="unknown field 'planet'"):
+        Query().where(planet="earth")
+    with pytest.raises(ValueError, match="unknown operator 'like'"):
+        Query().where(name__like="K%")
+    with pytest.raises(ValueError, match="unknown fields size"):
+        Query().fields(["name", "size"])
+
+
+def test_remote_plan(requests_mock, monkeypatch):
+    """
+    Test that a remote query makes one lookup with the fields pushed down into the filters.
+    """
+    monkeypatch.setattr(rapi, "projected_country_class", projected_class)
+    requests_mock.get(
+        BASE_URI + "/subregion/eastern africa?fields=name;currencies;population",
+        json=[
+            {"name": n["name"], "currencies": n["currencies"], "population": p}
+            for n, p in ((KEN, 47251000), (dict(KEN, name="Tanzania"), 1000))
+        ],
+    )
+    query = (
+        Query()
+        .currency("KES")
+        .subregion("eastern africa")
+        .where(population__gt=5000000)
+        .fields(["name"])
+    )
+    assert query.explain().splitlines()[:2] == [
+        "lookup /subregion/eastern africa fields=name;currencies;population "
+        "(remote, ~12 countries)",
+        "  not chosen: currency (~15 countries)",
+    ]
+    (kenya,) = query.run()
+    assert type(kenya) is projected_class(["name"])
+    assert kenya.name == "Kenya"
+    assert requests_mock.call_count == 1
+
+    requests_mock.get(BASE_URI + "/capital/paris", status_code=404)
+    assert Query().region("europe").capital("paris").run() == []
+
+
+def test_local_plan_with_projection(dataset, monkeypatch):
+    """
+    Test that local queries create projected countries like remote ones, with and without conditions.
+    """
+    monkeypatch.setattr(rapi, "projected_country_class", projected_class)
+    countries = Query().region("Africa").fields(["name"]).run(dataset=dataset)
+    assert {type(country) for country in countries} == {projected_class(["name"])}
+
+    (nigeria,) = (
+        Query()
+        .region("Africa")
+        .where(population__gt=100000000)
+        .fields(["name"])
+        .run(dataset=dataset)
+    )
+    assert type(nigeria) is projected_class(["name"])
+    with pytest.raises(AttributeError):
+        nigeria.capital
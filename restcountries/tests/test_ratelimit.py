@@ -0,0 +1,149 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.aio import AsyncRestCountryApiV2
+from restcountries.ratelimit import FileTokenBucket, TokenBucket
+from restcountries.tests.countries_data import KEN
+from restcountries.tests.test_aio import FakeTransport
+from restcountries.tests.test_cache import FakeTimer
+
+BASE_URI = "https://restcountries.com/v2"
+
+
+def test_token_bucket():
+    """
+    Test that bursts up to the capacity pass and further requests wait for the refill.
+    """
+    timer = FakeTimer()
+    sleeps = []
+    bucket = TokenBucket(rate=2, capacity=3, timer=timer, sleep=sleeps.append)
+    assert [bucket.acquire() for _ in range(3)] == [0, 0, 0]
+    assert bucket.acquire() == 0.5
+    assert bucket.acquire() == 1  # waits for the token taken in advance as well
+    assert sleeps == [0.5, 1]
+    assert not bucket.try_acquire()
+
+    timer.now = 10
+    assert bucket.try_acquire()
+    assert bucket.acquired == 6
+    assert bucket.waited == 1.5
+
+
+def test_token_bucket_validation():
+    """
+    Test that invalid rates and too many tokens are rejected.
+    """
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+    with pytest.raises(ValueError):
+        TokenBucket(rate=1, capacity=2).acquire(3)
+
+
+def test_token_bucket_threads():
+    """
+    Test that threads sharing a bucket stay within its rate.
+    """
+    bucket = TokenBucket(rate=50, capacity=1)
+
+    def worker():
+        for _ in range(5):
+            bucket.acquire()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 20 requests, the first one is served from the full bucket
+    assert time.perf_counter() - started >= 19 / 50 * 0.9
+    assert bucket.acquired == 20
+
+
+def test_file_token_bucket_shared(tmp_path):
+    """
+    Test that buckets with the same file share their tokens.
+    """
+    timer = FakeTimer()
+    path = str(tmp_path / "bucket")
+    first = FileTokenBucket(path, rate=1, capacity=2, timer=timer)
+    second = FileTokenBucket(path, rate=1, capacity=2, timer=timer)
+    assert first.try_acquire()
+    assert second.try_acquire()
+    assert not first.try_acquire()
+    assert not second.try_acquire()
+    timer.now = 1
+    assert second.try_acquire()
+    first.close()
+    second.close()
+
+
+def _acquire_from_file(path, count):
+    bucket = FileTokenBucket(path, rate=40, capacity=1)
+    for _ in range(count):
+        bucket.acquire()
+
+
+def test_file_token_bucket_processes(tmp_path):
+    """
+    Test that processes sharing a bucket file stay within its rate together.
+    """
+    path = str(tmp_path / "bucket")
+    context = multiprocessing.get_context("spawn")
+    started = time.perf_counter()
+    processes = [
+        context.Process(target=_acquire_from_file, args=(path, 6)) for _ in range(2)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert [process.exitcode for process in processes] == [0, 0]
+    assert time.perf_counter() - started >= 11 / 40 * 0.9
+
+
+def test_requests_wait_for_rate_limiter(monkeypatch, requests_mock, kenya):
+    """
+    Test that every request takes a token from the rate limiter.
+    """
+    sleeps = []
+    bucket = TokenBucket(rate=1, capacity=2, timer=FakeTimer(), sleep=sleeps.append)
+    monkeypatch.setattr(rapi, "rate_limiter", bucket)
+    requests_mock.get(BASE_URI + "/name/kenya", json=[KEN])
+    for _ in range(3):
+        assert rapi.get_countries_by_name("kenya") == [kenya]
+    assert sleeps == [1]
+    assert bucket.acquired == 3
+
+
+def test_async_requests_wait_for_rate_limiter(monkeypatch, kenya):
+    """
+    Test that coroutines wait for the rate limiter without blocking the event loop.
+    """
+    bucket = TokenBucket(rate=20, capacity=1)
+    transport = FakeTransport(
+        {
+            BASE_URI + "/name/kenya": (200, [KEN]),
+            BASE_URI + "/alpha/ke": (200, KEN),
+            BASE_URI + "/capital/nairobi": (200, [KEN]),
+        }
+    )
+    monkeypatch.setattr(AsyncRestCountryApiV2, "transport", transport)
+    monkeypatch.setattr(AsyncRestCountryApiV2, "rate_limiter", bucket)
+
+    async def lookups():
+        return await asyncio.gather(
+            AsyncRestCountryApiV2.get_countries_by_name("kenya"),
+            AsyncRestCountryApiV2.get_country_by_country_code("ke"),
+            AsyncRestCountryApiV2.get_countries_by_capital("nairobi"),
+        )
+
+    started = time.perf_counter()
+    assert asyncio.run(lookups()) == [[kenya], kenya, [kenya]]
+    assert time.perf_counter() - started >= 2 / 20 * 0.9
+    assert bucket.acquired == 3
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+import requests
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.aio import AsyncRestCountryApiV2
+from restcountries.cache import LRUCache
+from restcountries.refresh import BackgroundRefresher
+from restcountries.tests.countries_data import KEN, NGR
+from restcountries.tests.test_aio import FakeTransport
+from restcountries.tests.test_cache import FakeTimer
+
+BASE_URI = "https://restcountries.com/v2"
+
+
+@pytest.fixture(name="timer")
+def fixture_timer():
+    return FakeTimer()
+
+
+@pytest.fixture(name="refresher")
+def fixture_refresher(monkeypatch, timer):
+    monkeypatch.setattr(rapi, "cache", LRUCache(ttl=10, max_stale=100, timer=timer))
+    refresher = BackgroundRefresher(error_backoff=5, timer=timer)
+    monkeypatch.setattr(rapi, "refresher", refresher)
+    yield refresher
+    refresher.wait()
+
+
+def test_stale_result_served_and_refreshed(refresher, timer, requests_mock):
+    """
+    Test that an expired entry is returned right away and refreshed in the background.
+    """
+    kenya = dict(KEN, population=1)
+    requests_mock.get(BASE_URI + "/name/kenya", [{"json": [kenya]}, {"json": [KEN]}])
+    assert rapi.get_countries_by_name("kenya")[0].population == 1
+
+    timer.now = 20
+    assert rapi.get_countries_by_name("kenya")[0].population == 1
+    refresher.wait()
+    assert requests_mock.call_count == 2
+    assert rapi.get_countries_by_name("kenya")[0].population == KEN["population"]
+    assert refresher.stats()["refreshes"] == 1
+
+
+def test_too_stale_result_fetched(refresher, timer, requests_mock, kenya):
+    """
+    Test that entries older than max_stale are fetched before returning.
+    """
+    requests_mock.get(BASE_URI + "/name/kenya", json=[KEN])
+    rapi.get_countries_by_name("kenya")
+    timer.now = 200
+    assert rapi.get_countries_by_name("kenya") == [kenya]
+    assert requests_mock.call_count == 2
+    assert refresher.stats()["refreshes"] == 0
+
+
+def test_refresh_errors(refresher, timer, requests_mock, kenya):
+    """
+    Test that failed refreshes are reported and backed off while the stale result is still served.
+    """
+    errors = []
+    refresher.on_error.append(lambda key, error: errors.append((key, error)))
+    requests_mock.get(
+        BASE_URI + "/name/kenya",
+        [{"json": [KEN]}, {"status_code": 503}, {"status_code": 503}, {"json": [KEN]}],
+    )
+    rapi.get_countries_by_name("kenya")
+
+    timer.now = 20
+    assert rapi.get_countries_by_name("kenya") == [kenya]
+    refresher.wait()
+    assert [key for key, _ in errors] == [("/name", "kenya", ())]
+    assert isinstance(errors[0][1], requests.exceptions.HTTPError)
+
+    timer.now = 24  # backing off for 5 seconds
+    assert rapi.get_countries_by_name("kenya") == [kenya]
+    refresher.wait()
+    assert requests_mock.call_count == 2
+
+    timer.now = 25
+    rapi.get_countries_by_name("kenya")
+    refresher.wait()
+    timer.now = 34  # backing off for 10 seconds after the second failure
+    rapi.get_countries_by_name("kenya")
+    timer.now = 35
+    rapi.get_countries_by_name("kenya")
+    refresher.wait()
+    assert requests_mock.call_count == 4
+    assert refresher.stats() == {
+        "running": 0,
+        "refreshes": 1,
+        "failures": 2,
+        "skipped": 2,
+        "failing": 0,
+    }
+
+
+def test_async_stale_result_refreshed(monkeypatch, timer, kenya):
+    """
+    Test that the async client refreshes expired entries in a task.
+    """
+    monkeypatch.setattr(rapi, "cache", LRUCache(ttl=10, max_stale=100, timer=timer))
+    monkeypatch.setattr(rapi, "refresher", BackgroundRefresher(timer=timer))
+    transport = FakeTransport({BASE_URI + "/name/kenya": (200, [KEN])})
+    monkeypatch.setattr(AsyncRestCountryApiV2, "transport", transport)
+
+    async def lookups():
+        await AsyncRestCountryApiV2.get_countries_by_name("kenya")
+        timer.now = 20
+        transport.routes[BASE_URI + "/name/kenya"] = (200, [NGR])
+        stale = await AsyncRestCountryApiV2.get_countries_by_name("kenya")
+        await asyncio.sleep(0.01)
+        return stale, await AsyncRestCountryApiV2.get_countries_by_name("kenya")
+
+    stale, refreshed = asyncio.run(lookups())
+    assert stale == [kenya]
+    assert refreshed[0].name == "Nigeria"
+    assert len(transport.fetched) == 2
@@ -0,0 +1,283 @@
+import asyncio
+import json
+import time
+
+import pytest
+import requests
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.aio import AsyncRestCountryApiV2
+from restcountries.cache import LRUCache
+from restcountries.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    parse_retry_after,
+)
+from restcountries.tests.countries_data import KEN
+from restcountries.tests.test_cache import FakeTimer
+
+BASE_URI = "https://restcountries.com/v2"
+
+
+@pytest.fixture(name="sleeps")
+def fixture_retry_policy(monkeypatch):
+    sleeps = []
+    policy = RetryPolicy(total=3, backoff_factor=0.5, jitter=False, sleep=sleeps.append)
+    monkeypatch.setattr(rapi, "retry_policy", policy)
+    return sleeps
+
+
+def test_backoff():
+    """
+    Test that the backoff doubles with every retry, is capped and jittered.
+    """
+    policy = RetryPolicy(backoff_factor=0.5, max_backoff=3, jitter=False)
+    assert [policy.backoff(attempt) for attempt in range(5)] == [0.5, 1, 2, 3, 3]
+    policy = RetryPolicy(backoff_factor=0.5, random=lambda: 0.5)
+    assert policy.backoff(2) == 1
+
+
+def test_parse_retry_after():
+    """
+    Test that Retry-After is read as seconds or as an HTTP date.
+    """
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480) == 10
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_retry_server_errors(sleeps, requests_mock, kenya):
+    """
+    Test that 5xx and 429 responses are retried with backoff, honoring Retry-After.
+    """
+    requests_mock.get(
+        BASE_URI + "/name/kenya",
+        [
+            {"status_code": 503},
+            {"status_code": 429, "headers": {"Retry-After": "5"}},
+            {"json": [KEN]},
+        ],
+    )
+    assert rapi.get_countries_by_name("kenya") == [kenya]
+    assert requests_mock.call_count == 3
+    assert sleeps == [0.5, 5]
+
+
+def test_retry_connection_errors(sleeps, requests_mock, kenya):
+    """
+    Test that connection errors and timeouts are retried.
+    """
+    requests_mock.get(
+        BASE_URI + "/name/kenya",
+        [
+            {"exc": requests.exceptions.ConnectionError},
+            {"exc": requests.exceptions.ReadTimeout},
+            {"json": [KEN]},
+        ],
+    )
+    assert rapi.get_countries_by_name("kenya") == [kenya]
+    assert sleeps == [0.5, 1]
+
+
+def test_retries_used_up(sleeps, requests_mock):
+    """
+    Test that the last error is raised once the retries are used up.
+    """
+    requests_mock.get(BASE_URI + "/name/kenya", status_code=500)
+    with pytest.raises(requests.exceptions.HTTPError):
+        rapi.get_countries_by_name("kenya")
+    assert requests_mock.call_count == 4
+    assert sleeps == [0.5, 1, 2]
+
+
+def test_no_retry(sleeps, requests_mock):
+    """
+    Test that a missing country and a long Retry-After are not retried.
+    """
+    requests_mock.get(BASE_URI + "/name/atlantis", status_code=404)
+    requests_mock.get(
+        BASE_URI + "/name/kenya", status_code=503, headers={"Retry-After": "3600"}
+    )
+    with pytest.raises(requests.exceptions.InvalidURL):
+        rapi.get_countries_by_name("atlantis")
+    with pytest.raises(requests.exceptions.HTTPError):
+        rapi.get_countries_by_name("kenya")
+    assert requests_mock.call_count == 2
+    assert sleeps == []
+
+
+def test_circuit_breaker_states():
+    """
+    Test that the circuit opens after consecutive failures and closes after a successful trial request.
+    """
+    timer = FakeTimer()
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10, timer=timer)
+    breaker.before_request()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    timer.now = 10
+    assert breaker.state == "half_open"
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()  # only one trial request at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    timer.now = 20
+    breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.rejected == 2
+
+
+def test_circuit_breaker_fails_fast(monkeypatch, requests_mock):
+    """
+    Test that no request is sent while the circuit is open.
+    """
+    monkeypatch.setattr(rapi, "circuit_breaker", CircuitBreaker(failure_threshold=2))
+    requests_mock.get(BASE_URI + "/name/kenya", status_code=502)
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.HTTPError):
+            rapi.get_countries_by_name("kenya")
+    with pytest.raises(CircuitOpenError):
+        rapi.get_countries_by_name("kenya")
+    assert requests_mock.call_count == 2
+
+
+def test_circuit_breaker_serves_stale(monkeypatch, requests_mock, kenya):
+    """
+    Test that expired cached results are served while the circuit is open.
+    """
+    timer = FakeTimer()
+    monkeypatch.setattr(rapi, "cache", LRUCache(ttl=10, max_stale=100, timer=timer))
+    monkeypatch.setattr(rapi, "circuit_breaker", CircuitBreaker(failure_threshold=1))
+    requests_mock.get(BASE_URI + "/name/kenya", [{"json": [KEN]}, {"status_code": 503}])
+    assert rapi.get_countries_by_name("kenya") == [kenya]
+
+    timer.now = 20
+    with pytest.raises(requests.exceptions.HTTPError):
+        rapi.get_countries_by_name("kenya")
+    assert rapi.get_countries_by_name("kenya") == [kenya]
+
+    timer.now = 200
+    with pytest.raises(CircuitOpenError):
+        rapi.get_countries_by_name("kenya")
+    assert requests_mock.call_count == 2
+
+
+def test_read_timeout(monkeypatch, stub_server):
+    """
+    Test that a slow API raises a timeout instead of blocking the caller.
+    """
+    monkeypatch.setattr(rapi, "BASE_URI", stub_server.base_uri)
+    monkeypatch.setattr(rapi, "TIMEOUT", (1, 0.1))
+    stub_server.delay = 0.5
+    stub_server.routes["/v2/name/kenya"] = (200, [KEN])
+    started = time.perf_counter()
+    with pytest.raises(requests.exceptions.Timeout):
+        rapi.get_countries_by_name("kenya")
+    assert time.perf_counter() - started < 0.5
+
+
+class SequenceTransport:
+    """
+    Async transport answering every request with the next of a list of (status code, payload, headers) or exceptions.
+    """
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.fetched = 0
+
+    async def fetch(self, uri, headers=None, event=None):
+        self.fetched += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        status_code, payload, headers = response
+        return status_code, json.dumps(payload).encode("utf-8"), headers
+
+    async def close(self):
+        pass
+
+
+def test_async_retries(monkeypatch, kenya):
+    """
+    Test that the async client retries with backoff and honors Retry-After without blocking the event loop.
+    """
+    sleeps = []
+
+    async def sleep(delay):
+        sleeps.append(delay)
+
+    policy = RetryPolicy(total=3, backoff_factor=0.5, jitter=False, async_sleep=sleep)
+    transport = SequenceTransport(
+        [
+            requests.exceptions.ConnectionError(),
+            (503, {}, {}),
+            (429, {}, {"Retry-After": "5"}),
+            (200, [KEN], {}),
+        ]
+    )
+    monkeypatch.setattr(AsyncRestCountryApiV2, "retry_policy", policy)
+    monkeypatch.setattr(AsyncRestCountryApiV2, "transport", transport)
+    assert asyncio.run(AsyncRestCountryApiV2.get_countries_by_name("kenya")) == [kenya]
+    assert transport.fetched == 4
+    assert sleeps == [0.5, 1, 5]
+
+
+def test_async_circuit_breaker(monkeypatch, kenya):
+    """
+    Test that the async client opens the circuit and serves stale cached results while it is open.
+    """
+    timer = FakeTimer()
+    monkeypatch.setattr(
+        AsyncRestCountryApiV2, "cache", LRUCache(ttl=10, max_stale=100, timer=timer)
+    )
+    monkeypatch.setattr(
+        AsyncRestCountryApiV2, "circuit_breaker", CircuitBreaker(failure_threshold=1)
+    )
+    transport = SequenceTransport([(200, [KEN], {}), (503, {}, {})])
+    monkeypatch.setattr(AsyncRestCountryApiV2, "transport", transport)
+    lookup = AsyncRestCountryApiV2.get_countries_by_name
+    assert asyncio.run(lookup("kenya")) == [kenya]
+
+    timer.now = 20
+    with pytest.raises(requests.exceptions.HTTPError):
+        asyncio.run(lookup("kenya"))
+    assert asyncio.run(lookup("kenya")) == [kenya]
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(lookup("ghana"))
+    assert transport.fetched == 2
+
+
+def test_aiohttp_read_timeout(monkeypatch, stub_server):
+    """
+    Test that a slow API raises the timeout of requests with the aiohttp transport as well.
+    """
+    pytest.importorskip("aiohttp")
+    from restcountries.aio import AiohttpTransport
+
+    monkeypatch.setattr(AsyncRestCountryApiV2, "BASE_URI", stub_server.base_uri)
+    monkeypatch.setattr(
+        AsyncRestCountryApiV2, "transport", AiohttpTransport(timeout=(1, 0.1))
+    )
+    stub_server.delay = 0.5
+    stub_server.routes["/v2/name/kenya"] = (200, [KEN])
+
+    async def lookup():
+        try:
+            return await AsyncRestCountryApiV2.get_countries_by_name("kenya")
+        finally:
+            await AsyncRestCountryApiV2.close()
+
+    with pytest.raises(requests.exceptions.Timeout):
+        asyncio.run(lookup())
@@ -0,0 +1,104 @@
+import pytest
+
+from restcountries.base import Country
+from restcountries.search import NameSearchIndex, normalize
+from restcountries.tests.countries_data import RSA, NGR, EGY, KEN
+
+NIGER = dict(
+    NGR,
+    name="Niger",
+    nativeName="Niger",
+    alpha2Code="NE",
+    alpha3Code="NER",
+    numericCode="562",
+    altSpellings=["NE", "Nijar"],
+    translations={"de": "Niger"},
+)
+
+
+@pytest.fixture(name="search_index")
+def fixture_search_index():
+    return NameSearchIndex([Country(data) for data in (RSA, NGR, EGY, KEN, NIGER)])
+
+
+def names(countries):
+    return [country.name for country in countries]
+
+
+def test_normalize():
+    """
+    Test that case and accents are ignored.
+    """
+    assert normalize(" Côte d'Ivoire") == "cote d'ivoire"
+
+
+@pytest.mark.parametrize(
+    "query, mode, expected",
+    [
+        ("Nigeria", "exact", ["Nigeria"]),
+        ("nige", "exact", []),
+        ("nige", "prefix", ["Niger", "Nigeria"]),
+        ("africa", "prefix", ["South Africa"]),
+        ("frica", "prefix", []),
+        ("frica", "substring", ["South Africa"]),
+        ("Ägypten", "prefix", ["Egypt"]),
+        ("kenia", "substring", ["Kenya"]),
+        ("kneya", "substring", []),
+        ("kneya", "fuzzy", ["Kenya"]),
+        ("soutj afr", "fuzzy", ["South Africa"]),
+    ],
+)
+def test_search_modes(search_index, query, mode, expected):
+    """
+    Test exact, prefix, substring and typo-tolerant matching.
+    """
+    assert names(search_index.search(query, mode=mode)) == expected
+
+
+def test_ranking(search_index):
+    """
+    Test that exact matches rank before prefix matches and names before other spellings.
+    """
+    assert names(search_index.search("niger")) == ["Niger", "Nigeria"]
+    assert names(search_index.search("ni", limit=1)) == ["Niger"]
+    scores = dict((country.name, score) for country, score in search_index.ranked("eg"))
+    # Egypt matches by name, Niger and Nigeria do not match at all
+    assert list(scores) == ["Egypt"]
+
+
+def test_full_text(search_index):
+    """
+    Test that full_text only matches complete names, like fullText=true of the API.
+    """
+    assert names(search_index.search("republic of south africa", full_text=True)) == [
+        "South Africa"
+    ]
+    assert search_index.search("south", full_text=True) == []
+
+
+def test_fuzzy_candidates_are_capped(monkeypatch):
+    """
+    Test that edit distances are only computed for the names sharing the most bigrams with the query.
+    """
+    from restcountries import search
+
+    countries = [
+        Country(dict(KEN, name="Kenya {:03d}".format(i), translations={}))
+        for i in range(200)
+    ]
+    search_index = NameSearchIndex(countries + [Country(RSA)])
+    computed = []
+    prefix_distance = search._prefix_distance
+
+    def counting(query, text, max_distance):
+        computed.append(text)
+        return prefix_distance(query, text, max_distance)
+
+    monkeypatch.setattr(search, "_prefix_distance", counting)
+    assert names(search_index.search("south afrika", limit=1)) == ["South Africa"]
+    assert len(computed) <= 3 * NameSearchIndex.FUZZY_CANDIDATES
+    assert names(search_index.search("kenia 01", limit=3)) == [
+        "Kenya 010",
+        "Kenya 011",
+        "Kenya 012",
+    ]
@@ -0,0 +1,84 @@
+import multiprocessing
+
+import pytest
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.local import LocalDataset
+from restcountries.tests.countries_data import RSA, NGR, EGY, KEN
+
+shared = pytest.importorskip("restcountries.shared")
+if shared.shared_memory is None:  # pragma: no cover
+    pytest.skip("needs multiprocessing.shared_memory", allow_module_level=True)
+
+SharedDataset = shared.SharedDataset
+
+
+@pytest.fixture(name="dataset")
+def fixture_dataset():
+    dataset = SharedDataset.create([RSA, NGR, EGY, KEN])
+    yield dataset
+    dataset.unlink()
+
+
+def test_lookups(dataset, monkeypatch, tmp_path):
+    """
+    Test that a shared dataset answers the lookups like a LocalDataset.
+    """
+    attached = SharedDataset.attach(dataset.name)
+    try:
+        assert len(attached) == 4
+        assert attached.size >= len(attached.snapshot.record(0))
+        (kenya,) = attached.query("/currency", "kes")
+        assert kenya.name == "Kenya"
+        assert attached.query("/alpha", "NG").name == "Nigeria"
+        assert [c.name for c in attached.query("/lang", "en")] == [
+            "South Africa",
+            "Nigeria",
+            "Kenya",
+        ]
+        assert attached.query("/name", "egy", filters=["capital"])[0].capital == "Cairo"
+        assert attached.get_neighbours("ZA") == []
+
+        monkeypatch.setattr(rapi, "backend", attached)
+        assert rapi.get_country_by_country_code("ke").capital == "Nairobi"
+
+        path = str(tmp_path / "all.json")
+        attached.save(path)
+        assert len(LocalDataset.from_file(path)) == 4
+        with pytest.raises(TypeError):
+            attached.load([])
+        assert [c.name for c in attached.search("kenia")] == ["Kenya"]
+        stats = attached.index_stats()
+        assert stats["build_seconds"] > 0
+        assert stats["memory_bytes"] > 0
+        assert stats["keys"]["currency"] == 4
+    finally:
+        attached.close()
+
+
+def _capital_in_worker(name, code, results):
+    dataset = SharedDataset.attach(name)
+    results.put(dataset.query("/alpha", code).capital)
+    dataset.close()
+
+
+def test_worker_processes(dataset):
+    """
+    Test that other processes attach to the block by its name.
+    """
+    context = multiprocessing.get_context()
+    results = context.Queue()
+    workers = [
+        context.Process(target=_capital_in_worker, args=(dataset.name, code, results))
+        for code in ("ke", "eg")
+    ]
+    for worker in workers:
+        worker.start()
+    capitals = sorted(results.get(timeout=30) for _ in workers)
+    for worker in workers:
+        worker.join(timeout=30)
+    assert capitals == ["Cairo", "Nairobi"]
+    # the workers did not remove the block when they exited
+    attached = SharedDataset.attach(dataset.name)
+    assert attached.query("/alpha", "za").name == "South Africa"
+    attached.close()
@@ -0,0 +1,184 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.aio import AsyncRestCountryApiV2
+from restcountries.singleflight import AsyncSingleFlight, SingleFlight
+from restcountries.tests.countries_data import KEN
+from restcountries.tests.test_aio import FakeTransport
+
+BASE_URI = "https://restcountries.com/v2"
+
+
+def _run_concurrently(func, count):
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        futures = [executor.submit(func) for _ in range(count)]
+        return [future.result() for future in futures]
+
+
+def test_single_flight_shares_result():
+    """
+    Test that concurrent calls with the same key run the function once.
+    """
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        release.wait(5)
+        return [1, 2]
+
+    def call():
+        return single_flight.do("key", load)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(call) for _ in range(8)]
+        while single_flight.calls + single_flight.shared < 8:
+            threading.Event().wait(0.001)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert results == [[1, 2]] * 8
+    assert len({id(result) for result in results}) == 8
+    assert len(calls) == 1
+    assert (single_flight.calls, single_flight.shared) == (1, 7)
+
+
+def test_single_flight_shares_exception():
+    """
+    Test that every waiting caller receives the exception of the call.
+    """
+    single_flight = SingleFlight()
+    barrier = threading.Barrier(4, timeout=5)
+
+    def load():
+        raise ValueError("failed")
+
+    def call():
+        barrier.wait()
+        return single_flight.do("key", load)
+
+    with pytest.raises(ValueError):
+        _run_concurrently(call, 4)
+    assert not single_flight._in_flight
+
+
+def test_single_flight_runs_again_after_completion():
+    """
+    Test that a finished call is not reused, results are not cached.
+    """
+    single_flight = SingleFlight()
+    assert single_flight.do("key", lambda: 1) == 1
+    assert single_flight.do("key", lambda: 2) == 2
+    assert single_flight.calls == 2
+
+
+def test_concurrent_lookups_share_request(requests_mock, kenya):
+    """
+    Test that identical concurrent lookups are answered by one request.
+    """
+    barrier = threading.Barrier(16, timeout=5)
+
+    def respond(request, context):
+        # keep the request in flight until the other threads asked for the same country
+        threading.Event().wait(0.2)
+        return [KEN]
+
+    requests_mock.get(BASE_URI + "/name/kenya", json=respond)
+
+    def lookup():
+        barrier.wait()
+        return rapi.get_countries_by_name("kenya")
+
+    results = _run_concurrently(lookup, 16)
+    assert results == [[kenya]] * 16
+    assert requests_mock.call_count == 1
+
+
+def test_concurrent_lookups_share_errors(requests_mock):
+    """
+    Test that an error response is raised in every coalesced lookup.
+    """
+    barrier = threading.Barrier(4, timeout=5)
+
+    def respond(request, context):
+        threading.Event().wait(0.2)
+        context.status_code = 404
+        return {}
+
+    requests_mock.get(BASE_URI + "/name/atlantis", json=respond)
+
+    def lookup():
+        barrier.wait()
+        try:
+            rapi.get_countries_by_name("atlantis")
+        except requests.exceptions.InvalidURL as e:
+            return e
+
+    errors = _run_concurrently(lookup, 4)
+    assert all(isinstance(error, requests.exceptions.InvalidURL) for error in errors)
+    assert requests_mock.call_count == 1
+
+
+def test_single_flight_disabled(monkeypatch, requests_mock, kenya):
+    """
+    Test that lookups are not coalesced without a single flight.
+    """
+    monkeypatch.setattr(rapi, "single_flight", None)
+    requests_mock.get(BASE_URI + "/name/kenya", json=[KEN])
+    assert rapi.get_countries_by_name("kenya") == [kenya]
+    assert rapi.get_countries_by_name("kenya") == [kenya]
+    assert requests_mock.call_count == 2
+
+
+def test_async_lookups_share_request(monkeypatch, kenya):
+    """
+    Test that identical gathered coroutines are answered by one fetch.
+    """
+    transport = FakeTransport(
+        {
+            BASE_URI + "/name/kenya": (200, [KEN]),
+            BASE_URI + "/name/kenya?fields=name": (200, [KEN]),
+        }
+    )
+    monkeypatch.setattr(AsyncRestCountryApiV2, "transport", transport)
+
+    async def lookups():
+        return await asyncio.gather(
+            *(AsyncRestCountryApiV2.get_countries_by_name("kenya") for _ in range(20)),
+            AsyncRestCountryApiV2.get_countries_by_name("kenya", filters=["name"]),
+        )
+
+    results = asyncio.run(lookups())
+    assert results[:20] == [[kenya]] * 20
+    assert len({id(result) for result in results}) == 21
+    assert sorted(transport.fetched) == [
+        BASE_URI + "/name/kenya",
+        BASE_URI + "/name/kenya?fields=name",
+    ]
+
+
+def test_async_single_flight_waiter_cancelled():
+    """
+    Test that cancelling a waiting coroutine does not cancel the shared call.
+    """
+    single_flight = AsyncSingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        leader = asyncio.ensure_future(single_flight.do("key", load))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(single_flight.do("key", load))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        return await leader, waiter.cancelled()
+
+    assert asyncio.run(run()) == ("result", True)
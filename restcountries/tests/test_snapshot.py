@@ -0,0 +1,139 @@
+import json
+import math
+
+import pytest
+
+from restcountries import snapshot as snapshot_module
+from restcountries import table as table_module
+from restcountries.base import Country
+from restcountries.snapshot import Snapshot, SnapshotDataset, build_snapshot, main
+from restcountries.tests.countries_data import RSA, NGR, EGY, KEN
+
+DATA = [RSA, NGR, EGY, dict(KEN, gini=None, capital=None)]
+
+
+@pytest.fixture(name="snapshot", params=["numpy", "array"])
+def fixture_snapshot(request, monkeypatch, tmp_path):
+    """
+    Runs every test with numpy columns, if numpy is installed, and with array columns.
+    """
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(snapshot_module, "numpy", None)
+        monkeypatch.setattr(table_module, "numpy", None)
+    path = str(tmp_path / "countries.snapshot")
+    build_snapshot(DATA, path, source="test")
+    with Snapshot(path) as snapshot:
+        yield snapshot
+
+
+def test_columns_and_records(snapshot):
+    """
+    Test that columns are read from the mapped file and records decoded on access.
+    """
+    assert len(snapshot) == 4
+    assert snapshot.meta["count"] == 4
+    assert snapshot.meta["source"] == "test"
+    assert list(snapshot.column("population")) == [
+        RSA["population"],
+        NGR["population"],
+        EGY["population"],
+        KEN["population"],
+    ]
+    assert math.isnan(snapshot.column("gini")[3])
+    assert snapshot.column("capital") == ["Pretoria", "Abuja", "Cairo", None]
+    assert snapshot.string("region", 2) == "Africa"
+    assert snapshot.record(1) == NGR
+    assert snapshot.records[-1]["name"] == "Kenya"
+    assert snapshot.country(snapshot.find("ke")).name == "Kenya"
+    assert snapshot.find("EGY") == 2
+    assert snapshot.find("XX") is None
+    with pytest.raises(KeyError):
+        snapshot.column("flag")
+
+
+def test_indexes_and_buffers(snapshot):
+    """
+    Test the stored indexes and reading a snapshot from a buffer.
+    """
+    assert snapshot.lookup("language", "EN") == [0, 1, 3]
+    assert snapshot.lookup("currency", "egp") == [2]
+    assert snapshot.lookup("currency", "EUR") == []
+    assert snapshot.lookup("region", "") == []
+    assert snapshot.lookup("alpha2", "ng") == [1]
+    assert snapshot.index_stats()["keys"]["alpha3"] == 4
+
+    with open(snapshot.path, "rb") as snapshot_file:
+        from_buffer = Snapshot.from_buffer(bytearray(snapshot_file.read()))
+    assert from_buffer.find("KE") == 3
+    assert from_buffer.record(2) == EGY
+    from_buffer.close()
+
+
+def test_table_and_dataset(snapshot):
+    """
+    Test that a snapshot converts to a CountryTable and a LocalDataset reading it in place.
+    """
+    table = snapshot.to_table()
+    large = table.filter(table.mask("population", ">", 80000000))
+    assert large.column("name") == ["Nigeria", "Egypt"]
+    assert [country.name for country in large.to_countries()] == ["Nigeria", "Egypt"]
+
+    dataset = snapshot.to_dataset()
+    assert isinstance(dataset, SnapshotDataset)
+    assert dataset.countries._snapshot is snapshot
+    (kenya,) = dataset.query("/currency", "KES")
+    assert isinstance(kenya, Country)
+    assert kenya.name == "Kenya"
+    assert dataset.query("/alpha", "ng").name == "Nigeria"
+    assert [country.name for country in dataset.search("egpyt")] == ["Egypt"]
+    assert dataset.index_stats() == snapshot.index_stats()
+    with pytest.raises(TypeError):
+        dataset.load([KEN])
+
+
+def test_close(snapshot):
+    """
+    Test that the file is unmapped while columns and tables are still in use, and they stay valid.
+    """
+    snapshot.record(0)
+    population = snapshot.column("population")
+    table = snapshot.to_table()
+    snapshot.close()
+    assert population[3] == KEN["population"]
+    assert table.column("name") == ["South Africa", "Nigeria", "Egypt", "Kenya"]
+    with pytest.raises(ValueError):
+        snapshot.record(0)
+    with Snapshot(snapshot.path) as reopened:
+        assert len(reopened) == 4
+
+
+def test_invalid_files(tmp_path):
+    """
+    Test that other files and snapshots of another format version are rejected.
+    """
+    path = tmp_path / "other.snapshot"
+    path.write_bytes(b"not a snapshot" * 10)
+    with pytest.raises(ValueError, match="not a country snapshot"):
+        Snapshot(str(path))
+
+    build_snapshot(DATA, str(path))
+    data = bytearray(path.read_bytes())
+    data[8] = snapshot_module.FORMAT_VERSION + 1
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="rebuild it"):
+        Snapshot(str(path))
+
+
+def test_cli(tmp_path, capsys):
+    """
+    Test building a snapshot from a saved /all response and showing its metadata.
+    """
+    input_path = tmp_path / "all.json"
+    input_path.write_text(json.dumps(DATA), encoding="utf-8")
+    output_path = str(tmp_path / "countries.snapshot")
+    assert main(["build", "--input", str(input_path), "--output", output_path]) == 0
+    assert "wrote 4 countries" in capsys.readouterr().out
+    assert main(["info", output_path]) == 0
+    assert json.loads(capsys.readouterr().out)["source"] == str(input_path)
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+import requests
+
+from restcountries import RestCountryApiV2 as rapi
+from restcountries.cache import LRUCache
+from restcountries.streaming import iter_json_array
+from restcountries.tests.countries_data import RSA, NGR, EGY, KEN
+
+
+def chunked(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 100000])
+def test_iter_json_array(chunk_size):
+    """
+    Test that an array is decoded item by item, however it is split into chunks.
+    """
+    data = [RSA, NGR, 12, "x,]", [], None, EGY, KEN]
+    payload = json.dumps(data, ensure_ascii=False, indent=1).encode("utf-8")
+    assert list(iter_json_array(chunked(payload, chunk_size))) == data
+
+
+def test_iter_json_array_is_lazy():
+    """
+    Test that items are yielded before the whole document was read.
+    """
+    read = []
+
+    def chunks():
+        for chunk in chunked(json.dumps([RSA, NGR, EGY]).encode("utf-8"), 50):
+            read.append(chunk)
+            yield chunk
+
+    items = iter_json_array(chunks())
+    assert next(items) == RSA
+    assert len(read) < 50
+
+
+@pytest.mark.parametrize(
+    "payload, expected", [(b"[]", []), (b' {"name": "Kenya"} ', [{"name": "Kenya"}])]
+)
+def test_iter_json_array_documents(payload, expected):
+    """
+    Test empty arrays and documents which are not arrays.
+    """
+    assert list(iter_json_array(chunked(payload, 3))) == expected
+
+
+@pytest.mark.parametrize("payload", [b"", b"[1, 2", b"[1 2]"])
+def test_iter_json_array_invalid(payload):
+    """
+    Test that invalid documents raise a ValueError.
+    """
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunked(payload, 2)))
+
+
+@pytest.mark.usefixtures("mock_get_all_countries")
+def test_iter_all(countries_map):
+    """
+    Test that all countries can be iterated.
+    """
+    countries = rapi.iter_all()
+    assert not isinstance(countries, list)
+    assert sorted(countries) == sorted(countries_map.values())
+
+
+@pytest.mark.usefixtures("mock_get_all_countries_with_filters")
+def test_iter_all_with_filter(countries_map):
+    """
+    Test that all countries can be iterated and the response is filtered.
+    """
+    countries = rapi.iter_all(filters=["name", "capital"])
+    assert sorted(countries) == sorted(countries_map.values())
+
+
+def test_iter_all_errors(requests_mock):
+    """
+    Test that failing requests raise like the list returning methods.
+    """
+    requests_mock.get(rapi.BASE_URI + "/all", status_code=503)
+    with pytest.raises(requests.exceptions.RequestException):
+        list(rapi.iter_all())
+
+
+@pytest.mark.usefixtures("mock_get_all_countries")
+def test_iter_all_uses_cache(monkeypatch, requests_mock, countries_map):
+    """
+    Test that cached results are iterated without a request.
+    """
+    monkeypatch.setattr(rapi, "cache", LRUCache())
+    rapi.get_all()
+    assert sorted(rapi.iter_all()) == sorted(countries_map.values())
+    assert requests_mock.call_count == 1
@@ -0,0 +1,78 @@
+import math
+
+import pytest
+
+from restcountries import table as table_module
+from restcountries.table import CountryTable
+from restcountries.tests.countries_data import RSA, NGR, EGY, KEN
+
+
+@pytest.fixture(name="table", params=["numpy", "array"])
+def fixture_table(request, monkeypatch):
+    """
+    Runs every test with numpy columns, if numpy is installed, and with array columns.
+    """
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(table_module, "numpy", None)
+    return CountryTable.from_data([RSA, NGR, EGY, dict(KEN, gini=None)])
+
+
+def test_columns(table):
+    """
+    Test that fields are stored as columns.
+    """
+    assert len(table) == 4
+    assert list(table.column("population")) == [
+        RSA["population"],
+        NGR["population"],
+        EGY["population"],
+        KEN["population"],
+    ]
+    assert list(table.column("lat")) == [-29.0, 10.0, 27.0, 1.0]
+    assert math.isnan(table.column("gini")[3])
+    assert table.column("alpha3_code") == ["ZAF", "NGA", "EGY", "KEN"]
+
+
+def test_filter_and_sort(table):
+    """
+    Test filtering and sorting on the columns.
+    """
+    large = table.filter(table.mask("area", ">", 900000))
+    assert large.column("name") == ["South Africa", "Nigeria", "Egypt"]
+    by_population = large.sort_by("population", reverse=True)
+    assert by_population.column("name") == ["Nigeria", "Egypt", "South Africa"]
+    assert table.sort_by("gini").column("name")[-1] == "Kenya"
+    western = table.filter(table.mask("subregion", "in", ["Western Africa"]))
+    assert western.column("name") == ["Nigeria"]
+    assert len(table.filter(table.mask("area", "<", 0))) == 0
+
+
+def test_aggregation(table):
+    """
+    Test aggregations over columns and groups.
+    """
+    total = (
+        RSA["population"] + NGR["population"] + EGY["population"] + KEN["population"]
+    )
+    assert table.aggregate("population") == total
+    assert table.aggregate("gini", "count") == 3
+    assert table.group_by("region", "population") == {"Africa": total}
+    assert table.group_by("subregion", "area", "max")["Eastern Africa"] == KEN["area"]
+
+
+def test_density(table):
+    """
+    Test that the density is computed for every row.
+    """
+    density = table.density()
+    assert density[3] == pytest.approx(KEN["population"] / KEN["area"])
+
+
+def test_to_countries(table, countries_map):
+    """
+    Test that rows can be converted to Country objects.
+    """
+    countries = table.filter(table.mask("name", "==", "Egypt")).to_countries()
+    assert countries == [countries_map["egypt"]]
@@ -17,6 +17,7 @@ setup(
     license="Unlicense",
     keywords=["api", "wrapper", "country", "countries"],
     install_requires=["requests"],
+    extras_require={"async": ["aiohttp"], "numpy": ["numpy"], "fast": ["orjson"]},
     long_description=open("README.md").read(),
     long_description_content_type="text/markdown",
     classifiers=["Programming Language :: Python :: 3 :: Only"],